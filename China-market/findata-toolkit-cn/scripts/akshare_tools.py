@@ -97,14 +97,20 @@ def build_parser() -> argparse.ArgumentParser:
     sp_call.add_argument("--args", default="", help="JSON dict string for arguments")
     sp_call.add_argument("--set", action="append", default=[], help="Set argument: key=value (repeatable)")
 
-    sub.add_parser("cache-stats", help="Show cache stats", parents=[common])
+    sp_stats = sub.add_parser("cache-stats", help="Show cache stats", parents=[common])
+    sp_stats.add_argument("--by-tool", action="store_true", help="Break down entries/bytes per tool")
     sub.add_parser("cache-clear", help="Clear cache files", parents=[common])
 
+    sp_inv = sub.add_parser("cache-invalidate", help="Drop cached entries for a tool or tool prefix", parents=[common])
+    grp = sp_inv.add_mutually_exclusive_group(required=True)
+    grp.add_argument("--tool", default=None, help="Exact tool name")
+    grp.add_argument("--prefix", default=None, help="Tool name prefix (e.g. stock_zh_a_)")
+
     return p
 
 
 def main(argv: list[str]) -> int:
-    known_cmds = {"list", "describe", "call", "cache-stats", "cache-clear"}
+    known_cmds = {"list", "describe", "call", "cache-stats", "cache-clear", "cache-invalidate"}
     if len(argv) > 1 and not argv[1].startswith("-") and argv[1] not in known_cmds:
         argv = [argv[0], "call", *argv[1:]]
 
@@ -137,7 +143,10 @@ def main(argv: list[str]) -> int:
         if not cache:
             output_json({"enabled": False}, pretty=args.pretty)
             return 0
-        output_json(cache.stats(), pretty=args.pretty)
+        stats = cache.stats()
+        if args.by_tool:
+            stats["by_tool"] = cache.stats_by_tool()
+        output_json(stats, pretty=args.pretty)
         return 0
 
     if args.cmd == "cache-clear":
@@ -148,6 +157,14 @@ def main(argv: list[str]) -> int:
         output_json({"enabled": True, "cleared": cleared, **cache.stats()}, pretty=args.pretty)
         return 0
 
+    if args.cmd == "cache-invalidate":
+        if not cache:
+            output_json({"enabled": False, "invalidated": 0}, pretty=args.pretty)
+            return 0
+        removed = cache.invalidate(tool=args.tool, prefix=args.prefix)
+        output_json({"enabled": True, "invalidated": removed, **cache.stats()}, pretty=args.pretty)
+        return 0
+
     if args.cmd != "call":
         parser.print_help()
         return 0
@@ -212,23 +212,54 @@ def call_tool(
     ttl = cache.get_ttl(tool_name) if cache else 0
     cache_key = cache.get_cache_key(tool_name, call_kwargs) if cache else ""
     if cache and not refresh:
-        cached = cache.load(cache_key, ttl)
-        if cached and isinstance(cached, dict) and "result" in cached:
-            payload = cached.get("result")
-            age = time.time() - float(cached.get("timestamp", 0))
-            if isinstance(payload, dict) and isinstance(payload.get("meta"), dict):
-                payload["meta"]["cache"] = {
-                    "hit": True,
-                    "ttl_seconds": ttl,
-                    "age_seconds": round(age, 3),
-                }
-            return payload if isinstance(payload, dict) else {
-                "meta": {"function": tool_name, "cache": {"hit": True}},
-                "data": payload,
-                "warnings": [],
-                "errors": [],
-            }
+        hit = _cache_hit(cache, cache_key, ttl, tool_name)
+        if hit is not None:
+            return hit
+
+    if not cache:
+        return _call_upstream(func, tool, tool_name, call_kwargs, cache=None, cache_key="", ttl=ttl, meta_script=meta_script)
+
+    # Several processes may share the cache dir: serialize the fill per key and re-check after
+    # acquiring the lock, so a concurrent miss reuses the first process's result.
+    with cache.lock(cache_key):
+        if not refresh:
+            hit = _cache_hit(cache, cache_key, ttl, tool_name)
+            if hit is not None:
+                return hit
+        return _call_upstream(func, tool, tool_name, call_kwargs, cache=cache, cache_key=cache_key, ttl=ttl, meta_script=meta_script)
+
+
+def _cache_hit(cache: CacheManager, cache_key: str, ttl: float, tool_name: str) -> dict[str, Any] | None:
+    cached = cache.load(cache_key, ttl)
+    if not (cached and isinstance(cached, dict) and "result" in cached):
+        return None
+    payload = cached.get("result")
+    age = time.time() - float(cached.get("timestamp", 0))
+    if isinstance(payload, dict) and isinstance(payload.get("meta"), dict):
+        payload["meta"]["cache"] = {
+            "hit": True,
+            "ttl_seconds": ttl,
+            "age_seconds": round(age, 3),
+        }
+    return payload if isinstance(payload, dict) else {
+        "meta": {"function": tool_name, "cache": {"hit": True}},
+        "data": payload,
+        "warnings": [],
+        "errors": [],
+    }
 
+
+def _call_upstream(
+    func: Any,
+    tool: dict[str, Any],
+    tool_name: str,
+    call_kwargs: dict[str, Any],
+    *,
+    cache: CacheManager | None,
+    cache_key: str,
+    ttl: float,
+    meta_script: str,
+) -> dict[str, Any]:
     started = time.time()
     raw: Any = None
     try:
@@ -301,7 +332,7 @@ def call_tool(
 
     if cache and not errors:
         try:
-            cache.save(cache_key, envelope)
+            cache.save(cache_key, envelope, tool=tool_name)
         except Exception:
             pass
 
@@ -3,6 +3,22 @@ File cache for FinData Toolkit (CN).
 
 This mirrors the caching approach used by the AKShare MCP server, but is
 implemented locally so toolkit scripts can benefit without running MCP.
+
+Storage backends (`FINSKILLS_CACHE_BACKEND`: auto | json | parquet):
+- json:    one `<key>.json` file holding `{"timestamp": ..., "result": ...}`.
+- parquet: tabular results (`result["data"]` is a list of flat records) are stored as a
+           compressed `<key>.parquet` table plus a small `<key>.meta.json` sidecar with the
+           timestamp and the rest of the envelope, so freshness checks never touch the table.
+           Non-tabular payloads fall back to json. Requires `pyarrow`.
+- auto:    parquet when `pyarrow` is importable, else json (default).
+
+Entries are tracked in `index.sqlite` (see `cache_index.py`), which enforces the
+`FINSKILLS_CACHE_MAX_MB` byte budget and provides cheap stats and per-tool invalidation.
+
+The cache directory may be shared by several processes: every file is written to a temp file and
+renamed into place (readers never see a partial entry), and `CacheManager.lock(key)` is a per-key
+advisory lock (`.locks/<key>.lock`) used to fill a missing entry only once. Deleting an entry also
+deletes its lock file (while holding it; lockers re-open a lock file that was unlinked under them).
 """
 
 from __future__ import annotations
@@ -10,10 +26,20 @@ from __future__ import annotations
 import hashlib
 import json
 import os
+import tempfile
 import time
+from contextlib import contextmanager
 from dataclasses import dataclass
+from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
+
+from .cache_index import CacheIndex
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None  # type: ignore[assignment]
 
 
 @dataclass(frozen=True)
@@ -34,6 +60,185 @@ def _default_cache_dir() -> Path:
     return Path(__file__).resolve().parent.parent.parent / "cache"
 
 
+_SCALAR_TYPES = (str, int, float, bool, type(None), datetime, date)
+
+
+@contextmanager
+def _atomic_path(path: Path) -> Iterator[Path]:
+    """Yield a temp path in the same directory; on success it replaces `path` via `os.replace`."""
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    os.close(fd)
+    tmp = Path(tmp_name)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+
+def _write_json_atomic(path: Path, obj: Any) -> None:
+    from .utils import JSONEncoder
+
+    with _atomic_path(path) as tmp:
+        tmp.write_text(json.dumps(obj, ensure_ascii=False, separators=(",", ":"), cls=JSONEncoder), encoding="utf-8")
+
+
+def _read_json_dict(path: Path) -> Optional[dict[str, Any]]:
+    if not path.exists():
+        return None
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _open_lock(path: Path, *, blocking: bool = True) -> Any:
+    """
+    Open and `flock` a lock file; returns the open handle (close it to release).
+
+    Returns None when `blocking=False` and the lock is held elsewhere. If the file was unlinked or
+    replaced while we waited, the lock is retaken on the current file, so a holder may delete it.
+    """
+    while True:
+        fh = open(path, "a+b")
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            fh.close()
+            return None
+        try:
+            if os.fstat(fh.fileno()).st_ino == os.stat(path).st_ino:
+                return fh
+        except FileNotFoundError:
+            pass
+        fh.close()
+
+
+def _tabular_records(result: Any) -> list[dict[str, Any]] | None:
+    """Return `result["data"]` if it is a non-empty list of flat records sharing one column set."""
+    if not isinstance(result, dict):
+        return None
+    data = result.get("data")
+    if not isinstance(data, list) or not data or not isinstance(data[0], dict):
+        return None
+    columns = list(data[0].keys())
+    if not all(isinstance(c, str) for c in columns):
+        return None
+    for row in data:
+        if not isinstance(row, dict) or list(row.keys()) != columns:
+            return None
+        if not all(isinstance(v, _SCALAR_TYPES) for v in row.values()):
+            return None
+    return data
+
+
+class JSONBackend:
+    name = "json"
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+
+    def path(self, cache_key: str) -> Path:
+        return self.cache_dir / f"{cache_key}.json"
+
+    def files(self, cache_key: str) -> list[Path]:
+        return [self.path(cache_key)]
+
+    def read_header(self, cache_key: str) -> Optional[dict[str, Any]]:
+        payload = self.read(cache_key)
+        return {"timestamp": payload.get("timestamp", 0)} if payload is not None else None
+
+    def read(self, cache_key: str) -> Optional[dict[str, Any]]:
+        return _read_json_dict(self.path(cache_key))
+
+    def write(self, cache_key: str, payload: dict[str, Any]) -> bool:
+        _write_json_atomic(self.path(cache_key), payload)
+        return True
+
+
+class ParquetBackend:
+    """Columnar storage for list-of-records results; `write` returns False for non-tabular payloads."""
+
+    name = "parquet"
+
+    def __init__(self, cache_dir: Path) -> None:
+        import pyarrow  # noqa: F401  (fail fast if unavailable)
+
+        self.cache_dir = cache_dir
+
+    def table_path(self, cache_key: str) -> Path:
+        return self.cache_dir / f"{cache_key}.parquet"
+
+    def header_path(self, cache_key: str) -> Path:
+        return self.cache_dir / f"{cache_key}.meta.json"
+
+    def files(self, cache_key: str) -> list[Path]:
+        return [self.table_path(cache_key), self.header_path(cache_key)]
+
+    def read_header(self, cache_key: str) -> Optional[dict[str, Any]]:
+        return _read_json_dict(self.header_path(cache_key))
+
+    def read(self, cache_key: str, header: Optional[dict[str, Any]] = None) -> Optional[dict[str, Any]]:
+        import pyarrow.parquet as pq
+
+        header = header or self.read_header(cache_key)
+        if header is None:
+            return None
+        try:
+            table = pq.read_table(self.table_path(cache_key), memory_map=True)
+        except Exception:
+            return None
+        result = dict(header.get("envelope") or {})
+        result["data"] = table.to_pylist()
+        return {"timestamp": header.get("timestamp", 0), "result": result}
+
+    def write(self, cache_key: str, payload: dict[str, Any]) -> bool:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        result = payload.get("result")
+        records = _tabular_records(result)
+        if records is None:
+            return False
+        try:
+            table = pa.Table.from_pylist(records)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            # Mixed-type columns (e.g. "-" placeholders in numeric columns): keep as json.
+            return False
+
+        envelope = {k: v for k, v in result.items() if k != "data"}
+        header = {
+            "timestamp": payload.get("timestamp", time.time()),
+            "format": "parquet",
+            "rows": table.num_rows,
+            "columns": table.column_names,
+            "envelope": envelope,
+        }
+        # Table first, sidecar last: the entry only becomes visible once both are in place.
+        with _atomic_path(self.table_path(cache_key)) as tmp:
+            pq.write_table(table, tmp, compression="zstd")
+        _write_json_atomic(self.header_path(cache_key), header)
+        return True
+
+
+def _make_columnar_backend(cache_dir: Path, requested: str) -> Optional[ParquetBackend]:
+    if requested == "json":
+        return None
+    try:
+        return ParquetBackend(cache_dir)
+    except ImportError:
+        if requested == "parquet":
+            raise ImportError(
+                "FINSKILLS_CACHE_BACKEND=parquet requires 'pyarrow' (pip install pyarrow)"
+            ) from None
+        return None
+
+
 class CacheManager:
     def __init__(
         self,
@@ -41,94 +246,281 @@ class CacheManager:
         *,
         enabled: bool = True,
         ttl: CacheTTL | None = None,
+        backend: str | None = None,
+        max_mb: float | None = None,
+        use_index: bool | None = None,
     ) -> None:
         self.enabled = enabled
         self.cache_dir = (cache_dir or _default_cache_dir()).resolve()
         self.ttl = ttl or CacheTTL()
 
+        requested = (backend or os.getenv("FINSKILLS_CACHE_BACKEND") or "auto").strip().lower()
+        self.json_backend = JSONBackend(self.cache_dir)
+        self.columnar_backend = _make_columnar_backend(self.cache_dir, requested)
+        self.backend = self.columnar_backend.name if self.columnar_backend else self.json_backend.name
+
+        if max_mb is None:
+            max_mb = float(os.getenv("FINSKILLS_CACHE_MAX_MB", "2048"))
+        self.max_bytes = int(max_mb * 1024 * 1024) if max_mb and max_mb > 0 else 0  # 0 = unlimited
+
+        self.index: CacheIndex | None = None
         if self.enabled:
             self.cache_dir.mkdir(parents=True, exist_ok=True)
+            if use_index is None:
+                use_index = os.getenv("FINSKILLS_CACHE_INDEX", "1").strip().lower() in {"1", "true", "yes", "y"}
+            if use_index:
+                self.index = CacheIndex(self.cache_dir / "index.sqlite")
+                if self.index.is_empty():
+                    self._reindex()
 
     def get_cache_key(self, name: str, arguments: dict[str, Any]) -> str:
         key_data = f"{name}:{json.dumps(arguments, sort_keys=True, ensure_ascii=False)}"
         return hashlib.md5(key_data.encode("utf-8")).hexdigest()
 
     def get_cache_path(self, cache_key: str) -> Path:
-        return self.cache_dir / f"{cache_key}.json"
+        return self.json_backend.path(cache_key)
 
-    def get_ttl(self, name: str) -> float:
+    @staticmethod
+    def get_ttl_class(name: str) -> str:
         name_lower = name.lower()
 
         # Heuristics: keep simple and overridable.
         if any(k in name_lower for k in ["spot", "realtime", "real_time", "current", "bid_ask", "intraday"]):
-            return self.ttl.realtime
+            return "realtime"
         if any(k in name_lower for k in ["hist", "daily", "minute", "min", "tick", "kline"]):
-            return self.ttl.historical
+            return "historical"
         if any(k in name_lower for k in ["info", "name", "code", "list", "category", "profile", "components", "cons"]):
-            return self.ttl.static
-        return self.ttl.default
+            return "static"
+        return "default"
+
+    def get_ttl(self, name: str) -> float:
+        return getattr(self.ttl, self.get_ttl_class(name))
+
+    @staticmethod
+    def _is_fresh(header: dict[str, Any], ttl: float) -> bool:
+        if ttl == float("inf"):
+            return True
+        cached_time = float(header.get("timestamp", 0))
+        return time.time() - cached_time <= ttl
 
     def load(self, cache_key: str, ttl: float) -> Optional[dict[str, Any]]:
         if not self.enabled:
             return None
 
-        cache_path = self.get_cache_path(cache_key)
-        if not cache_path.exists():
-            return None
+        # Columnar entries are checked via their small sidecar header; the table is only read if fresh.
+        if self.columnar_backend is not None:
+            header = self.columnar_backend.read_header(cache_key)
+            if header is not None:
+                if not self._is_fresh(header, ttl):
+                    return None
+                payload = self.columnar_backend.read(cache_key, header)
+                if payload is not None:
+                    self._touch(cache_key)
+                    return payload
 
-        try:
-            payload = json.loads(cache_path.read_text(encoding="utf-8"))
-        except Exception:
+        payload = self.json_backend.read(cache_key)
+        if payload is None or not self._is_fresh(payload, ttl):
             return None
+        self._touch(cache_key)
+        return payload
 
-        cached_time = float(payload.get("timestamp", 0))
-        if ttl != float("inf"):
-            age = time.time() - cached_time
-            if age > ttl:
-                return None
+    @contextmanager
+    def lock(self, cache_key: str) -> Iterator[None]:
+        """
+        Exclusive cross-process lock for one cache key (blocks until acquired).
 
-        return payload
+        Used to fill a missing entry once: take the lock, re-check `load`, and only then call upstream.
+        A no-op when caching is disabled or `fcntl` is unavailable.
+        """
+        if not self.enabled or fcntl is None:
+            yield
+            return
+        lock_path = self._lock_path(cache_key)
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with _open_lock(lock_path) as fh:
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
 
-    def save(self, cache_key: str, result: Any) -> None:
-        if not self.enabled:
+    def _lock_path(self, cache_key: str) -> Path:
+        return self.cache_dir / ".locks" / f"{cache_key}.lock"
+
+    def _drop_locked(self, lock_path: Path, paths: list[Path]) -> None:
+        """
+        Unlink `paths` and then the lock file itself, holding the lock while doing so.
+
+        The lock is only tried: if someone holds it (e.g. a fill in progress, possibly our own caller),
+        the files are still unlinked but the lock file is left for its holder.
+        """
+        fh = _open_lock(lock_path, blocking=False) if fcntl is not None and lock_path.exists() else None
+        try:
+            self._unlink(paths)
+            if fh is not None:
+                self._unlink([lock_path])
+        finally:
+            if fh is not None:
+                fh.close()
+
+    def _touch(self, cache_key: str) -> None:
+        if self.index is None:
             return
+        try:
+            self.index.touch(cache_key)
+        except Exception:
+            pass
 
-        from .utils import JSONEncoder
+    def save(self, cache_key: str, result: Any, *, tool: str | None = None) -> None:
+        if not self.enabled:
+            return
 
-        cache_path = self.get_cache_path(cache_key)
         payload = {
             "timestamp": time.time(),
             "result": result,
         }
 
-        cache_path.write_text(
-            json.dumps(payload, ensure_ascii=False, indent=2, cls=JSONEncoder),
-            encoding="utf-8",
-        )
+        if self.columnar_backend is not None and self.columnar_backend.write(cache_key, payload):
+            self._unlink(self.json_backend.files(cache_key))
+        else:
+            self.json_backend.write(cache_key, payload)
+            if self.columnar_backend is not None:
+                self._unlink(self.columnar_backend.files(cache_key))
+
+        if self.index is not None:
+            if tool is None and isinstance(result, dict) and isinstance(result.get("meta"), dict):
+                tool = str(result["meta"].get("function") or "")
+            tool = tool or ""
+            self.index.record(
+                cache_key,
+                tool=tool,
+                ttl_class=self.get_ttl_class(tool) if tool else "default",
+                ttl=self.get_ttl(tool) if tool else self.ttl.default,
+                size=self._entry_size(cache_key),
+            )
+            self.evict()
+
+    def _entry_files(self, cache_key: str) -> list[Path]:
+        files = list(self.json_backend.files(cache_key))
+        if self.columnar_backend is not None:
+            files.extend(self.columnar_backend.files(cache_key))
+        else:
+            files.extend([self.cache_dir / f"{cache_key}.parquet", self.cache_dir / f"{cache_key}.meta.json"])
+        return files
+
+    def _entry_size(self, cache_key: str) -> int:
+        size = 0
+        for p in self._entry_files(cache_key):
+            try:
+                size += p.stat().st_size
+            except OSError:
+                continue
+        return size
+
+    def _delete_entries(self, keys: list[str]) -> int:
+        for key in keys:
+            self._drop_locked(self._lock_path(key), self._entry_files(key))
+        if self.index is not None and keys:
+            self.index.remove(keys)
+        return len(keys)
+
+    def evict(self) -> int:
+        """Enforce the byte budget: drop expired entries first, then least recently used."""
+        if self.index is None or not self.max_bytes:
+            return 0
+        _, total = self.index.totals()
+        if total <= self.max_bytes:
+            return 0
+        return self._delete_entries(self.index.eviction_candidates(total - self.max_bytes))
+
+    def invalidate(self, *, tool: str | None = None, prefix: str | None = None) -> int:
+        """Delete cached entries for one tool (exact name) or every tool starting with `prefix`."""
+        if not self.enabled or self.index is None:
+            return 0
+        if tool is None and prefix is None:
+            raise ValueError("invalidate() needs tool or prefix; use clear() to drop everything")
+        return self._delete_entries(self.index.keys_for(tool=tool, prefix=prefix))
+
+    def _reindex(self) -> None:
+        """Backfill the index from files written before it existed (one directory scan)."""
+        assert self.index is not None
+        keys: set[str] = set()
+        for f in self._cache_files():
+            name = f.name
+            if name.endswith(".meta.json"):
+                keys.add(name[: -len(".meta.json")])
+            elif name.endswith((".json", ".parquet")):
+                keys.add(f.stem)
+        for key in keys:
+            # Parquet sidecars are read directly, so entries are indexed even when pyarrow is missing now.
+            header = _read_json_dict(self.cache_dir / f"{key}.meta.json")
+            if header is not None:
+                result = header.get("envelope")
+            else:
+                payload = self.json_backend.read(key)
+                result = payload.get("result") if payload is not None else None
+            meta = result.get("meta") if isinstance(result, dict) else None
+            tool = str(meta.get("function") or "") if isinstance(meta, dict) else ""
+            files = [p for p in self._entry_files(key) if p.exists()]
+            if not files:
+                continue
+            self.index.record(
+                key,
+                tool=tool,
+                ttl_class=self.get_ttl_class(tool) if tool else "default",
+                ttl=self.get_ttl(tool) if tool else self.ttl.default,
+                size=sum(p.stat().st_size for p in files),
+                created=max(p.stat().st_mtime for p in files),
+            )
+
+    @staticmethod
+    def _unlink(paths: list[Path]) -> None:
+        for p in paths:
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                continue
+            except Exception:
+                continue
+
+    def _cache_files(self) -> list[Path]:
+        return [*self.cache_dir.glob("*.json"), *self.cache_dir.glob("*.parquet")]
 
     def clear(self) -> int:
         if not self.enabled or not self.cache_dir.exists():
             return 0
 
         count = 0
-        for cache_file in self.cache_dir.glob("*.json"):
+        for cache_file in self._cache_files():
             try:
                 cache_file.unlink()
-                count += 1
+                if not cache_file.name.endswith(".meta.json"):
+                    count += 1
             except Exception:
                 continue
+        for lock_path in (self.cache_dir / ".locks").glob("*.lock"):
+            self._drop_locked(lock_path, [])
+        if self.index is not None:
+            self.index.clear()
         return count
 
     def stats(self) -> dict[str, Any]:
         if not self.enabled or not self.cache_dir.exists():
             return {"enabled": False, "count": 0, "size_mb": 0.0, "cache_dir": str(self.cache_dir)}
 
-        files = list(self.cache_dir.glob("*.json"))
-        total_size = sum(f.stat().st_size for f in files)
+        if self.index is not None:
+            count, total_size = self.index.totals()
+        else:
+            files = self._cache_files()
+            total_size = sum(f.stat().st_size for f in files)
+            count = sum(1 for f in files if not f.name.endswith(".meta.json"))
         return {
             "enabled": True,
-            "count": len(files),
+            "backend": self.backend,
+            "count": count,
             "size_mb": round(total_size / 1024 / 1024, 2),
+            "max_mb": round(self.max_bytes / 1024 / 1024, 2) if self.max_bytes else None,
             "cache_dir": str(self.cache_dir),
         }
 
+    def stats_by_tool(self) -> dict[str, dict[str, Any]]:
+        return self.index.by_tool() if self.index is not None else {}
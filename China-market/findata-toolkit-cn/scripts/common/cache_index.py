@@ -0,0 +1,131 @@
+"""
+SQLite index for the toolkit file cache.
+
+One row per cache entry (key, tool, TTL class, size, created/last-access time). Running totals are
+kept in a single row by triggers, so `stats()` does not scan the cache directory. The index drives
+byte-budget eviction (expired entries first, then least recently used) and invalidation by tool name
+or tool-name prefix.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    tool TEXT NOT NULL DEFAULT '',
+    ttl_class TEXT NOT NULL DEFAULT 'default',
+    ttl REAL,
+    size INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_tool ON entries(tool);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    count INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals (id, count, bytes) VALUES (1, 0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_ins AFTER INSERT ON entries BEGIN
+    UPDATE totals SET count = count + 1, bytes = bytes + NEW.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_del AFTER DELETE ON entries BEGIN
+    UPDATE totals SET count = count - 1, bytes = bytes - OLD.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_upd AFTER UPDATE OF size ON entries BEGIN
+    UPDATE totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 1;
+END;
+"""
+
+
+class CacheIndex:
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record(self, key: str, *, tool: str, ttl_class: str, ttl: float | None, size: int, created: float | None = None) -> None:
+        now = time.time() if created is None else created
+        self._conn().execute(
+            """
+            INSERT INTO entries (key, tool, ttl_class, ttl, size, created, last_access)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                tool = excluded.tool, ttl_class = excluded.ttl_class, ttl = excluded.ttl,
+                size = excluded.size, created = excluded.created, last_access = excluded.last_access
+            """,
+            (key, tool, ttl_class, None if ttl is None or ttl == float("inf") else ttl, int(size), now, now),
+        )
+
+    def touch(self, key: str) -> None:
+        self._conn().execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+
+    def remove(self, keys: Iterable[str]) -> None:
+        self._conn().executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in keys])
+
+    def totals(self) -> tuple[int, int]:
+        row = self._conn().execute("SELECT count, bytes FROM totals WHERE id = 1").fetchone()
+        return (int(row[0]), int(row[1])) if row else (0, 0)
+
+    def keys_for(self, *, tool: str | None = None, prefix: str | None = None) -> list[str]:
+        if tool is not None:
+            rows = self._conn().execute("SELECT key FROM entries WHERE tool = ?", (tool,)).fetchall()
+        elif prefix is not None:
+            escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            rows = self._conn().execute(
+                "SELECT key FROM entries WHERE tool LIKE ? ESCAPE '\\'", (f"{escaped}%",)
+            ).fetchall()
+        else:
+            rows = self._conn().execute("SELECT key FROM entries").fetchall()
+        return [r[0] for r in rows]
+
+    def eviction_candidates(self, bytes_to_free: int) -> list[str]:
+        """
+        Pick entries to delete until `bytes_to_free` is covered:
+        expired entries first, then the least recently used.
+        """
+        now = time.time()
+        rows = self._conn().execute(
+            """
+            SELECT key, size FROM entries
+            ORDER BY (ttl IS NOT NULL AND created + ttl < ?) DESC, last_access ASC
+            """,
+            (now,),
+        )
+        out: list[str] = []
+        freed = 0
+        for key, size in rows:
+            if freed >= bytes_to_free:
+                break
+            out.append(key)
+            freed += int(size)
+        return out
+
+    def by_tool(self) -> dict[str, dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT tool, COUNT(*), COALESCE(SUM(size), 0) FROM entries GROUP BY tool ORDER BY 3 DESC"
+        ).fetchall()
+        return {tool: {"count": int(n), "bytes": int(b)} for tool, n, b in rows}
+
+    def is_empty(self) -> bool:
+        return self.totals()[0] == 0
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM entries")
@@ -20,10 +20,12 @@ Examples:
 from __future__ import annotations
 
 import argparse
+import gzip
 import json
 import os
 import sys
 import time
+import zlib
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -124,12 +126,18 @@ def _remote_base_url(cli_url: str) -> str | None:
     return url.rstrip("/")
 
 
-def _remote_headers() -> dict[str, str]:
+COLUMNAR_JSON = "application/vnd.finskills.columnar+json"
+
+
+def _remote_headers(*, compact: bool = False) -> dict[str, str]:
     headers = {
-        "Accept": "application/json",
+        # compact: columnar tables + gzip/deflate; expanded back to the usual envelope after parsing.
+        "Accept": f"{COLUMNAR_JSON}, application/json;q=0.9" if compact else "application/json",
         "Content-Type": "application/json; charset=utf-8",
         "User-Agent": "finskills-views-runner/remote",
     }
+    if compact:
+        headers["Accept-Encoding"] = "gzip, deflate"
     token = (os.getenv("FINSKILLS_VIEW_API_TOKEN") or "").strip()
     if token:
         headers["Authorization"] = f"Bearer {token}"
@@ -150,20 +158,49 @@ def _remote_timeout_seconds() -> float:
         return 30.0
 
 
-def _remote_request_json(method: str, url: str, *, body: dict[str, Any] | None) -> tuple[int, Any]:
+def _decode_body(raw: bytes, content_encoding: str | None) -> str:
+    enc = (content_encoding or "").strip().lower()
+    if enc == "gzip":
+        raw = gzip.decompress(raw)
+    elif enc == "deflate":
+        raw = zlib.decompress(raw)
+    return raw.decode("utf-8", errors="replace")
+
+
+def _expand_columnar(payload: Any) -> Any:
+    """Columnar view envelope -> the usual one (each table back to a list of row objects)."""
+    if not isinstance(payload, dict):
+        return payload
+    if isinstance(payload.get("results"), list):
+        return {**payload, "results": [_expand_columnar(v) for v in payload["results"]]}
+    meta = payload.get("meta")
+    if not isinstance(meta, dict) or meta.get("format") != "columnar":
+        return payload
+    data: dict[str, Any] = {}
+    for key, res in (payload.get("data") or {}).items():
+        res_meta = res.get("meta") if isinstance(res, dict) else None
+        if isinstance(res_meta, dict) and res_meta.get("data_format") == "columnar":
+            cols = res["data"]["columns"]
+            res_meta = {k: v for k, v in res_meta.items() if k != "data_format"}
+            res = {**res, "meta": res_meta, "data": [dict(zip(cols, row)) for row in res["data"]["rows"]]}
+        data[key] = res
+    return {**payload, "meta": {k: v for k, v in meta.items() if k != "format"}, "data": data}
+
+
+def _remote_request_json(method: str, url: str, *, body: dict[str, Any] | None, compact: bool = False) -> tuple[int, Any]:
     data = None
     if body is not None:
         data = json.dumps(body, ensure_ascii=False).encode("utf-8")
-    req = urllib_request.Request(url, data=data, method=method, headers=_remote_headers())
+    req = urllib_request.Request(url, data=data, method=method, headers=_remote_headers(compact=compact))
     timeout = _remote_timeout_seconds()
     try:
         with urllib_request.urlopen(req, timeout=timeout) as resp:
             status = int(getattr(resp, "status", 200))
-            raw = resp.read().decode("utf-8", errors="replace")
+            raw = _decode_body(resp.read(), resp.headers.get("Content-Encoding"))
     except urllib_error.HTTPError as e:
         status = int(getattr(e, "code", 500) or 500)
         try:
-            raw = e.read().decode("utf-8", errors="replace")
+            raw = _decode_body(e.read(), e.headers.get("Content-Encoding") if e.headers else None)
         except Exception:
             raw = ""
     except urllib_error.URLError as e:
@@ -172,7 +209,7 @@ def _remote_request_json(method: str, url: str, *, body: dict[str, Any] | None)
     if not raw:
         return status, None
     try:
-        return status, json.loads(raw)
+        return status, _expand_columnar(json.loads(raw))
     except Exception:
         return status, {"error": raw}
 
@@ -263,6 +300,7 @@ def main(argv: list[str]) -> int:
                     "POST",
                     f"{remote_url}/run",
                     body={"name": candidate, "params": params, "refresh": bool(args.refresh)},
+                    compact=True,
                 )
                 last_payload = payload
                 if status == 404:
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Ensure `view-service/` is importable when running from repo root.
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "view-service"))
+
+from view_service.akshare_health import AKShareHealthMonitor, HealthCheckResult  # noqa: E402
+
+
+class _SlowProbeMonitor(AKShareHealthMonitor):
+    def __init__(self, delay: float) -> None:
+        super().__init__()
+        self.delay = delay
+        self.probes = 0
+        self.release = threading.Event()
+
+    def _perform_health_check(self) -> HealthCheckResult:
+        self.probes += 1
+        self.release.wait(self.delay)
+        return HealthCheckResult(is_healthy=True, check_time=datetime.now(), response_time=self.delay)
+
+
+class HealthMonitorTests(unittest.TestCase):
+    def test_check_health_never_blocks_on_probe(self) -> None:
+        monitor = _SlowProbeMonitor(delay=2.0)
+        try:
+            started = time.monotonic()
+            first = monitor.check_health()
+            monitor.record_call("t", success=True)
+            self.assertFalse(monitor.is_degraded())
+            self.assertLess(time.monotonic() - started, 0.2)
+            self.assertEqual(first.details.get("status"), "pending")
+
+            monitor.release.set()
+            deadline = time.monotonic() + 2.0
+            while monitor.check_health().details.get("status") == "pending" and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertIsNone(monitor.check_health().details.get("status"))
+            self.assertEqual(monitor.probes, 1)
+        finally:
+            monitor.stop()
+
+    def test_stale_snapshot_is_served_while_refreshing(self) -> None:
+        monitor = _SlowProbeMonitor(delay=0.0)
+        monitor._health_check_interval = 0.05
+        try:
+            monitor.check_health(force=True)
+            time.sleep(0.1)
+            stale = monitor.check_health()
+            self.assertTrue(stale.is_healthy)
+            deadline = time.monotonic() + 2.0
+            while monitor.probes < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(monitor.probes, 2)
+
+            # Nobody reads the snapshot: the refresher stays idle past the interval.
+            time.sleep(0.2)
+            self.assertEqual(monitor.probes, 2)
+            monitor.check_health()
+            deadline = time.monotonic() + 2.0
+            while monitor.probes < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(monitor.probes, 3)
+        finally:
+            monitor.stop()
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "view-service"))
+
+from view_service import async_server  # noqa: E402
+from view_service.async_server import AsyncViewServer  # noqa: E402
+from view_service.provider_base import ToolProvider, ToolResult  # noqa: E402
+from view_service.views_cn import ViewSpec  # noqa: E402
+
+
+class _SleepyProvider(ToolProvider):
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.calls = 0
+
+    def call_tool(self, name: str, args: dict[str, Any], *, refresh: bool, meta_script: str) -> ToolResult:
+        _ = refresh, meta_script
+        self.calls += 1
+        time.sleep(self.delay)
+        if "rows" in args:
+            data: Any = [{"代码": f"{i:06d}", "最新价": i / 100} for i in range(int(args["rows"]))]
+        else:
+            data = {"args": args}
+        return ToolResult(meta={"function": name}, data=data, warnings=[], errors=[])
+
+
+VIEWS = {"t1": ViewSpec(name="t1", kind="tool_view", description="test tool", params_schema={"type": "object"}, module=None)}
+
+
+class _ServerThread:
+    def __init__(self, **kwargs: Any) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.server = AsyncViewServer(views=VIEWS, host="127.0.0.1", port=0, **kwargs)
+        self.loop.run_until_complete(self.server.start())
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.server.close(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        self.loop.close()
+
+
+def _post_run(port: int, name: str = "t1", params: dict | None = None) -> tuple[int, dict[str, str], dict]:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        conn.request("POST", "/run", body=json.dumps({"name": name, "params": params or {}}), headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        return resp.status, {k.lower(): v for k, v in resp.getheaders()}, json.loads(resp.read())
+    finally:
+        conn.close()
+
+
+class TestAsyncServer(unittest.TestCase):
+    def test_same_api_over_one_keepalive_connection(self):
+        srv = _ServerThread(provider=_SleepyProvider())
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", srv.server.port, timeout=10)
+            conn.request("GET", "/health")
+            resp = conn.getresponse()
+            self.assertEqual(resp.status, 200)
+            self.assertEqual(json.loads(resp.read()), {"ok": True})
+            sock = conn.sock
+
+            conn.request("GET", "/views")
+            resp = conn.getresponse()
+            self.assertEqual(json.loads(resp.read())["views"], ["t1"])
+            conn.request("GET", "/views/t1")
+            resp = conn.getresponse()
+            self.assertEqual(json.loads(resp.read())["kind"], "tool_view")
+            conn.request("GET", "/views/nope")
+            resp = conn.getresponse()
+            self.assertEqual(resp.status, 404)
+            resp.read()
+
+            conn.request("POST", "/run", body=json.dumps({"name": "t1", "params": {"x": 1}}))
+            resp = conn.getresponse()
+            body = json.loads(resp.read())
+            self.assertEqual(resp.status, 200)
+            self.assertEqual(body["data"]["t1"]["data"], {"args": {"x": 1}})
+
+            conn.request("GET", "/run?name=t1&params=%7B%22x%22%3A%202%7D")
+            resp = conn.getresponse()
+            self.assertEqual(json.loads(resp.read())["data"]["t1"]["data"], {"args": {"x": 2}})
+
+            conn.request("POST", "/run", body=b"not json")
+            resp = conn.getresponse()
+            self.assertEqual(resp.status, 400)
+            resp.read()
+            self.assertIs(conn.sock, sock)  # every request reused the same TCP connection
+            conn.close()
+        finally:
+            srv.stop()
+
+    def test_batch_endpoint(self):
+        provider = _SleepyProvider()
+        srv = _ServerThread(provider=provider)
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", srv.server.port, timeout=10)
+            req = {"views": [{"name": "t1", "params": {"x": 1}}, {"name": "t1", "params": {"x": 1}}, {"name": "t1"}]}
+            conn.request("POST", "/run/batch", body=json.dumps(req))
+            resp = conn.getresponse()
+            body = json.loads(resp.read())
+            self.assertEqual(resp.status, 200)
+            self.assertEqual((body["meta"]["calls"], body["meta"]["unique_calls"]), (3, 2))
+            self.assertEqual(len(body["results"]), 3)
+            self.assertEqual(provider.calls, 2)
+
+            conn.request("POST", "/run/batch", body=json.dumps({"views": [{"name": "nope"}]}))
+            resp = conn.getresponse()
+            self.assertEqual(resp.status, 404)
+            resp.read()
+            conn.close()
+        finally:
+            srv.stop()
+
+    def test_ndjson_stream_is_chunked_and_keeps_connection(self):
+        srv = _ServerThread(provider=_SleepyProvider())
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", srv.server.port, timeout=10)
+            conn.request("POST", "/run", body=json.dumps({"name": "t1", "params": {"rows": 5000}, "stream": True}))
+            resp = conn.getresponse()
+            self.assertEqual(resp.getheader("Transfer-Encoding"), "chunked")
+            self.assertTrue(resp.getheader("Content-Type").startswith("application/x-ndjson"))
+            lines = [json.loads(line) for line in resp.read().splitlines()]
+            self.assertEqual([lines[0]["type"], lines[1]["type"], lines[-1]["type"]], ["meta", "result", "end"])
+            self.assertEqual(lines[1]["rows"], 5000)
+            rows = [x["row"] for x in lines if x["type"] == "row"]
+            self.assertEqual(len(rows), 5000)
+            self.assertEqual(rows[42], {"代码": "000042", "最新价": 0.42})
+
+            # GET routes ignore the NDJSON Accept and keep their JSON payload.
+            conn.request("GET", "/views", headers={"Accept": "application/x-ndjson"})
+            resp = conn.getresponse()
+            self.assertTrue(resp.getheader("Content-Type").startswith("application/json"))
+            self.assertEqual(json.loads(resp.read())["views"], ["t1"])
+
+            # Same connection, Accept-driven opt-in; errors are never streamed.
+            conn.request("POST", "/run", body=json.dumps({"name": "nope"}), headers={"Accept": "application/x-ndjson"})
+            resp = conn.getresponse()
+            self.assertEqual(resp.status, 404)
+            self.assertEqual(json.loads(resp.read())["error"], "Unknown view: nope")
+            conn.close()
+        finally:
+            srv.stop()
+
+    def test_if_none_match_gets_304_and_keeps_connection(self):
+        srv = _ServerThread(provider=_SleepyProvider())
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", srv.server.port, timeout=10)
+            body = json.dumps({"name": "t1", "params": {"rows": 3}})
+            conn.request("POST", "/run", body=body)
+            resp = conn.getresponse()
+            resp.read()
+            etag = resp.getheader("ETag")
+            self.assertEqual(resp.getheader("Cache-Control"), "no-cache")  # no TTL info from this provider
+            sock = conn.sock
+
+            conn.request("POST", "/run", body=body, headers={"If-None-Match": etag})
+            resp = conn.getresponse()
+            self.assertEqual((resp.status, resp.read()), (304, b""))
+            self.assertEqual(resp.getheader("ETag"), etag)
+
+            conn.request("GET", "/views/t1", headers={"If-None-Match": '"stale"'})
+            resp = conn.getresponse()
+            self.assertEqual(resp.status, 200)
+            self.assertEqual(resp.getheader("Cache-Control"), "max-age=300")
+            resp.read()
+            self.assertIs(conn.sock, sock)
+            conn.close()
+        finally:
+            srv.stop()
+
+    def test_rendering_does_not_block_other_connections(self):
+        render = async_server.render
+
+        def slow_render(status, payload, opts):
+            if "data" in payload:
+                time.sleep(0.6)  # stands in for encoding a full-market table
+            return render(status, payload, opts)
+
+        srv = _ServerThread(provider=_SleepyProvider())
+        try:
+            with mock.patch.object(async_server, "render", slow_render), ThreadPoolExecutor(max_workers=1) as pool:
+                big = pool.submit(_post_run, srv.server.port)
+                time.sleep(0.2)
+                conn = http.client.HTTPConnection("127.0.0.1", srv.server.port, timeout=10)
+                started = time.monotonic()
+                conn.request("GET", "/health")
+                self.assertEqual(conn.getresponse().status, 200)
+                self.assertLess(time.monotonic() - started, 0.3)
+                conn.close()
+                self.assertEqual(big.result()[0], 200)
+        finally:
+            srv.stop()
+
+    def test_overload_gets_503_with_retry_after(self):
+        provider = _SleepyProvider(delay=0.5)
+        srv = _ServerThread(provider=provider, workers=1, queue_limit=1, retry_after=3)
+        try:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(lambda _: _post_run(srv.server.port), range(4)))
+            statuses = sorted(r[0] for r in results)
+            self.assertEqual(statuses, [200, 200, 503, 503])
+            for status, headers, body in results:
+                if status == 503:
+                    self.assertEqual(headers["retry-after"], "3")
+                    self.assertIn("busy", body["error"])
+            self.assertEqual(provider.calls, 2)
+            # Capacity frees up once the backlog drains.
+            self.assertEqual(_post_run(srv.server.port)[0], 200)
+        finally:
+            srv.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from view_service.backtests.batch import job_id, run_batch  # noqa: E402
+
+
+def run(framework, *, value, fail=False, rule=None):
+    # Synthetic skill entry point (resolved by module path in the manifest).
+    if fail:
+        raise RuntimeError("boom")
+    return {"value": value, "rule": rule, "pid": os.getpid(), "cache_dir": str(framework.cache_dir)}
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = str(Path(self.tmp.name) / "cache")
+        self.out_dir = Path(self.tmp.name) / "out"
+        self.jobs = [{"skill": __name__, "rule": "r", "config": {"value": i}} for i in range(4)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_runs_jobs_in_pool_and_checkpoints(self):
+        summary = run_batch(self.jobs, cache_dir=self.cache_dir, out_dir=str(self.out_dir), workers=2, price_rate=0)
+        self.assertEqual((summary["done"], summary["skipped"], summary["failed"]), (4, 0, {}))
+        payloads = [json.loads((self.out_dir / f"{job_id(j)}.json").read_text()) for j in self.jobs]
+        self.assertEqual(sorted(p["result"]["value"] for p in payloads), [0, 1, 2, 3])
+        self.assertTrue(all(p["result"]["pid"] != os.getpid() for p in payloads))
+        self.assertEqual({p["result"]["rule"] for p in payloads}, {"r"})
+
+        again = run_batch(self.jobs, cache_dir=self.cache_dir, out_dir=str(self.out_dir), workers=2, price_rate=0)
+        self.assertEqual((again["done"], again["skipped"]), (0, 4))
+
+    def test_failed_jobs_are_retried_on_rerun(self):
+        jobs = self.jobs[:1] + [{"skill": __name__, "config": {"value": 9, "fail": True}}]
+        summary = run_batch(jobs, cache_dir=self.cache_dir, out_dir=str(self.out_dir), workers=1, price_rate=0)
+        self.assertEqual(summary["done"], 1)
+        self.assertEqual(list(summary["failed"].values()), ["RuntimeError: boom"])
+
+        jobs[1]["config"]["fail"] = False
+        jobs[1]["id"] = job_id({**jobs[1], "config": {"value": 9, "fail": True}})
+        summary = run_batch(jobs, cache_dir=self.cache_dir, out_dir=str(self.out_dir), workers=1, price_rate=0)
+        self.assertEqual((summary["done"], summary["skipped"]), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,7 +5,7 @@ import pandas as pd
 from view_service.backtest_framework import BacktestFramework, BacktestConfig
 
 
-def test_calculate_returns_offline_price_provider():
+def test_calculate_returns_offline_price_provider(tmp_path):
     # One signal on 2020-01-02, hold 2 trading days: 10 -> 12 (20%).
     signals = pd.DataFrame(
         [
@@ -25,14 +25,14 @@ def test_calculate_returns_offline_price_provider():
         assert symbol == "000001"
         return prices.copy()
 
-    fw = BacktestFramework(cache_dir="backtest_cache/test", price_provider=price_provider, data_provider=lambda *_: pd.DataFrame())
+    fw = BacktestFramework(cache_dir=tmp_path, price_provider=price_provider, data_provider=lambda *_: pd.DataFrame())
     out = fw.calculate_returns(signals, holding_period=2)
     assert len(out) == 1
     assert out[0].symbol == "000001"
     assert abs(out[0].return_pct - 0.2) < 1e-9
 
 
-def test_run_backtest_limits_signals():
+def test_run_backtest_limits_signals(tmp_path):
     df = pd.DataFrame(
         [
             {"交易日期": "2020-01-02", "股票代码": "000001", "信号类型": "a"},
@@ -55,7 +55,7 @@ def test_run_backtest_limits_signals():
     def price_provider(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
         return prices.copy()
 
-    fw = BacktestFramework(cache_dir="backtest_cache/test2", data_provider=data_provider, price_provider=price_provider)
+    fw = BacktestFramework(cache_dir=tmp_path, data_provider=data_provider, price_provider=price_provider)
 
     cfg = BacktestConfig(
         skill_name="x",
@@ -71,3 +71,298 @@ def test_run_backtest_limits_signals():
 
     res = fw.run_backtest(cfg, rule_func=rule_func, data_source="dummy")
     assert res.total_signals == 2
+
+
+def test_price_history_concurrent_fill_calls_upstream_once(tmp_path):
+    import threading
+    import time
+
+    calls = []
+    prices = pd.DataFrame([{"日期": "2020-01-02", "收盘": 10.0}, {"日期": "2020-01-03", "收盘": 11.0}])
+
+    def price_provider(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        calls.append(symbol)
+        time.sleep(0.2)
+        return prices.copy()
+
+    # Separate instances sharing one cache dir stand in for separate processes.
+    frameworks = [
+        BacktestFramework(cache_dir=tmp_path, price_provider=price_provider, data_provider=lambda *_: pd.DataFrame())
+        for _ in range(4)
+    ]
+    out = []
+    threads = [
+        threading.Thread(target=lambda fw=fw: out.append(fw.get_price_history("000001", "20200101", "20200110")))
+        for fw in frameworks
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["000001"]
+    assert all(len(df) == 2 for df in out)
+    assert not [p for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
+
+
+def _legacy_returns(prices: pd.DataFrame, d0: str, holding_period: int):
+    # Reference: the original per-signal loop over a [d0, d0 + max(3*hold, 30)d] window.
+    from datetime import datetime, timedelta
+
+    d1 = (datetime.strptime(d0, "%Y-%m-%d") + timedelta(days=max(holding_period * 3, 30))).strftime("%Y-%m-%d")
+    px = prices[(prices["日期"] >= d0) & (prices["日期"] <= d1)].sort_values("日期").reset_index(drop=True)
+    if px.empty:
+        return None
+    exit_i = min(holding_period, len(px) - 1)
+    period = px["收盘"].iloc[: exit_i + 1].astype(float)
+    dd = float(((period - period.cummax()) / period.cummax()).min())
+    entry, exit_ = float(px["收盘"].iloc[0]), float(px["收盘"].iloc[exit_i])
+    return entry, exit_, (exit_ - entry) / entry, dd, exit_i
+
+
+def test_vectorized_returns_match_per_signal_reference(tmp_path):
+    import numpy as np
+
+    rng = np.random.default_rng(7)
+    days = pd.bdate_range("2021-01-01", "2021-06-30").strftime("%Y-%m-%d")
+    panels = {
+        sym: pd.DataFrame({"日期": days, "收盘": 10 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))})
+        for sym in ("000001", "600000")
+    }
+    calls = []
+
+    def price_provider(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        calls.append(symbol)
+        px = panels[symbol]
+        return px[(px["日期"] >= start_date) & (px["日期"] <= end_date)].copy()
+
+    signal_days = ["2021-01-04", "2021-02-06", "2021-03-15", "20210401", "2021-06-25", "bad-date"]
+    signals = pd.DataFrame(
+        [{"交易日期": d, "股票代码": sym, "信号类型": "t"} for d in signal_days for sym in ("000001", "sh600000")]
+    )
+
+    fw = BacktestFramework(cache_dir=tmp_path, price_provider=price_provider, data_provider=lambda *_: pd.DataFrame())
+    out = fw.calculate_returns(signals, holding_period=5)
+
+    assert sorted(calls) == ["000001", "600000"]  # one price load per symbol
+    assert len(out) == 10
+    for r in out:
+        entry, exit_, ret, dd, held = _legacy_returns(panels[r.symbol], r.date, 5)
+        assert (r.entry_price, r.exit_price, r.holding_days) == (entry, exit_, held)
+        assert abs(r.return_pct - ret) < 1e-12
+        assert abs(r.max_drawdown - dd) < 1e-12
+    assert [r.date for r in out[:2]] == ["2021-01-04", "2021-01-04"]
+
+
+def test_prefetch_prices_concurrent_and_resumable(tmp_path):
+    import threading
+    import time
+
+    days = pd.bdate_range("2022-01-03", "2022-03-31").strftime("%Y-%m-%d")
+    active, peak, calls = [0], [0], []
+    lock = threading.Lock()
+
+    def price_provider(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        with lock:
+            calls.append(symbol)
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        if symbol == "000666":
+            raise RuntimeError("upstream down")
+        return pd.DataFrame({"日期": days, "收盘": 10.0})
+
+    symbols = ["000001", "000002", "600000", "600001", "300001", "000666"]
+    fw = BacktestFramework(cache_dir=tmp_path, price_provider=price_provider, data_provider=lambda *_: pd.DataFrame(), price_rate=0)
+    seen = []
+    out = fw.prefetch_prices(symbols, "2022-01-03", "2022-03-31", max_workers=3, progress=lambda *a: seen.append(a))
+
+    assert out["fetched"] == 5 and out["cached"] == 0
+    assert list(out["failed"]) == ["000666"]
+    assert peak[0] > 1
+    assert [a[0] for a in seen] == [1, 2, 3, 4, 5, 6]
+
+    # A rerun (e.g. after an interruption) only retries what is still missing.
+    calls.clear()
+    again = BacktestFramework(cache_dir=tmp_path, price_provider=price_provider, data_provider=lambda *_: pd.DataFrame())
+    out = again.prefetch_prices(symbols, "2022-02-01", "2022-02-28")
+    assert out["cached"] == 5
+    assert calls == ["000666"]
+
+
+def test_sweep_thresholds_matches_individual_runs(tmp_path):
+    import numpy as np
+
+    rng = np.random.default_rng(3)
+    days = pd.bdate_range("2021-01-01", "2021-12-31").strftime("%Y-%m-%d")
+    panels = {
+        sym: pd.DataFrame({"日期": days, "收盘": 10 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))})
+        for sym in ("000001", "000002", "600000")
+    }
+    calls = []
+
+    def price_provider(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        calls.append(symbol)
+        px = panels[symbol]
+        return px[(px["日期"] >= start_date) & (px["日期"] <= end_date)].copy()
+
+    features = pd.DataFrame(
+        {
+            "交易日期": rng.choice(days[:200], 60),
+            "股票代码": rng.choice(list(panels), 60),
+            "score": rng.uniform(0, 1, 60),
+        }
+    )
+
+    def rule(df: pd.DataFrame, thresholds: dict) -> pd.DataFrame:
+        out = df[(df["score"] >= thresholds["lo"]) & (df["score"] <= thresholds["hi"])].copy()
+        out["信号类型"] = "t"
+        return out
+
+    fw = BacktestFramework(cache_dir=tmp_path, price_provider=price_provider, data_provider=lambda *_: pd.DataFrame(), price_rate=0)
+    grid = {"lo": [0.0, 0.3], "hi": [0.6, 1.0]}
+    table = fw.sweep_thresholds(features, rule, grid, [5, 20])
+
+    assert len(table) == 8
+    assert sorted(calls) == sorted(panels)  # one price load per symbol for the whole grid
+    for row in table.to_dict(orient="records"):
+        expected = fw.analyze_results(fw.calculate_returns(rule(features, row), row["holding_period"]))
+        assert row["total_signals"] == expected["total_signals"]
+        assert abs(row["avg_return"] - expected["avg_return"]) < 1e-12
+        assert abs(row["sharpe_ratio"] - expected["sharpe_ratio"]) < 1e-12
+
+
+def test_run_backtest_multi_horizon_single_price_load(tmp_path):
+    import numpy as np
+
+    rng = np.random.default_rng(11)
+    days = pd.bdate_range("2021-01-01", "2021-09-30").strftime("%Y-%m-%d")
+    prices = pd.DataFrame({"日期": days, "收盘": 10 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))})
+    signals = pd.DataFrame({"交易日期": days[:120:7], "股票代码": "000001", "信号类型": "t"})
+    calls = []
+
+    def price_provider(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        calls.append((start_date, end_date))
+        return prices[(prices["日期"] >= start_date) & (prices["日期"] <= end_date)].copy()
+
+    fw = BacktestFramework(
+        cache_dir=tmp_path,
+        data_provider=lambda *_: signals.copy(),
+        price_provider=price_provider,
+        price_rate=0,
+    )
+    horizons = [1, 3, 5, 10, 20]
+    cfg = BacktestConfig(skill_name="t", start_date="2021-01-01", end_date="2021-06-30", holding_period=horizons, thresholds={})
+    res = fw.run_backtest(cfg, rule_func=lambda df, th: df, data_source="dummy")
+
+    assert len(calls) == 1
+    assert sorted(res.horizons) == horizons
+    assert res.avg_return == res.horizons[1]["avg_return"]
+    for h in horizons:
+        single = fw.analyze_results(fw.calculate_returns(signals, h))
+        assert abs(res.horizons[h]["avg_return"] - single["avg_return"]) < 1e-12
+        assert res.horizons[h]["total_signals"] == single["total_signals"]
+    assert set(res.to_dict()["horizons"]) == {"1", "3", "5", "10", "20"}
+
+
+def test_incremental_backtest_appends_and_rescoring_open_signals(tmp_path):
+    import shutil
+    from datetime import date, timedelta
+
+    import numpy as np
+
+    today = date.today()
+    days = pd.bdate_range(today - timedelta(days=120), today - timedelta(days=1)).strftime("%Y-%m-%d")
+    rng = np.random.default_rng(5)
+    prices = pd.DataFrame({"日期": days, "收盘": 10 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))})
+    events = pd.DataFrame({"交易日期": days, "股票代码": "000001", "score": rng.uniform(0, 1, len(days))})
+    events.loc[events.index[-12:], "score"] = 1.0
+    as_of = {"date": days[-8]}
+    data_calls = []
+
+    def data_provider(data_source, start_date, end_date, kwargs):
+        data_calls.append((kwargs["start_date"], kwargs["end_date"]))
+        s, e = kwargs["start_date"], kwargs["end_date"]
+        return events[(events["交易日期"] >= s) & (events["交易日期"] <= e)].copy()
+
+    def price_provider(symbol, start_date, end_date):
+        px = prices[prices["日期"] <= as_of["date"]]
+        return px[(px["日期"] >= start_date) & (px["日期"] <= end_date)].copy()
+
+    def rule(df, thresholds):
+        return df[df["score"] >= thresholds["min_score"]].assign(信号类型="t")
+
+    def cfg(end):
+        return BacktestConfig(skill_name="s", start_date=days[0], end_date=end, holding_period=5, thresholds={"min_score": 0.3})
+
+    fw = BacktestFramework(cache_dir=tmp_path, data_provider=data_provider, price_provider=price_provider, price_rate=0)
+    first = fw.run_backtest_incremental(cfg(as_of["date"]), rule, "dummy", start_date=days[0], end_date=as_of["date"])
+    assert any(r.holding_days < 5 for r in first.signals)  # some windows still open
+
+    # Next run: more data available upstream (drop the price store to simulate newly published bars).
+    shutil.rmtree(tmp_path / "prices")
+    as_of["date"] = days[-1]
+    fw = BacktestFramework(cache_dir=tmp_path, data_provider=data_provider, price_provider=price_provider, price_rate=0)
+    second = fw.run_backtest_incremental(cfg(days[-1]), rule, "dummy", start_date=days[0], end_date=days[-1])
+
+    assert data_calls[-1][0] > days[-8]  # only the new window was fetched
+    full_fw = BacktestFramework(cache_dir=tmp_path / "full", data_provider=data_provider, price_provider=price_provider, price_rate=0)
+    full = full_fw.run_backtest(cfg(days[-1]), rule, "dummy", start_date=days[0], end_date=days[-1])
+    key = lambda rs: [(r.date, r.holding_days, round(r.return_pct, 12)) for r in rs]  # noqa: E731
+    assert key(second.signals) == key(full.signals)
+    assert second.total_signals > first.total_signals
+
+
+def test_benchmark_excess_returns_single_index_fetch(tmp_path):
+    import numpy as np
+
+    rng = np.random.default_rng(5)
+    days = pd.bdate_range("2021-01-01", "2021-06-30").strftime("%Y-%m-%d")
+    index = pd.DataFrame({"日期": days, "收盘": 4000 * np.exp(np.cumsum(rng.normal(0, 0.01, len(days))))})
+    stocks = {s: pd.DataFrame({"日期": days, "收盘": 10 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))}) for s in ("000001", "600000")}
+    # 600000 skips a few days (suspension): the index is aligned to its actual entry/exit bars.
+    stocks["600000"] = stocks["600000"].drop(index=[20, 21, 22]).reset_index(drop=True)
+    signals = pd.DataFrame({"交易日期": list(days[:80:4]) * 2, "股票代码": ["000001"] * 20 + ["600000"] * 20, "信号类型": "t"})
+    index_calls = []
+
+    def index_provider(code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        index_calls.append(code)
+        return index[(index["日期"] >= start_date) & (index["日期"] <= end_date)].copy()
+
+    fw = BacktestFramework(
+        cache_dir=tmp_path,
+        data_provider=lambda *_: signals.copy(),
+        price_provider=lambda s, a, b: stocks[s][(stocks[s]["日期"] >= a) & (stocks[s]["日期"] <= b)].copy(),
+        index_provider=index_provider,
+        price_rate=0,
+    )
+    fwd = fw.forward_returns(signals, [5, 10], benchmark="csi300")
+    assert index_calls == ["000300"]
+
+    closes = index.set_index("日期")["收盘"]
+    for i, row in fwd.iterrows():
+        px = stocks[row["symbol"]]
+        e = int(np.searchsorted(px["日期"].to_numpy(), row["date"]))
+        x = e + int(row["holding_days_5"])
+        expected = closes[px["日期"].iloc[x]] / closes[px["日期"].iloc[e]] - 1
+        assert abs(row["benchmark_return_5"] - expected) < 1e-12
+        assert abs(row["excess_return_5"] - (row["return_5"] - expected)) < 1e-12
+
+    cfg = BacktestConfig(
+        skill_name="t", start_date="2021-01-01", end_date="2021-06-30", holding_period=[5, 10], thresholds={}, benchmark="000300"
+    )
+    res = fw.run_backtest(cfg, rule_func=lambda df, th: df, data_source="dummy")
+    assert index_calls == ["000300"]  # served from the price store
+    assert abs(res.excess["avg_return"] - fwd["excess_return_5"].mean()) < 1e-12
+    assert abs(res.horizons[10]["excess"]["avg_return"] - fwd["excess_return_10"].mean()) < 1e-12
+    assert res.signals[0].excess_return is not None
+    out = res.to_dict()
+    assert out["config"]["benchmark"] == "000300"
+    assert out["excess_vs_benchmark"]["total_signals"] == 40
+    assert "excess_vs_benchmark" not in fw.run_backtest(
+        BacktestConfig(skill_name="t", start_date="2021-01-01", end_date="2021-06-30", holding_period=5, thresholds={}),
+        rule_func=lambda df, th: df,
+        data_source="dummy",
+    ).to_dict()
@@ -0,0 +1,51 @@
+import sys
+import tracemalloc
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from view_service import bench_backtest  # noqa: E402
+from view_service.bench_backtest import compare, run_benchmarks  # noqa: E402
+
+
+class TestBenchBacktest(unittest.TestCase):
+    def test_tiny_run_is_offline_and_complete(self):
+        report = run_benchmarks(["tiny"])
+        cases = {r["case"]: r for r in report["results"]}
+        for name in ("calculate_returns", "analyze_results", "enrich_block_deal_features", "historical_data.read"):
+            self.assertIn(name, cases)
+            self.assertGreaterEqual(cases[name]["seconds"], 0)
+            self.assertGreaterEqual(cases[name]["peak_mb"], 0)
+        # prefetch fills the price store; later cases are served from it
+        self.assertEqual(cases["prefetch_prices.cold"]["upstream_calls"], 5)
+        self.assertEqual(cases["price_store.read"]["upstream_calls"], 0)
+        self.assertEqual(cases["historical_data.write"]["upstream_calls"], 1)
+        self.assertEqual(cases["historical_data.read"]["upstream_calls"], 0)
+
+    def test_timings_are_taken_without_tracing(self):
+        tracing = []
+        timed = bench_backtest._timed
+
+        def spy(fn):
+            tracing.append(tracemalloc.is_tracing())
+            return timed(fn)
+
+        with mock.patch.object(bench_backtest, "_timed", spy):
+            rows = bench_backtest.run_size(bench_backtest.SIZES["tiny"])
+        self.assertEqual(tracing, [False] * len(rows))
+        self.assertTrue(all(r["seconds"] is not None and r["peak_mb"] is not None for r in rows))
+
+    def test_compare_flags_slowdowns(self):
+        base = {"results": [{"case": "a", "size": "tiny", "seconds": 1.0}, {"case": "b", "size": "tiny", "seconds": 1.0}]}
+        now = {"results": [{"case": "a", "size": "tiny", "seconds": 1.1}, {"case": "b", "size": "tiny", "seconds": 2.0}]}
+        self.assertEqual([r["case"] for r in compare(now, base)], ["b"])
+
+    def test_unknown_size(self):
+        with self.assertRaises(ValueError):
+            run_benchmarks(["huge"])
+
+
+if __name__ == "__main__":
+    unittest.main()
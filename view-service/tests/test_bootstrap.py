@@ -0,0 +1,48 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from view_service.backtest_framework import BacktestFramework, SignalResult  # noqa: E402
+from view_service.bootstrap import bootstrap_ci  # noqa: E402
+
+
+def _results(returns):
+    return [SignalResult("2020-01-02", "000001", "t", 10.0, 10.0 * (1 + r), float(r), 0.0, 5) for r in returns]
+
+
+class TestBootstrap(unittest.TestCase):
+    def setUp(self):
+        self.returns = np.random.default_rng(0).normal(0.01, 0.05, 400)
+
+    def test_seeded_and_independent_of_batch_size(self):
+        a = bootstrap_ci(self.returns, n_resamples=1500, seed=42)
+        b = bootstrap_ci(self.returns, n_resamples=1500, seed=42, max_batch_mb=0.05)
+        self.assertEqual(a, b)
+        c = bootstrap_ci(self.returns, n_resamples=1500, seed=43)
+        self.assertNotEqual(a["avg_return"], c["avg_return"])
+
+    def test_intervals_bracket_point_estimates(self):
+        stats = BacktestFramework.analyze_results(_results(self.returns), bootstrap=2000, seed=1)
+        ci = stats["ci"]
+        for metric in ("avg_return", "win_rate", "profit_loss_ratio", "sharpe_ratio"):
+            low, high = ci[metric]
+            self.assertLess(low, high)
+            self.assertTrue(low <= stats[metric] <= high, metric)
+
+    def test_block_bootstrap_and_degenerate_inputs(self):
+        ci = bootstrap_ci(self.returns, n_resamples=500, block_size=10, seed=0)
+        self.assertEqual((ci["method"], ci["block_size"]), ("block", 10))
+        self.assertEqual(bootstrap_ci(np.array([]), n_resamples=100)["avg_return"], [None, None])
+        # All wins: profit/loss ratio is 0 by definition, never NaN.
+        self.assertEqual(bootstrap_ci(np.array([0.01, 0.02]), n_resamples=100, seed=0)["profit_loss_ratio"], [0.0, 0.0])
+
+    def test_disabled_by_default(self):
+        self.assertNotIn("ci", BacktestFramework.analyze_results(_results(self.returns)))
+
+
+if __name__ == "__main__":
+    unittest.main()
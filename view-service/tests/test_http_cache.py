@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import http.client
+import json
+import sys
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "view-service"))
+
+from view_service.http_cache import not_modified, validators_for, view_validators  # noqa: E402
+from view_service.http_server import ViewServiceHandler  # noqa: E402
+from view_service.provider_base import ToolProvider, ToolResult  # noqa: E402
+from view_service.views_cn import ViewSpec  # noqa: E402
+
+AS_OF = "2026-10-16T15:00:00+00:00"
+
+
+class _CachedProvider(ToolProvider):
+    def __init__(self) -> None:
+        self.as_of = AS_OF
+
+    def call_tool(self, name: str, args: dict[str, Any], *, refresh: bool, meta_script: str) -> ToolResult:
+        _ = refresh, meta_script
+        meta = {"function": name, "params": args, "as_of": self.as_of, "cache": {"hit": True, "ttl_seconds": 3600, "age_seconds": 600.0}}
+        return ToolResult(meta=meta, data=[{"代码": "000001", "最新价": 10.5}], warnings=[], errors=[])
+
+
+def _envelope(as_of: str = AS_OF, ttl: float | None = 3600, age: float = 600.0, errors: list[str] | None = None) -> dict[str, Any]:
+    res = {"meta": {"function": "t1", "params": {}, "as_of": as_of, "cache": {"hit": True, "ttl_seconds": ttl, "age_seconds": age}}, "data": [1]}
+    return {"meta": {"view": "t1", "params": {}, "as_of": "now"}, "data": {"t1": res}, "warnings": [], "errors": errors or []}
+
+
+class HttpCacheTests(unittest.TestCase):
+    def test_view_validators(self) -> None:
+        v = view_validators(_envelope(), variant="json")
+        self.assertEqual(v.cache_control, "max-age=3000")
+        self.assertTrue(v.etag.startswith('W/"'))
+        self.assertEqual(v.etag, view_validators(_envelope(), variant="json").etag)
+        self.assertNotEqual(v.etag, view_validators(_envelope("2026-10-17T09:30:00+00:00"), variant="json").etag)
+        self.assertNotEqual(v.etag, view_validators(_envelope(), variant="columnar:").etag)
+        self.assertIn(("Last-Modified", "Fri, 16 Oct 2026 15:00:00 GMT"), v.headers())
+        # Closed history windows never expire in-process but are only advertised for the finite historical TTL.
+        self.assertEqual(view_validators(_envelope(ttl=float("inf")), variant="json").cache_control, "max-age=300")
+        closed = _envelope(ttl=None)
+        closed["data"]["t1"]["meta"]["cache"]["ttl_class"] = "historical"
+        self.assertEqual(view_validators(closed, variant="json").cache_control, "max-age=300")
+        # POST responses (/run, /run/batch) never carry max-age; the ETag is the same.
+        post = view_validators(_envelope(), variant="json", method="POST")
+        self.assertEqual((post.cache_control, post.etag), ("no-cache", v.etag))
+        self.assertEqual(view_validators(_envelope(errors=["boom"]), variant="json").cache_control, "no-store")
+        self.assertEqual(validators_for("/health", {"ok": True}).cache_control, "no-store")
+
+    def test_not_modified(self) -> None:
+        v = view_validators(_envelope(), variant="json")
+        self.assertTrue(not_modified(v, v.etag.removeprefix("W/"), None))
+        self.assertTrue(not_modified(v, f'"other", {v.etag}', None))
+        self.assertTrue(not_modified(v, "*", None))
+        self.assertFalse(not_modified(v, '"other"', None))
+        self.assertTrue(not_modified(v, None, "Sat, 17 Oct 2026 00:00:00 GMT"))
+        self.assertFalse(not_modified(v, '"other"', "Sat, 17 Oct 2026 00:00:00 GMT"))
+        self.assertFalse(not_modified(view_validators(_envelope(errors=["x"]), variant="json"), "*", None))
+
+    def test_server_answers_304(self) -> None:
+        provider = _CachedProvider()
+        ViewServiceHandler.views = {"t1": ViewSpec(name="t1", kind="tool_view", description="", params_schema={}, module=None)}
+        ViewServiceHandler.provider = provider
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), ViewServiceHandler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        body = json.dumps({"name": "t1", "params": {}})
+
+        def post(headers: dict[str, str]) -> tuple[int, dict[str, str], bytes]:
+            conn = http.client.HTTPConnection("127.0.0.1", httpd.server_address[1], timeout=10)
+            try:
+                conn.request("POST", "/run", body=body, headers=headers)
+                resp = conn.getresponse()
+                return resp.status, {k.lower(): v for k, v in resp.getheaders()}, resp.read()
+            finally:
+                conn.close()
+
+        try:
+            status, headers, raw = post({})
+            self.assertEqual(status, 200)
+            self.assertEqual(headers["cache-control"], "no-cache")
+            self.assertEqual(headers["last-modified"], "Fri, 16 Oct 2026 15:00:00 GMT")
+            etag = headers["etag"]
+
+            status, headers, raw = post({"If-None-Match": etag})
+            self.assertEqual((status, raw), (304, b""))
+            self.assertEqual(headers["etag"], etag)
+
+            provider.as_of = "2026-10-17T09:30:00+00:00"
+            status, headers, _ = post({"If-None-Match": etag})
+            self.assertEqual(status, 200)
+            self.assertNotEqual(headers["etag"], etag)
+
+            # GET /run is the cacheable form: TTL-based max-age and standard conditional responses.
+            conn = http.client.HTTPConnection("127.0.0.1", httpd.server_address[1], timeout=10)
+            target = "/run?" + urlencode({"name": "t1", "params": json.dumps({})})
+            conn.request("GET", target)
+            resp = conn.getresponse()
+            self.assertEqual(json.loads(resp.read())["data"]["t1"]["data"], [{"代码": "000001", "最新价": 10.5}])
+            self.assertEqual(resp.getheader("Cache-Control"), "max-age=3000")
+            get_etag = resp.getheader("ETag")
+            conn.request("GET", target, headers={"If-None-Match": get_etag})
+            resp = conn.getresponse()
+            self.assertEqual((resp.status, resp.read()), (304, b""))
+            conn.request("GET", "/run?name=t1&params=not-json")
+            resp = conn.getresponse()
+            self.assertEqual(resp.status, 400)
+            resp.read()
+            conn.close()
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
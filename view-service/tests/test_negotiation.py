@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import gzip
+import http.client
+import json
+import sys
+import threading
+import unittest
+import zlib
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "view-service"))
+
+from view_service.http_server import ViewServiceHandler  # noqa: E402
+from view_service.negotiation import ResponseOptions, negotiate, render, to_columnar  # noqa: E402
+from view_service.provider_base import ToolProvider, ToolResult  # noqa: E402
+from view_service.views_cn import ViewSpec  # noqa: E402
+
+
+class _TableProvider(ToolProvider):
+    def call_tool(self, name: str, args: dict[str, Any], *, refresh: bool, meta_script: str) -> ToolResult:
+        _ = refresh, meta_script
+        rows = [
+            {"代码": f"{i:06d}", "名称": f"股票{i}", "最新价": i / 100, "涨跌幅": "-" if i % 7 == 0 else i / 1000}
+            for i in range(int(args.get("rows", 0)))
+        ]
+        return ToolResult(meta={"function": name}, data=rows, warnings=[], errors=[])
+
+
+def _envelope(rows: int) -> dict[str, Any]:
+    data = _TableProvider().call_tool("t1", {"rows": rows}, refresh=False, meta_script="").to_dict()
+    return {"meta": {"view": "t1"}, "data": {"t1": data, "info": {"meta": {}, "data": {"k": 1}}}, "warnings": [], "errors": []}
+
+
+class NegotiationTests(unittest.TestCase):
+    def test_negotiate(self) -> None:
+        opts = negotiate("application/vnd.finskills.columnar+json, application/json;q=0.9", "br;q=1, gzip;q=0.5, deflate")
+        self.assertEqual((opts.format, opts.encoding, opts.stream), ("columnar", "gzip", False))
+        self.assertEqual(negotiate(None, "gzip;q=0, deflate").encoding, "deflate")
+        self.assertIsNone(negotiate(None, "identity").encoding)
+        self.assertEqual(negotiate("application/json", None, b'{"format": "arrow", "table": "t1"}').table, "t1")
+
+    def test_accept_q_values(self) -> None:
+        self.assertEqual(negotiate("application/vnd.finskills.columnar+json;q=0, application/json", None).format, "json")
+        self.assertEqual(negotiate("application/json;q=0.5, application/vnd.apache.arrow.stream", None).format, "arrow")
+        self.assertEqual(
+            negotiate("application/vnd.apache.arrow.stream;q=0.2, application/vnd.finskills.columnar+json;q=0.8", None).format,
+            "columnar",
+        )
+        self.assertEqual(negotiate("*/*;q=0.9, application/vnd.finskills.columnar+json;q=0.1", None).format, "json")
+        self.assertEqual(negotiate("text/html", None).format, "json")
+        self.assertFalse(negotiate("application/x-ndjson;q=0, application/json", None).stream)
+        self.assertTrue(negotiate("application/x-ndjson", None).stream)
+
+    def test_columnar_is_smaller_and_leaves_input_alone(self) -> None:
+        env = _envelope(2000)
+        col = to_columnar(env)
+        self.assertIsInstance(env["data"]["t1"]["data"], list)
+        table = col["data"]["t1"]["data"]
+        self.assertEqual(table["columns"], ["代码", "名称", "最新价", "涨跌幅"])
+        self.assertEqual([dict(zip(table["columns"], r)) for r in table["rows"]], env["data"]["t1"]["data"])
+        self.assertEqual(col["data"]["info"], env["data"]["info"])
+
+        _, plain, _ = render(200, env, ResponseOptions())
+        _, compact, headers = render(200, env, ResponseOptions(format="columnar", encoding="gzip"))
+        self.assertIn(("Content-Encoding", "gzip"), headers)
+        self.assertLess(len(compact) * 10, len(plain))
+        self.assertEqual(json.loads(gzip.decompress(compact)), col)
+
+    def test_arrow_ipc(self) -> None:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            self.skipTest("pyarrow not installed")
+        status, raw, headers = render(200, _envelope(50), ResponseOptions(format="arrow"))
+        self.assertEqual(status, 200)
+        self.assertIn(("Content-Type", "application/vnd.apache.arrow.stream"), headers)
+        tbl = pa.ipc.open_stream(raw).read_all()
+        self.assertEqual(tbl.num_rows, 50)
+        self.assertEqual(tbl.column("涨跌幅").type, pa.string())  # mixed "-" / float column
+        self.assertEqual(json.loads(tbl.schema.metadata[b"finskills"])["table"], "t1")
+
+        status, raw, _ = render(200, {"meta": {}, "data": {}}, ResponseOptions(format="arrow"))
+        self.assertEqual(status, 406)
+
+    def test_server_and_remote_runner_round_trip(self) -> None:
+        sys.path.insert(0, str(REPO_ROOT / "China-market" / "findata-toolkit-cn" / "scripts"))
+        import views_runner
+
+        ViewServiceHandler.views = {"t1": ViewSpec(name="t1", kind="tool_view", description="", params_schema={}, module=None)}
+        ViewServiceHandler.provider = _TableProvider()
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), ViewServiceHandler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{httpd.server_address[1]}/run"
+        body = {"name": "t1", "params": {"rows": 500}}
+        try:
+            status, plain = views_runner._remote_request_json("POST", url, body=body)
+            status_c, compact = views_runner._remote_request_json("POST", url, body=body, compact=True)
+            self.assertEqual((status, status_c), (200, 200))
+            for payload in (plain, compact):
+                payload["meta"].pop("as_of")
+                payload["meta"].pop("elapsed_seconds")
+            self.assertEqual(compact, plain)
+
+            conn = http.client.HTTPConnection("127.0.0.1", httpd.server_address[1], timeout=10)
+            conn.request("POST", "/run", body=json.dumps({**body, "format": "columnar"}), headers={"Accept-Encoding": "deflate"})
+            resp = conn.getresponse()
+            self.assertEqual(resp.getheader("Content-Encoding"), "deflate")
+            self.assertEqual(json.loads(zlib.decompress(resp.read()))["meta"]["format"], "columnar")
+            conn.close()
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from view_service.backtest_framework import BacktestFramework  # noqa: E402
+from view_service.portfolio import PortfolioConfig, board_limit_pct  # noqa: E402
+
+
+DAYS = pd.bdate_range("2021-03-01", periods=10).strftime("%Y-%m-%d").tolist()
+CLOSES = {
+    "000001": [10, 10, 10, 11, 11, 11, 11, 11, 11, 11],  # limit-up on day 3
+    "000002": [10, 10, 10.5, 10.5, 10.5, 10.5, 10.5, 10.5, 10.5, 10.5],
+    "600000": [10] * 10,
+    "000004": [10, 10, 10, 10, 10, 10, 10, 9.0, 9.1, 9.1],  # limit-down on day 7
+}
+
+
+class TestPortfolioSimulator(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+        def price_provider(symbol, start_date, end_date):
+            px = pd.DataFrame({"日期": DAYS, "收盘": CLOSES[symbol]})
+            return px[(px["日期"] >= start_date) & (px["日期"] <= end_date)]
+
+        self.fw = BacktestFramework(cache_dir=self.tmp.name, price_provider=price_provider, price_rate=0)
+        self.signals = pd.DataFrame(
+            [
+                {"交易日期": DAYS[0], "股票代码": "000002", "信号类型": "t"},
+                {"交易日期": DAYS[1], "股票代码": "600000", "信号类型": "t"},  # no free slot
+                {"交易日期": DAYS[3], "股票代码": "000001", "信号类型": "t"},  # limit-up: cannot buy
+                {"交易日期": DAYS[5], "股票代码": "000004", "信号类型": "t"},
+            ]
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _cfg(self, **kw):
+        base = dict(holding_period=2, initial_capital=1000.0, position_size=0.5, max_positions=1,
+                    commission_bps=0, slippage_bps=0, stamp_duty_bps=0, lot_size=0)
+        return PortfolioConfig(**{**base, **kw})
+
+    def test_capacity_limits_and_fills(self):
+        res = self.fw.simulate_portfolio(self.signals, self._cfg(), end_date=DAYS[-1])
+        trades = res.trades.set_index("symbol")
+        self.assertEqual(sorted(trades.index), ["000002", "000004"])
+        self.assertEqual(res.stats["skipped_signals"]["capacity"], 1)
+        self.assertEqual(res.stats["skipped_signals"]["limit_up"], 1)
+
+        self.assertEqual(trades.loc["000002", "exit_date"], DAYS[2])
+        self.assertAlmostEqual(trades.loc["000002", "pnl"], 25.0)
+        # Limit-down on the due date: the exit slips to the next day.
+        self.assertEqual(trades.loc["000004", "exit_date"], DAYS[8])
+        self.assertEqual(trades.loc["000004", "holding_days"], 3)
+        self.assertAlmostEqual(res.equity.iloc[-1], 1025.0 + 51.25 * (9.1 - 10.0))
+        self.assertAlmostEqual(res.stats["max_drawdown"], (1025.0 + 51.25 * (9.0 - 10.0)) / 1025.0 - 1.0)
+        self.assertEqual(res.positions.max(), 1)
+        self.assertAlmostEqual(res.turnover.iloc[0], 0.5)
+
+    def test_limit_up_on_first_bar_uses_prior_close(self):
+        # 000001 is limit-up on DAYS[3]; a signal on that day is the earliest one, so the panel starts there.
+        signals = pd.DataFrame([{"交易日期": DAYS[3], "股票代码": "000001", "信号类型": "t"}])
+        res = self.fw.simulate_portfolio(signals, self._cfg(), end_date=DAYS[-1])
+        self.assertEqual(res.stats["skipped_signals"]["limit_up"], 1)
+        self.assertTrue(res.trades.empty)
+        self.assertEqual(res.equity.index[0], DAYS[3])
+
+    def test_costs_and_lots(self):
+        res = self.fw.simulate_portfolio(
+            self.signals.iloc[:1], self._cfg(commission_bps=10, slippage_bps=0, stamp_duty_bps=10, lot_size=10), end_date=DAYS[-1]
+        )
+        trade = res.trades.iloc[0]
+        self.assertEqual(trade["shares"], 40)  # 500 / (10 * 1.001) -> 49.9 -> 40 in lots of 10
+        expected = 1000.0 - 40 * 10 * 1.001 + 40 * 10.5 * (1 - 0.002)
+        self.assertAlmostEqual(res.equity.iloc[-1], expected)
+
+    def test_board_limits(self):
+        self.assertEqual(board_limit_pct("600000"), 0.10)
+        self.assertEqual(board_limit_pct("300750"), 0.20)
+        self.assertEqual(board_limit_pct("830799"), 0.30)
+
+
+if __name__ == "__main__":
+    unittest.main()
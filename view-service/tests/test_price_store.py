@@ -0,0 +1,88 @@
+import sys
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from view_service.price_store import PriceStore  # noqa: E402
+
+
+DAYS = pd.bdate_range("2022-01-03", "2022-12-30").strftime("%Y-%m-%d")
+PANEL = pd.DataFrame({"日期": DAYS, "收盘": range(len(DAYS))})
+
+
+class TestPriceStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.calls = []
+
+        def fetch(symbol, start, end):
+            self.calls.append((symbol, start, end))
+            return PANEL[(PANEL["日期"] >= start) & (PANEL["日期"] <= end)].copy()
+
+        self.store = PriceStore(Path(self.tmp.name), fetch)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sub_windows_are_served_locally(self):
+        a = self.store.get("000001", "2022-03-01", "2022-06-30")
+        b = self.store.get("000001", "2022-04-01", "2022-04-30")
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(b["日期"].min(), "2022-04-01")
+        self.assertEqual(b["日期"].max(), "2022-04-29")
+        self.assertTrue(set(b["日期"]).issubset(set(a["日期"])))
+
+    def test_only_missing_edges_are_fetched(self):
+        self.store.get("000001", "2022-03-01", "2022-03-31")
+        out = self.store.get("000001", "2022-02-01", "2022-04-30")
+        self.assertEqual(
+            self.calls[1:],
+            [("000001", "2022-02-01", "2022-02-28"), ("000001", "2022-04-01", "2022-04-30")],
+        )
+        expected = PANEL[(PANEL["日期"] >= "2022-02-01") & (PANEL["日期"] <= "2022-04-30")]
+        self.assertEqual(out["日期"].tolist(), expected["日期"].tolist())
+        self.assertEqual(self.store.coverage("000001")[0].isoformat(), "2022-02-01")
+
+    def test_coverage_only_grows_over_returned_bars(self):
+        answers = [pd.DataFrame(), PANEL[(PANEL["日期"] >= "2022-03-01") & (PANEL["日期"] <= "2022-03-31")]]
+        store = PriceStore(Path(self.tmp.name) / "flaky", lambda *a: answers.pop(0) if answers else PANEL.iloc[:0])
+        self.assertTrue(store.get("000001", "2022-03-01", "2022-03-31").empty)  # transient empty answer
+        self.assertIsNone(store.coverage("000001"))
+        self.assertEqual(len(store.get("000001", "2022-02-26", "2022-04-03")), 23)
+        self.assertEqual(store.coverage("000001"), (date(2022, 2, 26), date(2022, 4, 3)))
+
+        self.store.get("000001", "2022-03-01", "2022-03-31")
+        self.store._fetch = lambda *a: pd.DataFrame()
+        self.store.get("000001", "2022-01-03", "2022-06-30")  # both edges come back empty
+        self.assertEqual(self.store.coverage("000001"), (date(2022, 3, 1), date(2022, 3, 31)))
+
+    def test_weekend_edges_are_covered(self):
+        # Starts on a Saturday and ends on a Sunday; repeat calls are served locally.
+        for _ in range(3):
+            out = self.store.get("000001", "2022-01-08", "2022-02-06")
+        self.assertEqual(len(self.calls), 1)
+        self.assertTrue(self.store.covers("000001", "2022-01-08", "2022-02-06"))
+        self.assertEqual((out["日期"].min(), out["日期"].max()), ("2022-01-10", "2022-02-04"))
+
+    def test_invalidate_removes_entry_and_lock(self):
+        self.store.get("000001", "2022-03-01", "2022-03-31")
+        self.assertTrue((Path(self.tmp.name) / ".locks" / "000001.lock").exists())
+        self.assertTrue(self.store.invalidate("000001"))
+        self.assertEqual(sorted(p.name for p in Path(self.tmp.name).rglob("*") if p.is_file()), [])
+        self.assertFalse(self.store.invalidate("000001"))
+        self.store.get("000001", "2022-03-01", "2022-03-31")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_store_persists_across_instances(self):
+        self.store.get("600000", "20220103", "20220228")
+        other = PriceStore(Path(self.tmp.name), lambda *a: self.fail("unexpected upstream call"))
+        self.assertEqual(len(other.get("600000", "2022-01-10", "2022-01-14")), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import math
+import sys
+import time
+import unittest
+from pathlib import Path
+from typing import Any
+
+# Ensure `view-service/` is importable when running from repo root.
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "view-service"))
+
+from view_service.provider_akshare import AkshareProvider  # noqa: E402
+from view_service.provider_base import ToolResult  # noqa: E402
+from view_service.result_cache import CacheTTL, ResultCache, estimate_nbytes, get_ttl, ttl_class  # noqa: E402
+from view_service.tool_registry import ToolRegistry  # noqa: E402
+
+
+def _registry(*names: str) -> ToolRegistry:
+    index = {
+        n: {
+            "type": "function",
+            "function": {
+                "name": n,
+                "parameters": {"type": "object", "properties": {"symbol": {"type": "string"}, "end_date": {"type": "string"}}},
+            },
+        }
+        for n in names
+    }
+    return ToolRegistry(tools_path=Path("tools.json"), tool_index=index)
+
+
+class _CountingProvider(AkshareProvider):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.upstream_calls: list[tuple[str, dict[str, Any]]] = []
+
+    def _call_upstream(self, name: str, args: dict[str, Any], *, meta_script: str) -> ToolResult:
+        self.upstream_calls.append((name, dict(args)))
+        return ToolResult(meta={"function": name, "script": meta_script}, data=[{"n": len(self.upstream_calls)}], warnings=[], errors=[])
+
+
+class ResultCacheTests(unittest.TestCase):
+    def test_ttl_class_matches_cache_manager_heuristics(self) -> None:
+        self.assertEqual(ttl_class("stock_zh_a_spot_em"), "realtime")
+        self.assertEqual(ttl_class("stock_zh_a_hist"), "historical")
+        self.assertEqual(ttl_class("stock_info_a_code_name"), "static")
+        self.assertEqual(ttl_class("stock_market_fund_flow"), "default")
+
+    def test_historical_ttl_is_finite_unless_window_is_closed(self) -> None:
+        self.assertEqual(get_ttl("stock_zh_a_hist"), CacheTTL.historical)
+        self.assertEqual(get_ttl("stock_zh_a_hist", args={"end_date": "20500101"}), CacheTTL.historical)
+        self.assertEqual(get_ttl("stock_zh_a_hist_min_em", args={"end_date": "2222-01-01 09:32:00"}), CacheTTL.historical)
+        self.assertEqual(get_ttl("stock_zh_a_hist", args={"end_date": time.strftime("%Y%m%d")}), CacheTTL.historical)
+        self.assertTrue(math.isinf(get_ttl("stock_zh_a_hist", args={"end_date": "2024-06-28"})))
+        self.assertEqual(get_ttl("stock_zh_a_spot_em", args={"end_date": "20240628"}), CacheTTL.realtime)
+
+    def test_meta_never_carries_non_finite_ttl(self) -> None:
+        provider = _CountingProvider(registry=_registry("stock_zh_a_hist"), cache=ResultCache())
+        args = {"symbol": "000001", "end_date": "20240628"}
+        for _ in range(2):
+            res = provider.call_tool("stock_zh_a_hist", args, refresh=False, meta_script="t")
+            self.assertEqual((res.meta["cache"]["ttl_class"], res.meta["cache"]["ttl_seconds"]), ("historical", None))
+            json.dumps(res.meta, allow_nan=False)
+        self.assertEqual(len(provider.upstream_calls), 1)
+        open_ended = provider.call_tool("stock_zh_a_hist", {"symbol": "000001"}, refresh=False, meta_script="t")
+        self.assertEqual(open_ended.meta["cache"]["ttl_seconds"], CacheTTL.historical)
+
+    def test_lru_evicts_by_entry_count_and_bytes(self) -> None:
+        cache = ResultCache(max_entries=2, max_bytes=100)
+        cache.put("a", "x", ttl=60, nbytes=10)
+        cache.put("b", "y", ttl=60, nbytes=10)
+        self.assertIsNotNone(cache.get("a"))  # touch a -> b is LRU
+        cache.put("c", "z", ttl=60, nbytes=10)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+
+        cache.put("big", "w", ttl=60, nbytes=90)
+        self.assertLessEqual(cache.stats()["bytes"], 100)
+        self.assertFalse(cache.put("huge", "v", ttl=60, nbytes=101))
+
+    def test_estimate_nbytes_samples_long_tables(self) -> None:
+        rows = [{"code": f"{i:06d}", "name": "浦发银行", "close": 10.5 + i} for i in range(5000)]
+        exact = len(json.dumps(rows, ensure_ascii=False).encode("utf-8"))
+        est = estimate_nbytes(rows)
+        self.assertLess(abs(est - exact) / exact, 0.05)
+        wrapped = estimate_nbytes({"rows": rows, "source": "em"})
+        self.assertLess(abs(wrapped - exact) / exact, 0.05)
+        self.assertEqual(estimate_nbytes([1, 2]), len(b"[1, 2]"))
+
+    def test_expired_entries_miss(self) -> None:
+        cache = ResultCache()
+        cache.put("k", 1, ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("k"))
+
+    def test_provider_hit_miss_and_refresh(self) -> None:
+        provider = _CountingProvider(registry=_registry("stock_market_fund_flow"), cache=ResultCache())
+        first = provider.call_tool("stock_market_fund_flow", {"symbol": 1}, refresh=False, meta_script="t")
+        second = provider.call_tool("stock_market_fund_flow", {"symbol": "1"}, refresh=False, meta_script="t")
+        self.assertEqual(len(provider.upstream_calls), 1)
+        self.assertFalse(first.meta["cache"]["hit"])
+        self.assertTrue(second.meta["cache"]["hit"])
+        self.assertIn("age_seconds", second.meta["cache"])
+        self.assertEqual(second.data, first.data)
+
+        third = provider.call_tool("stock_market_fund_flow", {"symbol": "1"}, refresh=True, meta_script="t")
+        self.assertEqual(len(provider.upstream_calls), 2)
+        self.assertFalse(third.meta["cache"]["hit"])
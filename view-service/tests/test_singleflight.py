@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from typing import Any
+
+# Ensure `view-service/` is importable when running from repo root.
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "view-service"))
+
+from view_service.provider_akshare import AkshareProvider  # noqa: E402
+from view_service.provider_base import ToolResult  # noqa: E402
+from view_service.result_cache import ResultCache  # noqa: E402
+from view_service.singleflight import SingleFlight  # noqa: E402
+from view_service.tool_registry import ToolRegistry  # noqa: E402
+
+
+class _SlowProvider(AkshareProvider):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.upstream_calls = 0
+
+    def _call_upstream(self, name: str, args: dict[str, Any], *, meta_script: str) -> ToolResult:
+        self.upstream_calls += 1
+        time.sleep(0.2)
+        return ToolResult(meta={"function": name, "script": meta_script}, data=[{"ok": True}], warnings=[], errors=[])
+
+
+def _run_concurrently(n: int, fn) -> list[Any]:
+    out: list[Any] = [None] * n
+    barrier = threading.Barrier(n)
+
+    def worker(i: int) -> None:
+        barrier.wait()
+        try:
+            out[i] = fn()
+        except Exception as e:  # noqa: BLE001
+            out[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return out
+
+
+class SingleFlightTests(unittest.TestCase):
+    def test_concurrent_callers_share_one_execution(self) -> None:
+        sf = SingleFlight()
+        calls = []
+
+        def fn() -> int:
+            calls.append(1)
+            time.sleep(0.1)
+            return 42
+
+        out = _run_concurrently(8, lambda: sf.do("k", fn))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r for r, _ in out], [42] * 8)
+        self.assertEqual(sum(1 for _, shared in out if not shared), 1)
+        self.assertEqual(sf.in_flight(), 0)
+
+    def test_errors_propagate_to_all_waiters(self) -> None:
+        sf = SingleFlight()
+
+        def fn() -> int:
+            time.sleep(0.1)
+            raise RuntimeError("upstream down")
+
+        out = _run_concurrently(4, lambda: sf.do("k", fn))
+        self.assertTrue(all(isinstance(e, RuntimeError) for e in out))
+
+    def test_provider_coalesces_identical_tool_calls(self) -> None:
+        registry = ToolRegistry(
+            tools_path=Path("tools.json"),
+            tool_index={"stock_zh_a_spot_em": {"function": {"name": "stock_zh_a_spot_em", "parameters": {}}}},
+        )
+        provider = _SlowProvider(registry=registry, cache=None)
+        out = _run_concurrently(6, lambda: provider.call_tool("stock_zh_a_spot_em", {}, refresh=False, meta_script="t"))
+        self.assertEqual(provider.upstream_calls, 1)
+        self.assertTrue(all(isinstance(r, ToolResult) and r.data == [{"ok": True}] for r in out))
+        self.assertEqual(sum(1 for r in out if r.meta.get("singleflight")), 5)
+
+    def test_refresh_caller_does_not_join_non_refresh_leader(self) -> None:
+        registry = ToolRegistry(
+            tools_path=Path("tools.json"),
+            tool_index={"stock_zh_a_spot_em": {"function": {"name": "stock_zh_a_spot_em", "parameters": {}}}},
+        )
+        provider = _SlowProvider(registry=registry, cache=ResultCache())
+        out: list[Any] = []
+        leader = threading.Thread(
+            target=lambda: out.append(provider.call_tool("stock_zh_a_spot_em", {}, refresh=False, meta_script="t"))
+        )
+        leader.start()
+        time.sleep(0.05)  # leader is now in flight
+        fresh = provider.call_tool("stock_zh_a_spot_em", {}, refresh=True, meta_script="t")
+        leader.join()
+        self.assertEqual(provider.upstream_calls, 2)
+        self.assertNotIn("singleflight", fresh.meta)
+        self.assertTrue(fresh.meta["cache"]["refresh"])
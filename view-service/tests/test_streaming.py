@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import http.client
+import json
+import sys
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "view-service"))
+
+from view_service.http_server import ViewServiceHandler  # noqa: E402
+from view_service.provider_base import ToolProvider, ToolResult  # noqa: E402
+from view_service.streaming import iter_chunks, iter_ndjson, wants_stream  # noqa: E402
+from view_service.views_cn import ViewSpec  # noqa: E402
+
+
+class _TableProvider(ToolProvider):
+    def call_tool(self, name: str, args: dict[str, Any], *, refresh: bool, meta_script: str) -> ToolResult:
+        _ = refresh, meta_script
+        rows = [{"代码": f"{i:06d}", "最新价": i / 100} for i in range(int(args.get("rows", 0)))]
+        return ToolResult(meta={"function": name}, data=rows, warnings=[], errors=[])
+
+
+class StreamingTests(unittest.TestCase):
+    def test_batch_lines_are_tagged_per_view(self) -> None:
+        payload = {
+            "meta": {"views": 2},
+            "results": [
+                {"meta": {"view": "a"}, "data": {"x": {"meta": {}, "data": [{"k": 1}, {"k": 2}]}}, "warnings": [], "errors": []},
+                {"meta": {"view": "b"}, "data": {"y": {"meta": {}, "data": {"v": 1}}}, "warnings": [], "errors": ["e"]},
+            ],
+        }
+        lines = [json.loads(x) for x in b"".join(iter_ndjson(payload)).splitlines()]
+        self.assertEqual(
+            [(x["type"], x.get("view")) for x in lines],
+            [("batch", None), ("meta", 0), ("result", 0), ("row", 0), ("row", 0), ("meta", 1), ("result", 1), ("data", 1), ("end", None)],
+        )
+        self.assertEqual(lines[5]["errors"], ["e"])
+
+    def test_chunks_are_bounded(self) -> None:
+        lines = [b"x" * 100 + b"\n"] * 1000
+        chunks = list(iter_chunks(lines, chunk_bytes=4096))
+        self.assertEqual(b"".join(chunks), b"".join(lines))
+        self.assertLess(max(len(c) for c in chunks), 4096 + 101)
+
+    def test_opt_in(self) -> None:
+        self.assertTrue(wants_stream("application/x-ndjson", b"{}"))
+        self.assertTrue(wants_stream(None, b'{"stream": true}'))
+        self.assertFalse(wants_stream("application/json", b'{"name": "x"}'))
+        self.assertFalse(wants_stream(None, b"not json"))
+
+    def test_threaded_server_streams_chunked(self) -> None:
+        ViewServiceHandler.views = {"t1": ViewSpec(name="t1", kind="tool_view", description="", params_schema={}, module=None)}
+        ViewServiceHandler.provider = _TableProvider()
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), ViewServiceHandler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", httpd.server_address[1], timeout=10)
+            conn.request("POST", "/run", body=json.dumps({"name": "t1", "params": {"rows": 3000}}), headers={"Accept": "application/x-ndjson"})
+            resp = conn.getresponse()
+            self.assertEqual(resp.status, 200)
+            self.assertEqual(resp.getheader("Transfer-Encoding"), "chunked")
+            lines = [json.loads(x) for x in resp.read().splitlines()]
+            self.assertEqual(sum(1 for x in lines if x["type"] == "row"), 3000)
+            self.assertEqual(lines[-1], {"type": "end"})
+            conn.close()
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Ensure `view-service/` is importable when running from repo root.
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "view-service"))
+
+from view_service.symbol_universe import SymbolUniverse  # noqa: E402
+
+
+class _Fetcher:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self) -> list[dict]:
+        self.calls += 1
+        return [
+            {"code": "600000", "name": "浦发银行"},
+            {"code": 1, "name": "平安银行"},
+            {"code": "830799", "name": "艾融软件"},
+        ]
+
+
+class SymbolUniverseTests(unittest.TestCase):
+    def test_cold_start_fetches_then_persists(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            fetch = _Fetcher()
+            u = SymbolUniverse(Path(d), fetchers={"a": fetch})
+            snap = u.get("a")
+            self.assertEqual(snap.codes, ("600000", "000001", "830799"))
+            self.assertEqual(snap.tx_symbols, ("sh600000", "sz000001", "bj830799"))
+            self.assertEqual(snap.buckets["bj"], ("bj830799",))
+            u.get("a")
+            self.assertEqual(fetch.calls, 1)
+
+            # A new process starts from the persisted copy without hitting upstream.
+            fetch2 = _Fetcher()
+            u2 = SymbolUniverse(Path(d), fetchers={"a": fetch2})
+            self.assertEqual(u2.get("a").codes, snap.codes)
+            self.assertEqual(fetch2.calls, 0)
+
+    def test_stale_copy_is_served_and_refreshed_in_background(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            fetch = _Fetcher()
+            u = SymbolUniverse(Path(d), max_age=0.05, fetchers={"a": fetch})
+            first = u.get("a")
+            time.sleep(0.1)
+            self.assertIs(u.get("a"), first)
+            deadline = time.monotonic() + 2.0
+            while fetch.calls < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(fetch.calls, 2)
+
+    def test_shared_cache_dir_uses_subdirectory(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            with mock.patch.dict(os.environ, {"FINSKILLS_CACHE_DIR": d}):
+                os.environ.pop("FINSKILLS_UNIVERSE_DIR", None)
+                u = SymbolUniverse(fetchers={"a": _Fetcher()})
+                u.get("a")
+            self.assertEqual(u.store_dir, Path(d) / "universe")
+            self.assertTrue((Path(d) / "universe" / "symbol_universe_a.json").exists())
+            self.assertEqual(list(Path(d).glob("*.json")), [])
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "China-market" / "findata-toolkit-cn" / "scripts"))
+
+from common.cache import CacheManager  # noqa: E402
+from common.cache_index import CacheIndex  # noqa: E402
+
+try:
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def _result(tool: str, rows: int = 3) -> dict:
+    return {"meta": {"function": tool}, "data": [{"代码": f"{i:06d}", "最新价": i / 10} for i in range(rows)], "errors": []}
+
+
+class ParquetBackendTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow not installed")
+    def test_round_trip_mixed_dtypes_with_sidecar_header(self) -> None:
+        cache = CacheManager(self.dir, backend="parquet", use_index=False)
+        rows = [
+            {"代码": "000001", "名称": "平安银行", "成交量": 123456789012, "最新价": 10.5, "停牌": False, "备注": None},
+            {"代码": "600519", "名称": "贵州茅台", "成交量": None, "最新价": 1688.0, "停牌": True, "备注": "ST"},
+        ]
+        result = {"meta": {"function": "stock_zh_a_spot_em", "params": {}}, "data": rows, "warnings": ["w"], "errors": []}
+        cache.save("k", result)
+
+        self.assertTrue((self.dir / "k.parquet").exists())
+        self.assertFalse((self.dir / "k.json").exists())
+        header = cache.columnar_backend.read_header("k")
+        self.assertEqual((header["format"], header["rows"], header["columns"]), ("parquet", 2, list(rows[0])))
+        self.assertEqual(header["envelope"], {k: v for k, v in result.items() if k != "data"})
+        self.assertEqual(cache.load("k", ttl=60)["result"], result)
+
+    def test_mixed_type_column_and_missing_pyarrow_fall_back_to_json(self) -> None:
+        mixed = {"meta": {"function": "stock_zh_a_spot_em"}, "data": [{"涨跌幅": 1.5}, {"涨跌幅": "-"}]}
+        if HAS_PYARROW:
+            cache = CacheManager(self.dir / "mixed", backend="parquet", use_index=False)
+            cache.save("k", mixed)
+            self.assertEqual(sorted(p.name for p in (self.dir / "mixed").iterdir()), ["k.json"])
+            self.assertEqual(cache.load("k", ttl=60)["result"], mixed)
+
+        with mock.patch.dict(sys.modules, {"pyarrow": None, "pyarrow.parquet": None}):
+            cache = CacheManager(self.dir / "nopa", use_index=False)  # auto -> json
+            self.assertEqual((cache.backend, cache.columnar_backend), ("json", None))
+            cache.save("k", _result("stock_zh_a_hist"))
+            self.assertEqual(cache.load("k", ttl=60)["result"], _result("stock_zh_a_hist"))
+            self.assertTrue((self.dir / "nopa" / "k.json").exists())
+            with self.assertRaises(ImportError):
+                CacheManager(self.dir / "nopa", backend="parquet", use_index=False)
+
+
+class CacheIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_totals_lookup_and_eviction_order(self) -> None:
+        index = CacheIndex(self.dir / "index.sqlite")
+        now = time.time()
+        index.record("a", tool="stock_zh_a_hist", ttl_class="historical", ttl=float("inf"), size=100, created=now - 50)
+        index.record("b", tool="stock_zh_a_spot_em", ttl_class="realtime", ttl=60, size=200, created=now - 3600)
+        index.record("c", tool="stock_x_y", ttl_class="default", ttl=3600, size=300, created=now - 10)
+        index.record("c", tool="stock_x_y", ttl_class="default", ttl=3600, size=50, created=now - 10)
+        self.assertEqual(index.totals(), (3, 350))
+        self.assertEqual(index.keys_for(tool="stock_zh_a_hist"), ["a"])
+        self.assertEqual(sorted(index.keys_for(prefix="stock_zh_")), ["a", "b"])
+        self.assertEqual(index.keys_for(prefix="stock_x_"), ["c"])
+        self.assertEqual(index.keys_for(prefix="stock%"), [])  # LIKE wildcards are escaped
+
+        # Expired "b" goes first, then least recently used ("a" was never touched after "c").
+        self.assertEqual(index.eviction_candidates(150), ["b"])
+        index.touch("a")
+        self.assertEqual(index.eviction_candidates(250), ["b", "c"])
+        index.remove(["b"])
+        self.assertEqual(index.totals(), (2, 150))
+        self.assertEqual(index.by_tool()["stock_zh_a_hist"], {"count": 1, "bytes": 100})
+        index.clear()
+        self.assertTrue(index.is_empty())
+
+
+class CacheManagerIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_evict_keeps_budget_and_drops_oldest(self) -> None:
+        cache = CacheManager(self.dir, backend="json", max_mb=0)
+        keys = [cache.get_cache_key("stock_zh_a_hist", {"symbol": i}) for i in range(4)]
+        for key in keys:
+            cache.save(key, _result("stock_zh_a_hist", rows=50))
+            time.sleep(0.01)
+        entry = cache._entry_size(keys[0])
+        cache.load(keys[0], ttl=60)  # most recently used now
+        cache.max_bytes = int(entry * 2.5)
+        self.assertEqual(cache.evict(), 2)
+        self.assertEqual(cache.stats()["count"], 2)
+        self.assertIsNotNone(cache.load(keys[0], ttl=60))
+        self.assertIsNone(cache.load(keys[1], ttl=60))
+        self.assertIsNotNone(cache.load(keys[3], ttl=60))
+
+    def test_invalidate_by_tool_and_prefix(self) -> None:
+        cache = CacheManager(self.dir, backend="json", max_mb=0)
+        for tool in ("stock_zh_a_hist", "stock_zh_a_spot_em", "macro_china_cpi"):
+            cache.save(cache.get_cache_key(tool, {}), _result(tool))
+        self.assertEqual(cache.invalidate(tool="stock_zh_a_hist"), 1)
+        self.assertEqual(cache.invalidate(prefix="stock_"), 1)
+        self.assertEqual(set(cache.stats_by_tool()), {"macro_china_cpi"})
+        with self.assertRaises(ValueError):
+            cache.invalidate()
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow not installed")
+    def test_reindex_recovers_tool_names_for_every_backend(self) -> None:
+        src = self.dir / "src"
+        CacheManager(src, backend="json", use_index=False).save("j1", _result("stock_zh_a_hist"))
+        CacheManager(src, backend="json", use_index=False).save("j2", {"meta": {"function": "macro_china_cpi"}, "data": {"v": 1}})
+        CacheManager(src, backend="parquet", use_index=False).save("p1", _result("stock_zh_a_spot_em"))
+        self.assertTrue((src / "p1.parquet").exists())
+
+        for backend in ("json", "parquet"):
+            shutil.copytree(src, self.dir / backend)
+            cache = CacheManager(self.dir / backend, backend=backend, max_mb=0)  # empty index -> _reindex
+            self.assertEqual(set(cache.stats_by_tool()), {"stock_zh_a_hist", "macro_china_cpi", "stock_zh_a_spot_em"}, backend)
+            self.assertEqual(cache.invalidate(tool="stock_zh_a_hist"), 1)
+            self.assertFalse((self.dir / backend / "j1.json").exists())
+            self.assertEqual(cache.invalidate(tool="stock_zh_a_spot_em"), 1)
+            self.assertFalse((self.dir / backend / "p1.parquet").exists())
+
+
+class CacheLockTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _locks(self) -> list[str]:
+        return sorted(p.stem for p in (self.dir / ".locks").glob("*.lock"))
+
+    def test_deleting_entries_removes_their_lock_files(self) -> None:
+        cache = CacheManager(self.dir, backend="json", max_mb=0)
+        keys = {}
+        for tool in ("stock_zh_a_spot_em", "stock_zh_a_hist", "stock_info_a_code_name"):
+            keys[tool] = cache.get_cache_key(tool, {})
+            with cache.lock(keys[tool]):
+                cache.save(keys[tool], _result(tool))
+        self.assertEqual(self._locks(), sorted(keys.values()))
+
+        self.assertEqual(cache.invalidate(tool="stock_zh_a_hist"), 1)
+        self.assertNotIn(keys["stock_zh_a_hist"], self._locks())
+
+        cache.clear()
+        self.assertEqual(self._locks(), [])
+
+    def test_held_lock_is_kept_and_relocking_after_delete_works(self) -> None:
+        cache = CacheManager(self.dir, backend="json", max_mb=0)
+        key = cache.get_cache_key("stock_zh_a_hist", {})
+        with cache.lock(key):
+            cache.save(key, _result("stock_zh_a_hist"))
+            cache.invalidate(tool="stock_zh_a_hist")  # fill in progress: files go, the lock stays
+            self.assertEqual(self._locks(), [key])
+            self.assertIsNone(cache.load(key, ttl=60))
+        with cache.lock(key):
+            cache.save(key, _result("stock_zh_a_hist"))
+        self.assertIsNotNone(cache.load(key, ttl=60))
+
+
+if __name__ == "__main__":
+    unittest.main()
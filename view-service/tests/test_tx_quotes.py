@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# Ensure `view-service/` is importable when running from repo root.
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "view-service"))
+
+from view_service import provider_akshare  # noqa: E402
+from view_service.provider_akshare import AkshareProvider, _TokenBucket, _fetch_tx_quotes  # noqa: E402
+from view_service.tool_registry import ToolRegistry  # noqa: E402
+
+
+def _payload(sym: str) -> str:
+    fields = [""] * 72
+    fields[1] = f"name{sym}"
+    fields[2] = sym[2:]
+    fields[3] = "10.0"
+    return f'v_{sym}="' + "~".join(fields) + '";'
+
+
+class _Resp:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def raise_for_status(self) -> None:
+        return None
+
+
+class _FlakySession:
+    """Fails the first request (or every one, with `always`) for the batch starting with `flaky`; records every request."""
+
+    def __init__(self, flaky: str, *, always: bool = False) -> None:
+        self.flaky = flaky
+        self.always = always
+        self.requests: list[list[str]] = []
+        self._lock = threading.Lock()
+
+    def get(self, url: str, **_kwargs) -> _Resp:
+        syms = url.split("q=", 1)[1].split(",")
+        with self._lock:
+            self.requests.append(syms)
+            first_try = sum(1 for r in self.requests if r[0] == syms[0]) == 1
+        if syms[0] == self.flaky and (first_try or self.always):
+            raise ConnectionError("Connection aborted")
+        return _Resp("".join(_payload(s) for s in syms))
+
+
+class TxQuotesTests(unittest.TestCase):
+    def test_failed_batch_is_retried_alone(self) -> None:
+        symbols = [f"sz{str(i).zfill(6)}" for i in range(10)]
+        session = _FlakySession(flaky="sz000004")
+        env = {"FINSKILLS_TX_BATCH_SIZE": "2", "FINSKILLS_CALL_RETRY_SLEEP": "0"}
+        with mock.patch.dict(os.environ, env), mock.patch.object(
+            provider_akshare, "_tx_shared", return_value=(session, _TokenBucket(rate=0, burst=1))
+        ):
+            out = _fetch_tx_quotes(symbols, timeout=1.0)
+        self.assertEqual(set(out), set(symbols))
+        # 5 batches + exactly one retry of the flaky batch.
+        self.assertEqual(len(session.requests), 6)
+
+    @unittest.skipUnless(importlib.util.find_spec("akshare"), "akshare not installed")
+    def test_spot_call_does_not_refetch_universe_when_a_batch_fails(self) -> None:
+        symbols = [f"sz{str(i).zfill(6)}" for i in range(10)]
+        session = _FlakySession(flaky="sz000004", always=True)
+        universe = SimpleNamespace(get=lambda market: SimpleNamespace(tx_symbols=symbols))
+        registry = ToolRegistry(
+            tools_path=Path("tools.json"),
+            tool_index={"stock_zh_a_spot_em": {"function": {"name": "stock_zh_a_spot_em", "parameters": {}}}},
+        )
+        env = {
+            "FINSKILLS_TX_BATCH_SIZE": "2",
+            "FINSKILLS_TX_BATCH_RETRIES": "1",
+            "FINSKILLS_CALL_RETRIES": "3",
+            "FINSKILLS_CALL_RETRY_SLEEP": "0",
+            "FINSKILLS_HEALTH_CHECK_ENABLED": "0",
+        }
+        with mock.patch.dict(os.environ, env), mock.patch.object(
+            provider_akshare, "_tx_shared", return_value=(session, _TokenBucket(rate=0, burst=1))
+        ), mock.patch.object(provider_akshare, "get_symbol_universe", return_value=universe):
+            res = AkshareProvider(registry=registry, cache=None, inflight=None).call_tool(
+                "stock_zh_a_spot_em", {}, refresh=False, meta_script="t"
+            )
+        self.assertIn("1/5 batches failed", res.errors[0])
+        # 5 batches + one retry of the failing batch; the call itself is not retried.
+        self.assertEqual(len(session.requests), 6)
+
+    def test_token_bucket_limits_rate(self) -> None:
+        bucket = _TokenBucket(rate=50, burst=1)
+        started = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import sys
+import threading
+import time
 import unittest
 from dataclasses import dataclass
 from pathlib import Path
@@ -11,7 +13,7 @@ REPO_ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(REPO_ROOT / "view-service"))
 
 from view_service.provider_base import ToolProvider, ToolResult  # noqa: E402
-from view_service.view_runner import run_view  # noqa: E402
+from view_service.view_runner import run_view, run_views_batch  # noqa: E402
 from view_service.views_cn import ViewSpec  # noqa: E402
 
 
@@ -25,6 +27,40 @@ class FakeProvider(ToolProvider):
         return ToolResult(meta={"function": name}, data={"ok": True, "args": args}, warnings=[], errors=[])
 
 
+@dataclass
+class SlowProvider(ToolProvider):
+    delays: dict[str, float]
+    active: int = 0
+    peak: int = 0
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def call_tool(self, name: str, args: dict[str, Any], *, refresh: bool, meta_script: str) -> ToolResult:
+        _ = args, refresh, meta_script
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delays.get(name, 0.0))
+        finally:
+            with self._lock:
+                self.active -= 1
+        errors = [] if name == "t2" else [f"boom {name}"]
+        return ToolResult(meta={"function": name}, data={"ok": True}, warnings=[], errors=errors)
+
+
+class _ThreeMod:
+    @staticmethod
+    def plan(params: dict) -> list[dict]:
+        _ = params
+        return [
+            {"key": "a", "tool": "t1", "args": {}},
+            {"key": "b", "tool": "t2", "args": {}},
+            {"key": "c", "tool": "t3", "args": {}},
+        ]
+
+
 class _Mod:
     @staticmethod
     def plan(params: dict) -> list[dict]:
@@ -60,5 +96,76 @@ class ViewRunnerTests(unittest.TestCase):
         )
         out = run_view(spec, params={"x": 9}, provider=provider, refresh=True)
         self.assertEqual(out.errors, [])
-        self.assertEqual(provider.calls, [("t1", {"x": 9}), ("t2", {})])
+        # Plan calls run concurrently, so only the set of calls is deterministic.
+        self.assertCountEqual(provider.calls, [("t1", {"x": 9}), ("t2", {})])
         self.assertEqual(set(out.data.keys()), {"a", "b"})
+
+    def test_custom_view_runs_plan_concurrently_in_plan_order(self) -> None:
+        provider = SlowProvider(delays={"t1": 0.3, "t2": 0.05, "t3": 0.2})
+        spec = ViewSpec(
+            name="demo_parallel",
+            kind="custom_view",
+            description="",
+            params_schema={"type": "object", "properties": {}, "required": []},
+            module=_ThreeMod,
+        )
+        started = time.monotonic()
+        out = run_view(spec, params={}, provider=provider, refresh=False, max_workers=3)
+        elapsed = time.monotonic() - started
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(list(out.data.keys()), ["a", "b", "c"])
+        self.assertEqual(out.errors, ["t1: boom t1", "t3: boom t3"])
+
+    def test_custom_view_respects_per_view_worker_cap(self) -> None:
+        provider = SlowProvider(delays={"t1": 0.05, "t2": 0.05, "t3": 0.05})
+        spec = ViewSpec(
+            name="demo_serial",
+            kind="custom_view",
+            description="",
+            params_schema={"type": "object", "properties": {}, "required": []},
+            module=_ThreeMod,
+        )
+        run_view(spec, params={}, provider=provider, refresh=False, max_workers=1)
+        self.assertEqual(provider.peak, 1)
+
+    def test_custom_view_call_deadline(self) -> None:
+        provider = SlowProvider(delays={"t1": 1.0, "t2": 0.0, "t3": 0.0})
+        spec = ViewSpec(
+            name="demo_deadline",
+            kind="custom_view",
+            description="",
+            params_schema={"type": "object", "properties": {}, "required": []},
+            module=_ThreeMod,
+        )
+        started = time.monotonic()
+        out = run_view(spec, params={}, provider=provider, refresh=False, max_workers=3, call_timeout=0.1)
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertEqual(list(out.data.keys()), ["a", "b", "c"])
+        self.assertIsNone(out.data["a"]["data"])
+        self.assertTrue(out.errors[0].startswith("t1: timed out"))
+
+    def test_batch_dedups_calls_across_views(self) -> None:
+        provider = FakeProvider(calls=[])
+        custom = ViewSpec(name="demo_custom", kind="custom_view", description="", params_schema={}, module=_Mod)
+        tool = ViewSpec(name="t1", kind="tool_view", description="", params_schema={}, module=None)
+        results, stats = run_views_batch(
+            [(custom, {"x": 9}), (custom, {"x": 9}), (custom, {"x": 5}), (tool, {"x": 9})],
+            provider=provider,
+            refresh=False,
+        )
+        # t1{x:9} is shared by both identical custom views and the tool view; t2{} by all custom views.
+        self.assertEqual(stats, {"views": 4, "calls": 7, "unique_calls": 3})
+        self.assertCountEqual(provider.calls, [("t1", {"x": 9}), ("t2", {}), ("t1", {"x": 5})])
+        self.assertEqual([r.meta["view"] for r in results], ["demo_custom", "demo_custom", "demo_custom", "t1"])
+        single = run_view(custom, params={"x": 5}, provider=FakeProvider(calls=[]), refresh=False)
+        self.assertEqual(results[2].data, single.data)
+        self.assertEqual(results[3].data["t1"]["data"], {"ok": True, "args": {"x": 9}})
+
+    def test_batch_keeps_per_view_errors(self) -> None:
+        provider = SlowProvider(delays={})
+        spec = ViewSpec(name="demo_three", kind="custom_view", description="", params_schema={}, module=_ThreeMod)
+        results, stats = run_views_batch([(spec, {}), (spec, {})], provider=provider, refresh=False)
+        self.assertEqual(stats["unique_calls"], 3)
+        for r in results:
+            self.assertEqual(list(r.data.keys()), ["a", "b", "c"])
+            self.assertEqual(r.errors, ["t1: boom t1", "t3: boom t3"])
@@ -10,7 +10,7 @@ import time
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Any
-from threading import Lock
+from threading import Event, Lock, Thread
 
 
 @dataclass
@@ -49,28 +49,84 @@ class AKShareHealthMonitor:
         self._degradation_window = float(os.getenv("FINSKILLS_DEGRADATION_WINDOW", "300"))  # 5分钟内
         self._is_degraded = False
         self._degradation_start_time: datetime | None = None
+
+        # 后台刷新：探测在独立线程中执行，请求路径只读取快照
+        self._probe_lock = Lock()  # 保证同一时刻只有一个探测在执行
+        self._refresher: Thread | None = None
+        self._wake = Event()
+        self._stop = Event()
         
     def check_health(self, force: bool = False) -> HealthCheckResult:
         """
         检查AKShare健康状态
         
+        非强制模式下只返回最近一次的快照（stale-while-revalidate），
+        过期时唤醒后台线程刷新，调用方不会被探测阻塞。
+        
         Args:
-            force: 是否强制检查（忽略缓存）
+            force: 是否强制检查（同步执行探测，忽略缓存）
             
         Returns:
-            健康检查结果
+            健康检查结果；首次探测尚未完成时返回 details={"status": "pending"} 的乐观结果
         """
-        with self._lock:
-            # 如果有缓存且未过期，直接返回
-            if not force and self._last_health_check:
-                elapsed = (datetime.now() - self._last_health_check.check_time).total_seconds()
-                if elapsed < self._health_check_interval:
-                    return self._last_health_check
-            
-            # 执行健康检查
+        if force:
+            return self._refresh()
+
+        self._ensure_refresher()
+        snapshot = self._last_health_check  # 引用读取是原子的，无需加锁
+        if snapshot is None:
+            return HealthCheckResult(
+                is_healthy=True,
+                check_time=datetime.now(),
+                response_time=0.0,
+                details={"status": "pending"},
+            )
+
+        elapsed = (datetime.now() - snapshot.check_time).total_seconds()
+        if elapsed >= self._health_check_interval and not self._probe_lock.locked():
+            self._wake.set()
+        return snapshot
+
+    def _refresh(self) -> HealthCheckResult:
+        """执行一次探测并替换快照（不持有 self._lock）"""
+        with self._probe_lock:
             result = self._perform_health_check()
             self._last_health_check = result
             return result
+
+    def _ensure_refresher(self) -> None:
+        """懒启动后台刷新线程"""
+        refresher = self._refresher
+        if refresher is not None and refresher.is_alive():
+            return
+        with self._lock:
+            if self._refresher is not None and self._refresher.is_alive():
+                return
+            self._stop.clear()
+            self._refresher = Thread(target=self._refresh_loop, name="akshare-health", daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        # 首次探测之后只在读者发现快照过期时（_wake）再探测，空闲时不访问上游
+        stale = self._last_health_check is None
+        while not self._stop.is_set():
+            if stale:
+                try:
+                    self._refresh()
+                except Exception:
+                    # _perform_health_check 已吞掉探测异常，这里只防止线程意外退出
+                    pass
+            self._wake.wait()
+            self._wake.clear()
+            stale = True
+
+    def stop(self) -> None:
+        """停止后台刷新线程"""
+        self._stop.set()
+        self._wake.set()
+        refresher = self._refresher
+        if refresher is not None:
+            refresher.join(timeout=1.0)
     
     def _perform_health_check(self) -> HealthCheckResult:
         """执行实际的健康检查"""
@@ -95,6 +151,16 @@ class AKShareHealthMonitor:
                     details={"data_length": 0}
                 )
             
+            # 探测拉取的就是全市场代码表：顺便刷新共享的 symbol universe，省去一次上游请求
+            try:
+                from .symbol_universe import get_symbol_universe
+
+                get_symbol_universe().offer(
+                    "a", [{"code": c, "name": n} for c, n in zip(df["code"].tolist(), df["name"].tolist())]
+                )
+            except Exception:
+                pass
+
             return HealthCheckResult(
                 is_healthy=True,
                 check_time=datetime.now(),
@@ -195,9 +261,8 @@ class AKShareHealthMonitor:
                 print("[AKShare Health] 恢复正常模式")
     
     def is_degraded(self) -> bool:
-        """是否处于降级模式"""
-        with self._lock:
-            return self._is_degraded
+        """是否处于降级模式（布尔读取是原子的，无需加锁）"""
+        return self._is_degraded
     
     def get_stats(self, tool_name: str | None = None) -> ErrorStats:
         """
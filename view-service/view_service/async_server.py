@@ -0,0 +1,358 @@
+"""
+Asyncio server mode for the view service (`http_server --mode async`).
+
+Serves the same API as the threaded server (`/health`, `/views`, `/views/<name>`, `POST /run`,
+`POST /run/batch`) with:
+- persistent HTTP/1.1 connections (keep-alive by default, idle connections closed after a timeout);
+- blocking `/run` and `/run/batch` work on a bounded thread pool instead of one OS thread per connection;
+- admission control: once `workers + queue_limit` requests are running or waiting, new POST requests
+  get `503` with `Retry-After` instead of piling up;
+- a cap on open connections (extra connections get `503` and are closed);
+- opt-in NDJSON streaming with chunked transfer encoding (see streaming.py).
+
+Knobs (env, overridable per instance):
+- FINSKILLS_VIEW_ASYNC_WORKERS (default 8): executor threads for POST requests.
+- FINSKILLS_VIEW_ASYNC_QUEUE (default 64): requests allowed to wait for a worker.
+- FINSKILLS_VIEW_RENDER_WORKERS (default 2): threads that encode every response body (JSON, columnar, Arrow,
+  compression, NDJSON chunks), so a big view never blocks the event loop; kept apart from the POST workers so
+  rendering does not eat into the admission-controlled budget.
+- FINSKILLS_VIEW_MAX_CONNECTIONS (default 512)
+- FINSKILLS_VIEW_KEEPALIVE_TIMEOUT (default 15s): idle time before a persistent connection is closed.
+- FINSKILLS_VIEW_RETRY_AFTER (default 1s)
+- FINSKILLS_VIEW_MAX_BODY_MB (default 1)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Any, Optional
+
+from .http_cache import Validators, not_modified
+from .http_server import GET_RUN_ROUTE, POST_ROUTES, cache_validators, handle_get, handle_post, run_query_body
+from .negotiation import ResponseOptions, negotiate, render
+from .provider_base import ToolProvider
+from .streaming import NDJSON_CONTENT_TYPE, chunk_frame, iter_chunks, iter_ndjson
+from .views_cn import ViewSpec
+
+_MAX_HEADER_BYTES = 64 * 1024
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass
+class _Request:
+    method: str
+    path: str
+    version: str
+    headers: dict[str, str]
+    body: bytes
+
+    @property
+    def keep_alive(self) -> bool:
+        conn = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return conn == "keep-alive"
+        return conn != "close"
+
+    @property
+    def run_body(self) -> bytes:
+        """The `/run` request body; `GET /run` carries it in the query string."""
+        if self.method == "POST":
+            return self.body
+        path, _, query = self.path.partition("?")
+        return run_query_body(query) if path == GET_RUN_ROUTE else b""
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class AsyncViewServer:
+    def __init__(
+        self,
+        *,
+        views: dict[str, ViewSpec],
+        provider: ToolProvider,
+        host: str = "127.0.0.1",
+        port: int = 8808,
+        workers: Optional[int] = None,
+        queue_limit: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+        retry_after: Optional[int] = None,
+        max_body_bytes: Optional[int] = None,
+    ) -> None:
+        self.views = views
+        self.provider = provider
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers if workers is not None else _env_int("FINSKILLS_VIEW_ASYNC_WORKERS", 8))
+        self.queue_limit = max(0, queue_limit if queue_limit is not None else _env_int("FINSKILLS_VIEW_ASYNC_QUEUE", 64))
+        self.max_connections = max(
+            1, max_connections if max_connections is not None else _env_int("FINSKILLS_VIEW_MAX_CONNECTIONS", 512)
+        )
+        self.keepalive_timeout = (
+            keepalive_timeout if keepalive_timeout is not None else _env_float("FINSKILLS_VIEW_KEEPALIVE_TIMEOUT", 15.0)
+        )
+        self.retry_after = retry_after if retry_after is not None else _env_int("FINSKILLS_VIEW_RETRY_AFTER", 1)
+        self.max_body_bytes = (
+            max_body_bytes if max_body_bytes is not None else int(_env_float("FINSKILLS_VIEW_MAX_BODY_MB", 1.0) * 1024 * 1024)
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="view-run")
+        self._render_executor = ThreadPoolExecutor(
+            max_workers=max(1, _env_int("FINSKILLS_VIEW_RENDER_WORKERS", 2)), thread_name_prefix="view-render"
+        )
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._connections = 0
+        self._tasks: set[asyncio.Task] = set()
+        self._pending = 0  # POST requests running on or queued for the executor
+        self.rejected = 0
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port, limit=_MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # Idle keep-alive connections would otherwise outlive the server.
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._render_executor.shutdown(wait=False, cancel_futures=True)
+
+    # --- connection handling -------------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections += 1
+        task = asyncio.current_task()
+        if task is not None:
+            self._tasks.add(task)
+        try:
+            if self._connections > self.max_connections:
+                self.rejected += 1
+                await self._write(writer, 503, {"error": "Too many connections"}, keep_alive=False, retry_after=True)
+                return
+            while True:
+                try:
+                    req = await asyncio.wait_for(self._read_request(reader), timeout=self.keepalive_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except _BadRequest as e:
+                    await self._write(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    return
+                if req is None:
+                    return
+                status, payload, retry = await self._dispatch(req)
+                is_post = req.method == "POST"
+                opts = negotiate(
+                    req.headers.get("accept"), req.headers.get("accept-encoding"), req.run_body, streamable=is_post
+                )
+                validators = cache_validators(req.method, req.path, status, payload, opts)
+                if validators is not None and not_modified(
+                    validators, req.headers.get("if-none-match"), req.headers.get("if-modified-since")
+                ):
+                    keep_alive = req.keep_alive
+                    await self._write_not_modified(writer, validators, keep_alive=keep_alive)
+                elif status == 200 and opts.stream and is_post:
+                    keep_alive = req.keep_alive and req.version == "HTTP/1.1"
+                    await self._write_stream(writer, status, payload, keep_alive=keep_alive, validators=validators)
+                else:
+                    keep_alive = req.keep_alive
+                    await self._write(
+                        writer, status, payload, keep_alive=keep_alive, retry_after=retry, opts=opts, validators=validators
+                    )
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            return
+        finally:
+            self._connections -= 1
+            if task is not None:
+                self._tasks.discard(task)
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[_Request]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial.strip():
+                return None  # client closed an idle connection
+            raise
+        except asyncio.LimitOverrunError:
+            raise _BadRequest(431, "Request header too large")
+
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+            raise _BadRequest(400, f"Malformed request line: {lines[0][:100]!r}")
+        method, path, version = parts
+        headers: dict[str, str] = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            key, sep, value = line.partition(":")
+            if not sep:
+                raise _BadRequest(400, f"Malformed header: {line[:100]!r}")
+            headers[key.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise _BadRequest(411, "Chunked request bodies are not supported; send Content-Length")
+        try:
+            length = int(headers.get("content-length") or "0")
+        except ValueError:
+            raise _BadRequest(400, "Invalid Content-Length")
+        if length < 0:
+            raise _BadRequest(400, "Invalid Content-Length")
+        if length > self.max_body_bytes:
+            raise _BadRequest(413, f"Request body exceeds {self.max_body_bytes} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return _Request(method=method.upper(), path=path, version=version, headers=headers, body=body)
+
+    async def _dispatch(self, req: _Request) -> tuple[int, dict[str, Any], bool]:
+        path = req.path.partition("?")[0]
+        if req.method == "GET" and path != GET_RUN_ROUTE:
+            status, payload = handle_get(req.path, self.views)
+            return status, payload, False
+        if req.method not in ("GET", "POST"):
+            return 405, {"error": f"Method not allowed: {req.method}"}, False
+        if path not in POST_ROUTES:
+            return 404, {"error": "Not found"}, False
+
+        if self._pending >= self.workers + self.queue_limit:
+            self.rejected += 1
+            return 503, {"error": "Server busy, retry later"}, True
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            status, payload = await loop.run_in_executor(
+                self._executor, handle_post, path, req.run_body, self.views, self.provider
+            )
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            self._pending -= 1
+        return status, payload, False
+
+    def _head(self, status: int, headers: list[str], *, keep_alive: bool) -> bytes:
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = ""
+        lines = [f"HTTP/1.1 {status} {reason}", *headers, f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if keep_alive:
+            lines.append(f"Keep-Alive: timeout={int(self.keepalive_timeout)}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _write_not_modified(self, writer: asyncio.StreamWriter, validators: Validators, *, keep_alive: bool) -> None:
+        headers = [f"{name}: {value}" for name, value in validators.headers()] + ["Vary: Accept, Accept-Encoding"]
+        writer.write(self._head(304, headers, keep_alive=keep_alive))
+        await writer.drain()
+
+    async def _write_stream(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: dict[str, Any],
+        *,
+        keep_alive: bool,
+        validators: Optional[Validators] = None,
+    ) -> None:
+        """NDJSON body; chunked on keep-alive connections, else delimited by closing the connection."""
+        headers = [f"Content-Type: {NDJSON_CONTENT_TYPE}"]
+        headers += [f"{name}: {value}" for name, value in validators.headers()] if validators else []
+        if keep_alive:
+            headers.append("Transfer-Encoding: chunked")
+        writer.write(self._head(status, headers, keep_alive=keep_alive))
+        loop = asyncio.get_running_loop()
+        chunks = iter_chunks(iter_ndjson(payload))
+        while True:
+            # Lines are encoded on the render pool, one chunk at a time.
+            chunk = await loop.run_in_executor(self._render_executor, next, chunks, None)
+            if chunk is None:
+                break
+            writer.write(chunk_frame(chunk) if keep_alive else chunk)
+            await writer.drain()  # backpressure: at most one chunk buffered per slow client
+        if keep_alive:
+            writer.write(chunk_frame(b""))
+        await writer.drain()
+
+    async def _write(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: dict[str, Any],
+        *,
+        keep_alive: bool,
+        retry_after: bool = False,
+        opts: ResponseOptions = ResponseOptions(),
+        validators: Optional[Validators] = None,
+    ) -> None:
+        # Encoding a full-market view takes hundreds of ms: never do it on the event loop. Bodies without view
+        # data (health, errors, specs) are tiny and are encoded inline so they never queue behind a big view.
+        if "data" in payload or "results" in payload:
+            status, raw, fields = await asyncio.get_running_loop().run_in_executor(
+                self._render_executor, render, status, payload, opts
+            )
+        else:
+            status, raw, fields = render(status, payload, opts)
+        if validators is not None and status == 200:
+            fields = fields + validators.headers()
+        headers = [f"{name}: {value}" for name, value in fields]
+        if retry_after:
+            headers.append(f"Retry-After: {self.retry_after}")
+        writer.write(self._head(status, headers, keep_alive=keep_alive) + raw)
+        await writer.drain()
+
+
+def serve(*, views: dict[str, ViewSpec], provider: ToolProvider, host: str, port: int) -> int:
+    server = AsyncViewServer(views=views, provider=provider, host=host, port=port)
+
+    async def _run() -> None:
+        await server.start()
+        print(
+            f"Listening on http://{host}:{server.port} (views={len(views)}, mode=async, "
+            f"workers={server.workers}, queue={server.queue_limit})"
+        )
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -13,8 +13,11 @@
 from __future__ import annotations
 
 import hashlib
+import itertools
 import json
-from dataclasses import dataclass
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Callable, Optional
@@ -22,6 +25,18 @@ from typing import Any, Callable, Optional
 import numpy as np
 import pandas as pd
 
+from .bootstrap import bootstrap_ci
+from .fileio import atomic_path, file_lock
+from .price_store import PriceStore
+from .ratelimit import TokenBucket
+from .signal_ledger import SignalLedger, ledger_key
+
+# 基准指数别名 -> 指数代码
+BENCHMARK_ALIASES = {"csi300": "000300", "hs300": "000300", "csi500": "000905", "csi1000": "000852", "csi_all": "000985"}
+
+# run_backtest_incremental: 这些 data_kwargs 表示数据窗口，不参与 ledger key，增量拉取时按新窗口改写
+_WINDOW_KWARGS = ("start_date", "end_date")
+
 
 @dataclass
 class BacktestConfig:
@@ -30,9 +45,17 @@ class BacktestConfig:
     skill_name: str
     start_date: str  # YYYY-MM-DD
     end_date: str  # YYYY-MM-DD
-    holding_period: int  # 持有天数
+    holding_period: int | list[int]  # 持有天数；列表 = 多持有期一次算完（第一个为主持有期）
     thresholds: dict[str, Any]  # 阈值配置
     max_signals: int = 0  # 0 means no limit
+    bootstrap: int = 0  # >0: 统计指标附带 bootstrap 置信区间（重抽样次数）
+    bootstrap_block: int = 1  # >1: 块 bootstrap 的块长度（信号持有期重叠时使用）
+    seed: Optional[int] = None
+    benchmark: Optional[str] = None  # 基准指数（如 000300 沪深300、000985 中证全指）：附带相对基准的超额收益
+
+    def horizons(self) -> list[int]:
+        hp = self.holding_period
+        return [int(h) for h in hp] if isinstance(hp, (list, tuple)) else [int(hp)]
 
 
 @dataclass
@@ -47,6 +70,7 @@ class SignalResult:
     return_pct: float  # 收益率
     max_drawdown: float  # 最大回撤
     holding_days: int  # 实际持有天数
+    excess_return: Optional[float] = None  # 同一入场/出场日相对基准指数的超额收益（未设基准时为 None）
 
 
 @dataclass
@@ -70,6 +94,15 @@ class BacktestResult:
     return_25pct: float
     return_75pct: float
 
+    # 多持有期：持有期 -> 统计指标（单持有期时为空）
+    horizons: dict[int, dict[str, Any]] = field(default_factory=dict)
+
+    # bootstrap 置信区间（未开启时为空）
+    ci: dict[str, Any] = field(default_factory=dict)
+
+    # 超额收益统计（未设基准时为空）
+    excess: dict[str, Any] = field(default_factory=dict)
+
     def to_dict(self) -> dict:
         """转换为字典"""
         return {
@@ -80,6 +113,12 @@ class BacktestResult:
                 "holding_period": self.config.holding_period,
                 "thresholds": self.config.thresholds,
                 "max_signals": self.config.max_signals,
+                **(
+                    {"bootstrap": self.config.bootstrap, "bootstrap_block": self.config.bootstrap_block, "seed": self.config.seed}
+                    if self.config.bootstrap
+                    else {}
+                ),
+                **({"benchmark": self.config.benchmark} if self.config.benchmark else {}),
             },
             "statistics": {
                 "total_signals": self.total_signals,
@@ -94,6 +133,22 @@ class BacktestResult:
                 "return_75pct": round(self.return_75pct, 6),
             },
             "signals_count": len(self.signals),
+            **({"confidence_intervals": self.ci} if self.ci else {}),
+            **(
+                {"excess_vs_benchmark": {k: (round(v, 6) if isinstance(v, float) else v) for k, v in self.excess.items()}}
+                if self.excess
+                else {}
+            ),
+            **(
+                {
+                    "horizons": {
+                        str(h): {k: (round(v, 6) if isinstance(v, float) else v) for k, v in stats.items()}
+                        for h, stats in self.horizons.items()
+                    }
+                }
+                if self.horizons
+                else {}
+            ),
         }
 
 
@@ -106,11 +161,24 @@ class BacktestFramework:
         *,
         data_provider: Optional[Callable[[str, str, str, dict[str, Any]], pd.DataFrame]] = None,
         price_provider: Optional[Callable[[str, str, str], pd.DataFrame]] = None,
+        index_provider: Optional[Callable[[str, str, str], pd.DataFrame]] = None,
+        price_rate: Optional[float] = None,
     ):
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(exist_ok=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
         self._data_provider = data_provider or self._akshare_data_provider
         self._price_provider = price_provider or self._akshare_price_provider
+        self._index_provider = index_provider or self._akshare_index_provider
+        # 行情按股票存一份连续区间，任意子窗口本地切片（见 price_store.py）
+        # 上游行情请求限速（req/s，0 不限），预取并发时共享
+        if price_rate is None:
+            price_rate = float(os.getenv("FINSKILLS_BACKTEST_PRICE_RATE", "10"))
+        self.price_store = PriceStore(
+            self.cache_dir / "prices",
+            self._store_fetch,
+            limiter=TokenBucket(rate=price_rate, burst=self._prefetch_workers()),
+        )
+        self.ledger = SignalLedger(self.cache_dir / "ledger")
 
     @staticmethod
     def _akshare_data_provider(data_source: str, start_date: str, end_date: str, kwargs: dict[str, Any]) -> pd.DataFrame:
@@ -160,6 +228,27 @@ class BacktestFramework:
             df = ak.stock_zh_a_hist(symbol=sym, period="daily", start_date=sd, end_date=ed)
         return df if isinstance(df, pd.DataFrame) else pd.DataFrame()
 
+    def _akshare_index_provider(self, code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        import akshare as ak
+
+        df = ak.index_zh_a_hist(symbol=code, period="daily", start_date=self._ymd(start_date), end_date=self._ymd(end_date))
+        return df if isinstance(df, pd.DataFrame) else pd.DataFrame()
+
+    @classmethod
+    def benchmark_key(cls, benchmark: str) -> str:
+        """基准指数 -> 价格库中的键（index_<6 位代码>），与个股代码互不冲突。"""
+        s = (benchmark or "").strip()
+        code = cls._normalize_a_symbol(BENCHMARK_ALIASES.get(s.lower(), s))
+        if len(code) != 6:
+            raise ValueError(f"Unknown benchmark index: {benchmark!r}")
+        return f"index_{code}"
+
+    def _store_fetch(self, key: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """价格库上游：index_ 前缀走指数行情，其余走个股行情。"""
+        if key.startswith("index_"):
+            return self._index_provider(key[len("index_") :], start_date, end_date)
+        return self._price_provider(key, start_date, end_date)
+
     def _cache_key(self, name: str, start_date: str, end_date: str, kwargs: dict[str, Any]) -> str:
         payload = json.dumps({"name": name, "start": start_date, "end": end_date, "kwargs": kwargs}, sort_keys=True, ensure_ascii=False)
         return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
@@ -167,12 +256,8 @@ class BacktestFramework:
     def _cache_paths(self, base: str) -> tuple[Path, Path]:
         return (self.cache_dir / f"{base}.csv.gz", self.cache_dir / f"{base}.parquet")
 
-    def get_historical_data(self, data_source: str, start_date: str, end_date: str, **kwargs) -> pd.DataFrame:
-        kwargs = kwargs or {}
-        key = self._cache_key(data_source, start_date, end_date, kwargs)
-        base = f"{data_source}_{start_date}_{end_date}_{key}"
+    def _read_cached_frame(self, base: str) -> pd.DataFrame | None:
         cache_csv, cache_parquet = self._cache_paths(base)
-
         if cache_parquet.exists():
             try:
                 return pd.read_parquet(cache_parquet)
@@ -183,44 +268,112 @@ class BacktestFramework:
                 return pd.read_csv(cache_csv)
             except Exception:
                 pass
+        return None
 
-        df = self._data_provider(data_source, start_date, end_date, kwargs)
-        if not isinstance(df, pd.DataFrame):
-            return pd.DataFrame()
-
+    def _write_cached_frame(self, base: str, df: pd.DataFrame) -> None:
+        """Atomic write (temp file + rename) so concurrent readers never see a partial file."""
+        cache_csv, cache_parquet = self._cache_paths(base)
         try:
-            df.to_parquet(cache_parquet)
+            with atomic_path(cache_parquet) as tmp:
+                df.to_parquet(tmp)
         except Exception:
-            df.to_csv(cache_csv, index=False, compression="gzip")
-        return df
+            with atomic_path(cache_csv) as tmp:
+                df.to_csv(tmp, index=False, compression="gzip")
+
+    def _cached_fill(self, base: str, fetch: Callable[[], pd.DataFrame | None]) -> pd.DataFrame:
+        """
+        Read-through cache shared across processes.
+
+        A per-key advisory lock serializes fills: a second process blocked on the lock re-checks the
+        cache after acquiring it and reuses the first process's result instead of calling upstream again.
+        """
+        cached = self._read_cached_frame(base)
+        if cached is not None:
+            return cached
+
+        with file_lock(self.cache_dir / ".locks" / f"{base}.lock"):
+            cached = self._read_cached_frame(base)
+            if cached is not None:
+                return cached
+
+            df = fetch()
+            if not isinstance(df, pd.DataFrame):
+                return pd.DataFrame()
+            self._write_cached_frame(base, df)
+            return df
+
+    def get_historical_data(self, data_source: str, start_date: str, end_date: str, /, **kwargs) -> pd.DataFrame:
+        kwargs = kwargs or {}
+        key = self._cache_key(data_source, start_date, end_date, kwargs)
+        base = f"{data_source}_{start_date}_{end_date}_{key}"
+        return self._cached_fill(base, lambda: self._data_provider(data_source, start_date, end_date, kwargs))
 
     def get_price_history(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
         sym = self._normalize_a_symbol(symbol)
         if not sym:
             return pd.DataFrame()
-        key = self._cache_key(f"price_{sym}", start_date, end_date, {})
-        base = f"price_{sym}_{start_date}_{end_date}_{key}"
-        cache_csv, cache_parquet = self._cache_paths(base)
+        return self.price_store.get(sym, start_date, end_date)
 
-        if cache_parquet.exists():
-            try:
-                return pd.read_parquet(cache_parquet)
-            except Exception:
-                pass
-        if cache_csv.exists():
-            try:
-                return pd.read_csv(cache_csv)
-            except Exception:
-                pass
+    def get_benchmark_history(self, benchmark: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """基准指数日线；与个股共用价格库（只补缺失区间）。"""
+        return self.price_store.get(self.benchmark_key(benchmark), start_date, end_date)
 
-        df = self._price_provider(sym, start_date, end_date)
-        if not isinstance(df, pd.DataFrame) or df.empty:
-            return pd.DataFrame()
-        try:
-            df.to_parquet(cache_parquet)
-        except Exception:
-            df.to_csv(cache_csv, index=False, compression="gzip")
-        return df
+    @staticmethod
+    def _prefetch_workers() -> int:
+        return max(1, int(os.getenv("FINSKILLS_BACKTEST_PREFETCH_WORKERS", "8")))
+
+    def prefetch_prices(
+        self,
+        symbols: list[str],
+        start_date: str,
+        end_date: str,
+        *,
+        max_workers: Optional[int] = None,
+        progress: Optional[Callable[[int, int, str, Optional[str]], None]] = None,
+    ) -> dict[str, Any]:
+        """
+        并发预取一批股票在 [start_date, end_date] 的行情到本地价格库。
+
+        - 已覆盖该窗口的股票直接跳过：价格库按股票原子落盘，中断后重跑只补缺失部分（可续跑）
+        - 上游请求受 price_rate 令牌桶限速；并发数默认 FINSKILLS_BACKTEST_PREFETCH_WORKERS
+        - progress(done, total, symbol, error) 每完成一只股票回调一次
+        """
+        wanted: list[str] = []
+        for s in symbols:
+            sym = self._normalize_a_symbol(str(s))
+            if sym and sym not in wanted:
+                wanted.append(sym)
+
+        missing = [s for s in wanted if not self.price_store.covers(s, start_date, end_date)]
+        summary: dict[str, Any] = {
+            "total": len(wanted),
+            "cached": len(wanted) - len(missing),
+            "fetched": 0,
+            "empty": [],
+            "failed": {},
+        }
+        if not missing:
+            return summary
+
+        workers = min(max_workers or self._prefetch_workers(), len(missing))
+        done = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="price-prefetch") as pool:
+            futures = {pool.submit(self.price_store.get, sym, start_date, end_date): sym for sym in missing}
+            for fut in as_completed(futures):
+                sym = futures[fut]
+                error: Optional[str] = None
+                try:
+                    if fut.result().empty:
+                        summary["empty"].append(sym)
+                    else:
+                        summary["fetched"] += 1
+                except Exception as e:
+                    error = str(e)
+                    summary["failed"][sym] = error
+                done += 1
+                if progress is not None:
+                    progress(done, len(missing), sym, error)
+        return summary
 
     @staticmethod
     def clean_data(df: pd.DataFrame) -> pd.DataFrame:
@@ -240,75 +393,281 @@ class BacktestFramework:
     def generate_signals(df: pd.DataFrame, rule_func: Callable, thresholds: dict) -> pd.DataFrame:
         return rule_func(df, thresholds)
 
-    def calculate_returns(self, signals: pd.DataFrame, holding_period: int) -> list[SignalResult]:
-        results: list[SignalResult] = []
+    @staticmethod
+    def _signal_frame(signals: pd.DataFrame) -> pd.DataFrame:
+        """
+        信号表 -> [symbol, d0, signal_type]（保留原索引与顺序；无法解析代码/日期的行被丢弃）。
 
-        for _, signal in signals.iterrows():
-            symbol = signal.get("股票代码", signal.get("代码", ""))
-            date = signal.get("交易日期", signal.get("日期", ""))
-            signal_type = signal.get("信号类型", "unknown")
+        日期兼容 YYYY-MM-DD 与 YYYYMMDD（与逐行 strptime 的口径一致）。
+        """
 
-            sym = self._normalize_a_symbol(str(symbol))
-            if not sym:
-                continue
+        def col(*names: str, default: Any) -> pd.Series:
+            for name in names:
+                if name in signals.columns:
+                    return signals[name]
+            return pd.Series([default] * len(signals), index=signals.index, dtype=object)
+
+        raw_dates = col("交易日期", "日期", default="").astype(str)
+        d0 = pd.to_datetime(raw_dates.str.slice(0, 10), format="%Y-%m-%d", errors="coerce")
+        d0 = d0.fillna(pd.to_datetime(raw_dates.str.slice(0, 8), format="%Y%m%d", errors="coerce"))
+
+        out = pd.DataFrame(
+            {
+                "symbol": col("股票代码", "代码", default="").astype(str).map(BacktestFramework._normalize_a_symbol),
+                "d0": d0,
+                "signal_type": col("信号类型", default="unknown").astype(str),
+            }
+        )
+        return out[(out["symbol"] != "") & out["d0"].notna()]
 
-            try:
-                d0 = datetime.strptime(str(date)[:10], "%Y-%m-%d")
-            except Exception:
-                try:
-                    d0 = datetime.strptime(str(date)[:8], "%Y%m%d")
-                except Exception:
-                    continue
+    @staticmethod
+    def _price_arrays(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray] | None:
+        """价格表 -> (日期 YYYY-MM-DD 升序, 收盘价 float)；缺列返回 None。"""
+        if df is None or df.empty:
+            return None
+        if "日期" not in df.columns and "date" in df.columns:
+            df = df.rename(columns={"date": "日期"})
+        if "收盘" not in df.columns and "close" in df.columns:
+            df = df.rename(columns={"close": "收盘"})
+        if "日期" not in df.columns or "收盘" not in df.columns:
+            return None
+        dates = df["日期"].astype(str).str.slice(0, 10).to_numpy(dtype="U10")
+        closes = df["收盘"].to_numpy(dtype=float)
+        order = np.argsort(dates, kind="mergesort")
+        return dates[order], closes[order]
 
-            d1 = d0 + timedelta(days=max(int(holding_period) * 3, 30))
-            stock_prices = self.get_price_history(sym, d0.strftime("%Y-%m-%d"), d1.strftime("%Y-%m-%d")).copy()
-            if stock_prices.empty:
-                continue
+    @staticmethod
+    def _forward_returns(
+        dates: np.ndarray,
+        closes: np.ndarray,
+        d0: np.ndarray,
+        d1: np.ndarray,
+        holding_period: int,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        单只股票、多条信号的批量前向收益。
 
-            if "日期" not in stock_prices.columns and "date" in stock_prices.columns:
-                stock_prices = stock_prices.rename(columns={"date": "日期"})
-            if "收盘" not in stock_prices.columns and "close" in stock_prices.columns:
-                stock_prices = stock_prices.rename(columns={"close": "收盘"})
-            if "日期" not in stock_prices.columns or "收盘" not in stock_prices.columns:
-                continue
+        入场：首个 日期 >= d0 的交易日；出场：入场后第 holding_period 个交易日，但不晚于 d1（价格窗口终点）。
+        返回 (entry_idx, exit_idx, valid, max_drawdown)。
+        """
+        n = len(dates)
+        entry = np.searchsorted(dates, d0, side="left")
+        last = np.searchsorted(dates, d1, side="right") - 1
+        valid = (entry < n) & (entry <= last)
+        entry = np.minimum(entry, n - 1)
+        exit_ = np.maximum(np.minimum(entry + int(holding_period), last), entry)
+
+        # 持有期价格矩阵 (signals x holding_period+1)；超过出场日的位置重复出场价，不影响回撤。
+        offsets = np.arange(int(holding_period) + 1)
+        idx = np.minimum(entry[:, None] + offsets[None, :], exit_[:, None])
+        path = closes[idx]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cummax = np.fmax.accumulate(path, axis=1)
+            drawdown = (path - cummax) / cummax
+            max_dd = np.nanmin(np.where(np.isnan(path), np.nan, drawdown), axis=1) if path.size else np.empty(0)
+        return entry, exit_, valid, max_dd
+
+    @staticmethod
+    def _asof_returns(dates: np.ndarray, closes: np.ndarray, d_entry: np.ndarray, d_exit: np.ndarray) -> np.ndarray:
+        """基准在 [d_entry, d_exit] 的收益：各取不晚于该日的最近一个交易日收盘（停牌/错位时向前对齐）；无数据为 NaN。"""
+        i0 = np.searchsorted(dates, d_entry, side="right") - 1
+        i1 = np.searchsorted(dates, d_exit, side="right") - 1
+        ok = i0 >= 0
+        c0 = np.where(ok, closes[np.maximum(i0, 0)], np.nan)
+        c1 = np.where(ok, closes[np.maximum(i1, 0)], np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(c0 != 0, (c1 - c0) / c0, np.nan)
+
+    @staticmethod
+    def _window_days(holding_period: int) -> timedelta:
+        """信号的价格窗口长度：d0 .. d0 + max(3*持有期, 30) 自然日。"""
+        return timedelta(days=max(int(holding_period) * 3, 30))
+
+    def forward_returns(
+        self, signals: pd.DataFrame, holding_periods: list[int], *, benchmark: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        前向收益矩阵：每条信号 x 每个持有期。
 
-            stock_prices["日期"] = stock_prices["日期"].astype(str).str.slice(0, 10)
-            stock_prices = stock_prices.sort_values("日期")
+        每只股票只取一次价格序列（覆盖其全部信号与最长持有期的窗口），用 searchsorted 定位入场/出场。
+        返回按信号原索引/顺序排列的 DataFrame：date, symbol, signal_type, entry_price，以及每个持有期 h 的
+        exit_price_{h}, return_{h}, max_drawdown_{h}, holding_days_{h}（该持有期无有效入场时为 NaN）。
 
-            entry_pos = stock_prices[stock_prices["日期"] >= d0.strftime("%Y-%m-%d")].index
-            if len(entry_pos) == 0:
+        benchmark（指数代码或别名）：基准序列整体只取一次，按每条信号的实际入场/出场交易日对齐，
+        另加 benchmark_return_{h} 与 excess_return_{h} = return_{h} - benchmark_return_{h}。
+        """
+        horizons = [int(h) for h in holding_periods]
+        sig = self._signal_frame(signals)
+        n = len(sig)
+        cols: dict[str, np.ndarray] = {"entry_price": np.full(n, np.nan)}
+        entry_dates = np.full(n, "", dtype="U10")
+        exit_dates = {h: np.full(n, "", dtype="U10") for h in horizons}
+        for h in horizons:
+            for name in ("exit_price", "return", "max_drawdown", "holding_days"):
+                cols[f"{name}_{h}"] = np.full(n, np.nan)
+
+        d0_str = sig["d0"].dt.strftime("%Y-%m-%d").to_numpy(dtype="U10")
+        d1_str = {h: (sig["d0"] + self._window_days(h)).dt.strftime("%Y-%m-%d").to_numpy(dtype="U10") for h in horizons}
+        d0_val = sig["d0"].to_numpy()
+        longest = max(horizons, key=lambda h: self._window_days(h)) if horizons else 0
+
+        for sym, pos in sig.groupby("symbol", sort=False).indices.items():
+            start = str(d0_str[pos[np.argmin(d0_val[pos])]])
+            end = str(d1_str[longest][pos[np.argmax(d0_val[pos])]])
+            arrays = self._price_arrays(self.get_price_history(sym, start, end))
+            if arrays is None:
                 continue
-            entry_i = stock_prices.index.get_loc(entry_pos[0])
-            entry_price = float(stock_prices.iloc[entry_i]["收盘"])
-
-            exit_i = min(entry_i + int(holding_period), len(stock_prices) - 1)
-            exit_price = float(stock_prices.iloc[exit_i]["收盘"])
-
-            return_pct = (exit_price - entry_price) / entry_price
-
-            period_prices = stock_prices.iloc[entry_i : exit_i + 1]["收盘"].astype(float)
-            cummax = period_prices.cummax()
-            drawdown = (period_prices - cummax) / cummax
-            max_drawdown = float(drawdown.min())
-
-            results.append(
-                SignalResult(
-                    date=d0.strftime("%Y-%m-%d"),
-                    symbol=sym,
-                    signal_type=str(signal_type),
-                    entry_price=entry_price,
-                    exit_price=exit_price,
-                    return_pct=float(return_pct),
-                    max_drawdown=max_drawdown,
-                    holding_days=int(exit_i - entry_i),
-                )
+            dates, closes = arrays
+            for h in horizons:
+                entry, exit_, valid, max_dd = self._forward_returns(dates, closes, d0_str[pos], d1_str[h][pos], h)
+                entry_px = closes[entry]
+                exit_px = closes[exit_]
+                ok = valid & (entry_px != 0)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    ret = (exit_px - entry_px) / entry_px
+                rows = pos[ok]
+                cols["entry_price"][rows] = entry_px[ok]
+                cols[f"exit_price_{h}"][rows] = exit_px[ok]
+                cols[f"return_{h}"][rows] = ret[ok]
+                cols[f"max_drawdown_{h}"][rows] = max_dd[ok]
+                cols[f"holding_days_{h}"][rows] = (exit_ - entry)[ok]
+                entry_dates[rows] = dates[entry][ok]
+                exit_dates[h][rows] = dates[exit_][ok]
+
+        if benchmark and n:
+            start = str(d0_str[np.argmin(d0_val)])
+            end = str(d1_str[longest][np.argmax(d0_val)])
+            arrays = self._price_arrays(self.get_benchmark_history(benchmark, start, end))
+            for h in horizons:
+                bench = np.full(n, np.nan)
+                rows = np.flatnonzero(~np.isnan(cols[f"return_{h}"]))
+                if arrays is not None and len(rows):
+                    bench[rows] = self._asof_returns(arrays[0], arrays[1], entry_dates[rows], exit_dates[h][rows])
+                cols[f"benchmark_return_{h}"] = bench
+                cols[f"excess_return_{h}"] = cols[f"return_{h}"] - bench
+
+        out = pd.DataFrame({"date": d0_str, "symbol": sig["symbol"].to_numpy(), "signal_type": sig["signal_type"].to_numpy()}, index=sig.index)
+        for name, values in cols.items():
+            out[name] = values
+        return out
+
+    @staticmethod
+    def _signal_results(fwd: pd.DataFrame, h: int) -> list[SignalResult]:
+        fwd = fwd[fwd[f"holding_days_{h}"].notna()]
+        excess_col = f"excess_return_{h}"
+        excess = fwd[excess_col] if excess_col in fwd.columns else pd.Series(np.nan, index=fwd.index)
+        return [
+            SignalResult(
+                date=str(date),
+                symbol=str(sym),
+                signal_type=str(signal_type),
+                entry_price=float(entry_px),
+                exit_price=float(exit_px),
+                return_pct=float(ret),
+                max_drawdown=float(dd),
+                holding_days=int(days),
+                excess_return=None if pd.isna(ex) else float(ex),
             )
+            for date, sym, signal_type, entry_px, exit_px, ret, dd, days, ex in zip(
+                fwd["date"],
+                fwd["symbol"],
+                fwd["signal_type"],
+                fwd["entry_price"],
+                fwd[f"exit_price_{h}"],
+                fwd[f"return_{h}"],
+                fwd[f"max_drawdown_{h}"],
+                fwd[f"holding_days_{h}"],
+                excess,
+            )
+        ]
+
+    def calculate_returns(
+        self, signals: pd.DataFrame, holding_period: int | list[int]
+    ) -> list[SignalResult] | dict[int, list[SignalResult]]:
+        """
+        计算每条信号的持有期收益与期间最大回撤（基于 forward_returns 的批量实现；结果顺序与输入信号一致）。
 
-        return results
+        holding_period 为列表时，一次取价、一次矩阵计算，返回 {持有期: [SignalResult, ...]}。
+        """
+        if isinstance(holding_period, (list, tuple)):
+            horizons = [int(h) for h in holding_period]
+            fwd = self.forward_returns(signals, horizons)
+            return {h: self._signal_results(fwd, h) for h in horizons}
+        h = int(holding_period)
+        return self._signal_results(self.forward_returns(signals, [h]), h)
+
+    def sweep_thresholds(
+        self,
+        features: pd.DataFrame,
+        rule_func: Callable,
+        grid: dict[str, list[Any]],
+        holding_periods: list[int],
+        *,
+        base_thresholds: Optional[dict[str, Any]] = None,
+    ) -> pd.DataFrame:
+        """
+        阈值敏感性扫描：grid 中所有阈值组合 x 所有持有期，一次性返回敏感性表。
+
+        前向收益矩阵只对 features 的全部行计算一次（每只股票取一次价格），各网格点只做规则筛选 + 统计。
+        rule_func(df, thresholds) 需返回 df 的行子集（保留索引），与 run_backtest 的规则函数约定一致。
+        每行：阈值参数列 + holding_period + analyze_results 的统计指标。
+        """
+        features = features.reset_index(drop=True)
+        horizons = [int(h) for h in holding_periods]
+        fwd = self.forward_returns(features, horizons)
+        keys = list(grid)
+
+        rows: list[dict[str, Any]] = []
+        for combo in itertools.product(*(grid[k] for k in keys)):
+            point = dict(zip(keys, combo))
+            picked = self.generate_signals(features, rule_func, {**(base_thresholds or {}), **point})
+            sub = fwd[fwd.index.isin(picked.index)]
+            for h in horizons:
+                returns = sub[f"return_{h}"][sub[f"holding_days_{h}"].notna()].to_numpy(dtype=float)
+                rows.append({**point, "holding_period": h, **self._return_stats(returns)})
+        return pd.DataFrame(rows)
 
     @staticmethod
-    def analyze_results(results: list[SignalResult]) -> dict[str, Any]:
-        if not results:
+    def analyze_results(
+        results: list[SignalResult] | dict[int, list[SignalResult]],
+        *,
+        bootstrap: int = 0,
+        block_size: int = 1,
+        confidence: float = 0.95,
+        seed: Optional[int] = None,
+        max_batch_mb: Optional[float] = None,
+    ) -> dict[Any, Any]:
+        """
+        统计指标；传入 {持有期: 结果} 时按持有期分别统计。
+
+        bootstrap > 0 时额外返回 "ci"：avg_return / win_rate / profit_loss_ratio / sharpe_ratio 的
+        置信区间（批量 NumPy 重抽样，block_size > 1 为块 bootstrap；见 bootstrap.py）。
+        结果带 excess_return（设了基准）时额外返回 "excess"：超额收益的同口径统计（win_rate 即跑赢基准的比例）。
+        """
+        kwargs = dict(bootstrap=bootstrap, block_size=block_size, confidence=confidence, seed=seed, max_batch_mb=max_batch_mb)
+        if isinstance(results, dict):
+            return {h: BacktestFramework.analyze_results(rs, **kwargs) for h, rs in results.items()}
+        returns_array = np.array([r.return_pct for r in results], dtype=float)
+        stats = BacktestFramework._return_stats(returns_array)
+        if bootstrap > 0:
+            stats["ci"] = bootstrap_ci(
+                returns_array,
+                n_resamples=bootstrap,
+                block_size=block_size,
+                confidence=confidence,
+                seed=seed,
+                max_batch_mb=max_batch_mb,
+            )
+        excess = np.array([r.excess_return for r in results if r.excess_return is not None], dtype=float)
+        excess = excess[np.isfinite(excess)]
+        if len(excess):
+            stats["excess"] = BacktestFramework._return_stats(excess)
+        return stats
+
+    @staticmethod
+    def _return_stats(returns_array: np.ndarray) -> dict[str, Any]:
+        """收益数组 -> 统计指标（analyze_results 与阈值扫描共用）。"""
+        if len(returns_array) == 0:
             return {
                 "total_signals": 0,
                 "avg_return": 0.0,
@@ -322,8 +681,7 @@ class BacktestFramework:
                 "return_75pct": 0.0,
             }
 
-        returns_array = np.array([r.return_pct for r in results], dtype=float)
-        total_signals = int(len(results))
+        total_signals = int(len(returns_array))
         avg_return = float(returns_array.mean())
         median_return = float(np.median(returns_array))
         win_rate = float((returns_array > 0).mean())
@@ -362,25 +720,154 @@ class BacktestFramework:
         if config.max_signals and config.max_signals > 0 and len(signals) > config.max_signals:
             signals = signals.head(config.max_signals).copy()
 
-        if len(signals) == 0:
-            return BacktestResult(
-                config=config,
-                signals=[],
-                total_signals=0,
-                avg_return=0.0,
-                median_return=0.0,
-                win_rate=0.0,
-                profit_loss_ratio=0.0,
-                max_return=0.0,
-                min_return=0.0,
-                sharpe_ratio=0.0,
-                return_25pct=0.0,
-                return_75pct=0.0,
+        return self.evaluate_signals(config, signals)
+
+    @staticmethod
+    def _window_kwargs(kwargs: dict[str, Any], start: str, end: str) -> dict[str, Any]:
+        """把 data_kwargs 里的 start_date/end_date 改写为新窗口（保持原来的 YYYYMMDD / YYYY-MM-DD 格式）。"""
+        out = dict(kwargs)
+        for k, v in (("start_date", start), ("end_date", end)):
+            if k in out:
+                out[k] = v if "-" in str(out[k]) else v.replace("-", "")
+        return out
+
+    def _closed_mask(self, fwd: pd.DataFrame, horizons: list[int]) -> np.ndarray:
+        """所有持有期的窗口都已结束（走满持有期，或价格窗口终点早于今天）的信号。"""
+        today = pd.Timestamp(datetime.now().date())
+        d0 = pd.to_datetime(fwd["date"])
+        closed = np.ones(len(fwd), dtype=bool)
+        for h in horizons:
+            done = (fwd[f"holding_days_{h}"] == h) | ((d0 + self._window_days(h)) < today)
+            closed &= done.to_numpy()
+        return closed
+
+    def run_backtest_incremental(
+        self,
+        config: BacktestConfig,
+        rule_func: Callable,
+        data_source: str,
+        *,
+        rule_name: Optional[str] = None,
+        lookback_days: int = 0,
+        **data_kwargs,
+    ) -> BacktestResult:
+        """
+        增量回测：逐信号结果按 (skill, rule, thresholds, 持有期, 数据源) 落盘（见 signal_ledger.py）。
+
+        - 首次运行（或 start_date 早于已处理区间）：全量生成并打分
+        - 之后只拉取 (已处理 end_date, config.end_date] 的数据生成新信号并打分；持有期尚未走完的旧信号重新打分
+        - lookback_days：规则需要历史窗口（如滚动均值）时，新数据向前多取的自然日数；只保留已处理区间之后的新信号
+        统计指标总是由落盘的逐信号数据重新计算。
+        """
+        horizons = config.horizons()
+        rule = rule_name or getattr(rule_func, "__name__", "rule")
+        key = ledger_key(
+            skill=config.skill_name,
+            rule=rule,
+            thresholds=config.thresholds,
+            horizons=horizons,
+            data_source=data_source,
+            data_kwargs={k: v for k, v in data_kwargs.items() if k not in _WINDOW_KWARGS},
+            benchmark=config.benchmark,
+        )
+        start = pd.Timestamp(config.start_date).strftime("%Y-%m-%d")
+        end = pd.Timestamp(config.end_date).strftime("%Y-%m-%d")
+
+        def score(window_start: str, after: Optional[str]) -> pd.DataFrame:
+            kwargs = self._window_kwargs(data_kwargs, window_start, end)
+            df = self.clean_data(self.get_historical_data(data_source, window_start, end, **kwargs))
+            signals = self.generate_signals(df, rule_func, config.thresholds)
+            if len(signals) == 0:
+                return pd.DataFrame()
+            fwd = self.forward_returns(signals, horizons, benchmark=config.benchmark)
+            if after is not None:
+                fwd = fwd[fwd["date"] > after]
+            return fwd
+
+        with file_lock(self.ledger.lock_path(key)):
+            state = self.ledger.load(key)
+            if state is None or start < state.meta.get("start_date", start):
+                frame = score(start, None)
+                covered_start, covered_end = start, end
+            else:
+                frame = state.frame
+                covered_start = state.meta["start_date"]
+                covered_end = max(state.meta["end_date"], end)
+
+                open_rows = frame.index[~frame["closed"].astype(bool)] if "closed" in frame.columns else frame.index
+                if len(open_rows):
+                    pending = pd.DataFrame(
+                        {
+                            "交易日期": frame.loc[open_rows, "date"],
+                            "股票代码": frame.loc[open_rows, "symbol"],
+                            "信号类型": frame.loc[open_rows, "signal_type"],
+                        },
+                        index=open_rows,
+                    )
+                    rescored = self.forward_returns(pending, horizons, benchmark=config.benchmark)
+                    frame.loc[rescored.index, rescored.columns] = rescored
+
+                processed_end = state.meta["end_date"]
+                if end > processed_end:
+                    fetch_start = pd.Timestamp(processed_end) + timedelta(days=1) - timedelta(days=max(int(lookback_days), 0))
+                    new = score(fetch_start.strftime("%Y-%m-%d"), processed_end)
+                    if not new.empty:
+                        frame = pd.concat([frame, new], ignore_index=True)
+
+            frame = frame.reset_index(drop=True)
+            if not frame.empty:
+                frame["closed"] = self._closed_mask(frame, horizons)
+            self.ledger.save(
+                key,
+                frame,
+                {
+                    "skill": config.skill_name,
+                    "rule": rule,
+                    "thresholds": config.thresholds,
+                    "horizons": horizons,
+                    "data_source": data_source,
+                    "start_date": covered_start,
+                    "end_date": covered_end,
+                    "rows": int(len(frame)),
+                    "updated_at": datetime.now().isoformat(timespec="seconds"),
+                },
             )
 
-        results = self.calculate_returns(signals, config.holding_period)
-        stats = self.analyze_results(results)
-        return BacktestResult(config=config, signals=results, **stats)
+        if not frame.empty:
+            frame = frame[(frame["date"] >= start) & (frame["date"] <= end)]
+            if config.max_signals and config.max_signals > 0:
+                frame = frame.head(config.max_signals)
+        return self._result_from_forward(config, frame)
+
+    def evaluate_signals(self, config: BacktestConfig, signals: pd.DataFrame) -> BacktestResult:
+        """信号表 -> BacktestResult（单/多持有期），供 run_backtest 与自定义特征流程共用。"""
+        fwd = self.forward_returns(signals, config.horizons(), benchmark=config.benchmark) if len(signals) else None
+        return self._result_from_forward(config, fwd)
+
+    def _result_from_forward(self, config: BacktestConfig, fwd: Optional[pd.DataFrame]) -> BacktestResult:
+        """前向收益矩阵（forward_returns 的输出，或增量回测落盘的逐信号结果）-> BacktestResult。"""
+        horizons = config.horizons()
+        multi = isinstance(config.holding_period, (list, tuple))
+        stats_kwargs = dict(bootstrap=config.bootstrap, block_size=config.bootstrap_block, seed=config.seed)
+        if fwd is None or fwd.empty:
+            empty = self.analyze_results([], **stats_kwargs)
+            return BacktestResult(config=config, signals=[], **empty, horizons={h: dict(empty) for h in horizons} if multi else {})
+
+        by_horizon = {h: self._signal_results(fwd, h) for h in horizons}
+        per_horizon = self.analyze_results(by_horizon, **stats_kwargs)
+        primary = horizons[0]
+        return BacktestResult(
+            config=config,
+            signals=by_horizon[primary],
+            **per_horizon[primary],
+            horizons=per_horizon if multi else {},
+        )
+
+    def simulate_portfolio(self, signals: pd.DataFrame, config: Any = None, **kwargs: Any) -> Any:
+        """组合层面按日模拟（仓位/并发上限/成本/涨跌停），返回 PortfolioResult；见 portfolio.py。"""
+        from .portfolio import simulate_portfolio
+
+        return simulate_portfolio(self, signals, config, **kwargs)
 
     @staticmethod
     def save_result(result: BacktestResult, output_file: str) -> None:
@@ -0,0 +1,198 @@
+"""
+Batch runner for skill backtests.
+
+Runs a manifest of jobs across a process pool. Every worker shares one on-disk cache dir (price store and
+data cache are multi-process safe), and each finished job is checkpointed to `<out_dir>/<job_id>.json`,
+so a rerun skips jobs that already completed.
+
+Manifest (JSON):
+
+    {
+      "cache_dir": "backtest_cache/batch",
+      "out_dir": "backtest_results/batch",
+      "jobs": [
+        {"skill": "block_deal", "rule": "rule1_building_position", "mode": "run",
+         "config": {"start": "2020-01-01", "end": "2023-12-31", "holding": [5, 10, 20],
+                    "max_signals": 2000, "symbol": "A股", "max_symbols": 200}},
+        {"skill": "block_deal", "mode": "sweep",
+         "config": {"start": "2020-01-01", "end": "2023-12-31", "holding_periods": [5, 10, 20],
+                    "symbol": "A股", "max_symbols": 200}}
+      ]
+    }
+
+`skill` is a name from `SKILLS` or a module path; `mode` names a function in that module called as
+`fn(framework, rule=..., **config)` (default `run`). `id` is optional (default: derived from the job).
+
+Usage:
+  cd view-service
+  python -m view_service.backtests.batch manifest.json --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+from ..backtest_framework import BacktestFramework
+from ..fileio import atomic_path
+
+SKILLS: dict[str, str] = {
+    "block_deal": "view_service.backtests.block_deal",
+}
+
+
+def job_id(job: dict[str, Any]) -> str:
+    if job.get("id"):
+        return str(job["id"])
+    payload = json.dumps(
+        {"skill": job.get("skill"), "mode": job.get("mode", "run"), "rule": job.get("rule"), "config": job.get("config", {})},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+    rule = job.get("rule") or "default"
+    return f"{job.get('skill')}-{job.get('mode', 'run')}-{rule}-{digest}"
+
+
+def _resolve(job: dict[str, Any]) -> Callable[..., Any]:
+    skill = str(job.get("skill") or "")
+    module = importlib.import_module(SKILLS.get(skill, skill))
+    fn = getattr(module, str(job.get("mode", "run")), None)
+    if fn is None:
+        raise ValueError(f"Skill {skill!r} has no entry point {job.get('mode', 'run')!r}")
+    return fn
+
+
+def _run_job(job: dict[str, Any], cache_dir: str, out_path: str, price_rate: Optional[float]) -> dict[str, Any]:
+    """Worker: run one job and checkpoint its result atomically."""
+    started = time.time()
+    fn = _resolve(job)
+    framework = BacktestFramework(cache_dir=cache_dir, price_rate=price_rate)
+    kwargs = dict(job.get("config") or {})
+    if job.get("rule"):
+        kwargs["rule"] = job["rule"]
+    result = fn(framework, **kwargs)
+    payload = {
+        "job": job,
+        "elapsed_seconds": round(time.time() - started, 3),
+        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "result": result,
+    }
+    with atomic_path(Path(out_path)) as tmp:
+        tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+    return {"elapsed_seconds": payload["elapsed_seconds"]}
+
+
+def run_batch(
+    jobs: list[dict[str, Any]],
+    *,
+    cache_dir: str,
+    out_dir: str,
+    workers: Optional[int] = None,
+    force: bool = False,
+    price_rate: Optional[float] = None,
+    progress: Optional[Callable[[int, int, str, Optional[str]], None]] = None,
+) -> dict[str, Any]:
+    """
+    Run `jobs` (skipping checkpointed ones unless `force`) and return a summary:
+    {"total", "skipped", "done", "failed": {job_id: error}, "results": {job_id: path}}.
+
+    The upstream price rate (`FINSKILLS_BACKTEST_PRICE_RATE` by default) is split across workers so the
+    pool as a whole stays within it.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+
+    pending: list[tuple[str, dict[str, Any], Path]] = []
+    summary: dict[str, Any] = {"total": len(jobs), "skipped": 0, "done": 0, "failed": {}, "results": {}}
+    seen: set[str] = set()
+    for job in jobs:
+        jid = job_id(job)
+        if jid in seen:
+            raise ValueError(f"Duplicate job id in manifest: {jid}")
+        seen.add(jid)
+        path = out / f"{jid}.json"
+        summary["results"][jid] = str(path)
+        if path.exists() and not force:
+            summary["skipped"] += 1
+            continue
+        pending.append((jid, job, path))
+
+    if not pending:
+        return summary
+
+    n_workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+    if price_rate is None:
+        price_rate = float(os.getenv("FINSKILLS_BACKTEST_PRICE_RATE", "10"))
+    per_worker_rate = price_rate / n_workers if price_rate > 0 else 0.0
+
+    def record(i: int, jid: str, error: Optional[str]) -> None:
+        if error is None:
+            summary["done"] += 1
+        else:
+            summary["failed"][jid] = error
+            summary["results"].pop(jid, None)
+        if progress is not None:
+            progress(i, len(pending), jid, error)
+
+    if n_workers == 1:
+        for i, (jid, job, path) in enumerate(pending, start=1):
+            try:
+                _run_job(job, cache_dir, str(path), per_worker_rate)
+                record(i, jid, None)
+            except Exception as e:
+                record(i, jid, f"{type(e).__name__}: {e}")
+        return summary
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = {pool.submit(_run_job, job, cache_dir, str(path), per_worker_rate): jid for jid, job, path in pending}
+        for i, fut in enumerate(as_completed(futures), start=1):
+            jid = futures[fut]
+            try:
+                fut.result()
+                record(i, jid, None)
+            except Exception as e:
+                record(i, jid, f"{type(e).__name__}: {e}")
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Run a manifest of skill backtests across a process pool")
+    p.add_argument("manifest", help="Path to a JSON manifest ({cache_dir, out_dir, jobs: [...]})")
+    p.add_argument("--workers", type=int, default=0, help="Worker processes (default: CPU count)")
+    p.add_argument("--cache-dir", default="", help="Override manifest cache_dir")
+    p.add_argument("--out-dir", default="", help="Override manifest out_dir")
+    p.add_argument("--force", action="store_true", help="Rerun jobs that already have a checkpoint")
+    p.add_argument("--quiet", action="store_true")
+    args = p.parse_args(argv)
+
+    manifest = json.loads(Path(args.manifest).read_text(encoding="utf-8"))
+    jobs = manifest.get("jobs") or []
+
+    def _progress(done: int, total: int, jid: str, error: Optional[str]) -> None:
+        status = f"failed: {error}" if error else "ok"
+        print(f"[batch] {done}/{total} {jid} {status}", file=sys.stderr)
+
+    summary = run_batch(
+        jobs,
+        cache_dir=args.cache_dir or manifest.get("cache_dir") or "backtest_cache/batch",
+        out_dir=args.out_dir or manifest.get("out_dir") or "backtest_results/batch",
+        workers=args.workers or None,
+        force=args.force,
+        progress=None if args.quiet else _progress,
+    )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
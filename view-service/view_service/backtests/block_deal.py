@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Callable, List, Optional
 
 import pandas as pd
 
 from ..backtest_framework import BacktestConfig, BacktestFramework
+from ..portfolio import PortfolioConfig
 
 
 def _to_ymd10(x: Any) -> str:
@@ -28,6 +30,7 @@ def enrich_block_deal_features(
     start: str,
     end: str,
     max_symbols: int = 0,
+    progress: Optional[Callable[[int, int, str, Optional[str]], None]] = None,
 ) -> pd.DataFrame:
     """
     Add required derived columns:
@@ -36,7 +39,8 @@ def enrich_block_deal_features(
     - 成交金额占比 = 大宗成交额 / 当日成交额
     - 日均成交额 = 近20日成交额均值（含当日）
 
-    This is potentially expensive if df contains too many unique symbols.
+    Price histories are prefetched concurrently (see `BacktestFramework.prefetch_prices`);
+    cost still grows with the number of unique symbols.
     """
     if df.empty:
         return df
@@ -72,9 +76,11 @@ def enrich_block_deal_features(
         )
         out = out[out["股票代码"].isin(top)].copy()
 
-    # Pull price history per symbol; join on date.
+    # Pull price history per symbol (prefetched concurrently into the local store); join on date.
+    symbols = sorted(set(out["股票代码"].tolist()))
+    framework.prefetch_prices(symbols, start, end, progress=progress)
     frames: list[pd.DataFrame] = []
-    for sym in sorted(set(out["股票代码"].tolist())):
+    for sym in symbols:
         px = framework.get_price_history(sym, start, end).copy()
         if px.empty:
             continue
@@ -123,65 +129,162 @@ def rule_1_building_position(df: pd.DataFrame, thresholds: dict[str, Any]) -> pd
     return signals
 
 
+RULES: dict[str, Callable[[pd.DataFrame, dict[str, Any]], pd.DataFrame]] = {
+    "rule1_building_position": rule_1_building_position,
+}
+
+DEFAULT_THRESHOLDS: dict[str, dict[str, Any]] = {
+    "rule1_building_position": {
+        "discount_rate_min": -0.05,
+        "discount_rate_max": -0.02,
+        "consecutive_days": 3,
+        "avg_discount_change": 0.01,
+    },
+}
+
+
+def _rule(name: str) -> Callable[[pd.DataFrame, dict[str, Any]], pd.DataFrame]:
+    if name not in RULES:
+        raise ValueError(f"Unknown block_deal rule: {name!r}; available: {sorted(RULES)}")
+    return RULES[name]
+
+
 def run(
     framework: BacktestFramework,
     *,
     start: str,
     end: str,
-    holding: int,
+    holding: int | List[int],
     max_signals: int,
     symbol: str,
     max_symbols: int,
+    rule: str = "rule1_building_position",
+    thresholds: Optional[dict[str, Any]] = None,
+    bootstrap: int = 0,
+    seed: Optional[int] = None,
+    benchmark: Optional[str] = None,
+    portfolio: Optional[PortfolioConfig] = None,
+    progress: Optional[Callable[[int, int, str, Optional[str]], None]] = None,
 ) -> dict[str, Any]:
+    rule_func = _rule(rule)
     cfg = BacktestConfig(
         skill_name="block-deal-monitor",
         start_date=start,
         end_date=end,
         holding_period=holding,
-        thresholds={
-            "discount_rate_min": -0.05,
-            "discount_rate_max": -0.02,
-            "consecutive_days": 3,
-            "avg_discount_change": 0.01,
-        },
+        thresholds={**DEFAULT_THRESHOLDS.get(rule, {}), **(thresholds or {})},
         max_signals=max_signals,
+        bootstrap=bootstrap,
+        # Overlapping holding windows make neighbouring signals dependent: resample blocks of one holding period.
+        bootstrap_block=max(int(holding if isinstance(holding, int) else holding[0]), 1),
+        seed=seed,
+        benchmark=benchmark,
     )
     raw = framework.get_historical_data("stock_dzjy_mrmx", start, end, symbol=symbol, start_date=start, end_date=end)
-    feat = enrich_block_deal_features(framework, raw, start=start, end=end, max_symbols=max_symbols)
+    feat = enrich_block_deal_features(framework, raw, start=start, end=end, max_symbols=max_symbols, progress=progress)
 
-    signals = rule_1_building_position(feat, cfg.thresholds)
+    signals = rule_func(feat, cfg.thresholds)
     if cfg.max_signals and cfg.max_signals > 0 and len(signals) > cfg.max_signals:
         signals = signals.head(cfg.max_signals).copy()
 
-    results = framework.calculate_returns(signals, cfg.holding_period)
-    stats = framework.analyze_results(results)
+    out = framework.evaluate_signals(cfg, signals).to_dict()
+    if portfolio is not None:
+        out["portfolio"] = framework.simulate_portfolio(signals, portfolio).to_dict()
+    return out
 
-    from ..backtest_framework import BacktestResult  # local import to keep file focused
 
-    return BacktestResult(config=cfg, signals=results, **stats).to_dict()
+DEFAULT_SWEEP_GRID: dict[str, list[Any]] = {
+    "discount_rate_min": [-0.08, -0.05, -0.03],
+    "discount_rate_max": [-0.03, -0.02, -0.01, 0.0],
+}
+
+
+def sweep(
+    framework: BacktestFramework,
+    *,
+    start: str,
+    end: str,
+    holding_periods: List[int],
+    symbol: str,
+    max_symbols: int,
+    rule: str = "rule1_building_position",
+    grid: Optional[dict[str, list[Any]]] = None,
+    progress: Optional[Callable[[int, int, str, Optional[str]], None]] = None,
+) -> list[dict[str, Any]]:
+    """Threshold sensitivity table for one rule (one row per grid point x holding period)."""
+    rule_func = _rule(rule)
+    raw = framework.get_historical_data("stock_dzjy_mrmx", start, end, symbol=symbol, start_date=start, end_date=end)
+    feat = enrich_block_deal_features(framework, raw, start=start, end=end, max_symbols=max_symbols, progress=progress)
+    table = framework.sweep_thresholds(
+        feat, rule_func, grid or DEFAULT_SWEEP_GRID, holding_periods, base_thresholds=DEFAULT_THRESHOLDS.get(rule)
+    )
+    return table.to_dict(orient="records")
 
 
 def main(argv: Optional[List[str]] = None) -> int:
     p = argparse.ArgumentParser(description="Backtest: block-deal-monitor thresholds (skeleton)")
     p.add_argument("--start", default="2020-01-01")
     p.add_argument("--end", default="2023-12-31")
-    p.add_argument("--holding", type=int, default=20)
+    p.add_argument("--holding", default="20", help="Holding period in days; comma-separated for several (e.g. 1,3,5,10,20)")
     p.add_argument("--max-signals", type=int, default=2000)
     p.add_argument("--symbol", default="A股", help="AKShare stock_dzjy_mrmx symbol arg (e.g. A股)")
     p.add_argument("--max-symbols", type=int, default=200)
     p.add_argument("--cache-dir", default="backtest_cache/block_deal")
     p.add_argument("--out", default="backtest_results/block_deal/rule1_building_position.json")
+    p.add_argument("--quiet", action="store_true", help="Do not print price prefetch progress")
+    p.add_argument("--bootstrap", type=int, default=0, help="Bootstrap resamples for confidence intervals (0 = off)")
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--benchmark", default="", help="Index for excess returns (e.g. 000300, csi300, csi_all)")
+    p.add_argument("--portfolio", action="store_true", help="Also simulate a daily portfolio over the signals")
+    p.add_argument("--max-positions", type=int, default=10, help="Portfolio: max concurrent positions")
+    p.add_argument("--position-size", type=float, default=0.1, help="Portfolio: target weight per position")
+    p.add_argument(
+        "--sweep",
+        default="",
+        help="Comma-separated holding periods (e.g. 5,10,20): write a threshold sensitivity table instead of a single run",
+    )
     args = p.parse_args(argv)
 
+    def _progress(done: int, total: int, sym: str, error: Optional[str]) -> None:
+        status = f"failed: {error}" if error else "ok"
+        print(f"[prefetch] {done}/{total} {sym} {status}", file=sys.stderr)
+
+    horizons = [int(x) for x in str(args.holding).split(",") if x.strip()]
+    holding: int | List[int] = horizons if len(horizons) > 1 else horizons[0]
+
     fw = BacktestFramework(cache_dir=args.cache_dir)
+    if args.sweep:
+        table = sweep(
+            fw,
+            start=args.start,
+            end=args.end,
+            holding_periods=[int(x) for x in args.sweep.split(",") if x.strip()],
+            symbol=args.symbol,
+            max_symbols=args.max_symbols,
+            progress=None if args.quiet else _progress,
+        )
+        out_path = Path(args.out).with_name(Path(args.out).stem + "_sweep.json")
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(table, ensure_ascii=False, indent=2), encoding="utf-8")
+        return 0
+
     out = run(
         fw,
         start=args.start,
         end=args.end,
-        holding=args.holding,
+        holding=holding,
         max_signals=args.max_signals,
         symbol=args.symbol,
         max_symbols=args.max_symbols,
+        bootstrap=args.bootstrap,
+        seed=args.seed,
+        benchmark=args.benchmark or None,
+        portfolio=(
+            PortfolioConfig(holding_period=horizons[0], max_positions=args.max_positions, position_size=args.position_size)
+            if args.portfolio
+            else None
+        ),
+        progress=None if args.quiet else _progress,
     )
 
     out_path = Path(args.out)
@@ -0,0 +1,256 @@
+"""
+Offline benchmark suite for the backtest pipeline.
+
+Everything runs against synthetic providers injected into `BacktestFramework` (no network, no AKShare):
+seeded random-walk price panels and random signal / block-deal tables. Each case records wall time and
+peak traced memory (tracemalloc) and the report is written as JSON, so runs from different versions can
+be compared (`--baseline old.json` flags slowdowns). Tracing slows allocation-heavy code unevenly, so the
+suite runs twice on identical fresh state: an untraced pass for the timings and a traced pass for memory.
+
+Sizes (signals x symbols): tiny 50x5, small 1e2x10, medium 1e4x500, large 1e5x5000.
+
+Usage:
+  cd view-service
+  python -m view_service.bench_backtest --sizes small,medium --out-json ../docs/bench-backtest.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .backtest_framework import BacktestFramework
+from .backtests.block_deal import enrich_block_deal_features
+
+
+@dataclass(frozen=True)
+class BenchSize:
+    name: str
+    signals: int
+    symbols: int
+    days: int = 750  # ~3 years of trading days
+
+
+SIZES: dict[str, BenchSize] = {
+    "tiny": BenchSize("tiny", 50, 5, days=120),
+    "small": BenchSize("small", 100, 10),
+    "medium": BenchSize("medium", 10_000, 500),
+    "large": BenchSize("large", 100_000, 5_000),
+}
+
+
+def _symbols(n: int) -> list[str]:
+    return [f"{600000 + i:06d}" if i % 2 else f"{i:06d}" for i in range(n)]
+
+
+class SyntheticMarket:
+    """Seeded random-walk daily bars per symbol, generated lazily and served like `stock_zh_a_hist`."""
+
+    def __init__(self, days: int, *, start: str = "2020-01-02", seed: int = 0) -> None:
+        self.dates = pd.bdate_range(start, periods=days).strftime("%Y-%m-%d")
+        self.seed = seed
+        self._panels: dict[str, pd.DataFrame] = {}
+        self.calls = 0
+
+    def panel(self, symbol: str) -> pd.DataFrame:
+        px = self._panels.get(symbol)
+        if px is None:
+            rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+            n = len(self.dates)
+            close = np.round(10 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n))), 2)
+            amount = rng.lognormal(18, 0.5, n)
+            px = pd.DataFrame({"日期": self.dates, "收盘": close, "成交额": amount})
+            self._panels[symbol] = px
+        return px
+
+    def price_provider(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        self.calls += 1
+        px = self.panel(symbol)
+        return px[(px["日期"] >= start_date) & (px["日期"] <= end_date)].copy()
+
+    def data_provider(self, frame: pd.DataFrame) -> Callable[[str, str, str, dict[str, Any]], pd.DataFrame]:
+        def provide(data_source: str, start_date: str, end_date: str, kwargs: dict[str, Any]) -> pd.DataFrame:
+            self.calls += 1
+            return frame.copy()
+
+        return provide
+
+
+def synthetic_signals(market: SyntheticMarket, symbols: list[str], n: int, *, seed: int = 1) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    usable = market.dates[: max(1, len(market.dates) - 30)]
+    return pd.DataFrame(
+        {
+            "交易日期": rng.choice(usable, n),
+            "股票代码": rng.choice(symbols, n),
+            "信号类型": "bench",
+        }
+    )
+
+
+def synthetic_block_deals(market: SyntheticMarket, symbols: list[str], n: int, *, seed: int = 2) -> pd.DataFrame:
+    sig = synthetic_signals(market, symbols, n, seed=seed)
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "交易日期": sig["交易日期"],
+            "股票代码": sig["股票代码"],
+            "成交价": np.round(rng.uniform(5, 50, n), 2),
+            "成交额": rng.lognormal(16, 0.8, n),
+        }
+    )
+
+
+def _timed(fn: Callable[[], Any]) -> tuple[Any, float]:
+    started = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - started
+
+
+def _peak_mb(fn: Callable[[], Any]) -> tuple[Any, float]:
+    tracemalloc.start()
+    try:
+        out = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return out, peak / 1024 / 1024
+
+
+def run_size(size: BenchSize, *, seed: int = 0, holding_period: int = 5) -> list[dict[str, Any]]:
+    rows = _run_pass(size, seed=seed, holding_period=holding_period, traced=False)
+    traced = _run_pass(size, seed=seed, holding_period=holding_period, traced=True)
+    for row, mem in zip(rows, traced):
+        row["peak_mb"] = mem["peak_mb"]
+    return rows
+
+
+def _run_pass(size: BenchSize, *, seed: int, holding_period: int, traced: bool) -> list[dict[str, Any]]:
+    """One pass over every case on fresh state; records seconds (untraced) or peak_mb (traced)."""
+    market = SyntheticMarket(size.days, seed=seed)
+    symbols = _symbols(size.symbols)
+    signals = synthetic_signals(market, symbols, size.signals, seed=seed + 1)
+    deals = synthetic_block_deals(market, symbols, size.signals, seed=seed + 2)
+    start, end = str(market.dates[0]), str(market.dates[-1])
+    rows: list[dict[str, Any]] = []
+
+    def record(name: str, fn: Callable[[], Any], **extra: Any) -> Any:
+        calls_before = market.calls
+        out, value = (_peak_mb if traced else _timed)(fn)
+        rows.append(
+            {
+                "case": name,
+                "size": size.name,
+                "signals": size.signals,
+                "symbols": size.symbols,
+                "seconds": None if traced else round(value, 4),
+                "peak_mb": round(value, 2) if traced else None,
+                "upstream_calls": market.calls - calls_before,
+                **extra,
+            }
+        )
+        return out
+
+    with tempfile.TemporaryDirectory(prefix="finskills-bench-") as tmp:
+        fw = BacktestFramework(cache_dir=tmp, price_provider=market.price_provider, data_provider=market.data_provider(deals), price_rate=0)
+
+        record("prefetch_prices.cold", lambda: fw.prefetch_prices(symbols, start, end))
+        record("price_store.read", lambda: [fw.get_price_history(s, start, end) for s in symbols])
+        results = record("calculate_returns", lambda: fw.calculate_returns(signals, holding_period))
+        record("calculate_returns.multi_horizon", lambda: fw.calculate_returns(signals, [1, 3, 5, 10, 20]))
+        record("analyze_results", lambda: fw.analyze_results(results))
+        record("analyze_results.bootstrap_1000", lambda: fw.analyze_results(results, bootstrap=1000, seed=0))
+        record(
+            "enrich_block_deal_features",
+            lambda: enrich_block_deal_features(fw, deals, start=start, end=end),
+        )
+        record("historical_data.write", lambda: fw.get_historical_data("bench_deals", start, end, size=size.name))
+        record("historical_data.read", lambda: fw.get_historical_data("bench_deals", start, end, size=size.name))
+
+    return rows
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], *, tolerance: float = 0.25) -> list[dict[str, Any]]:
+    """Cases that got slower than `baseline` by more than `tolerance` (fraction)."""
+    base = {(r["case"], r["size"]): r for r in baseline.get("results", [])}
+    regressions: list[dict[str, Any]] = []
+    for r in report.get("results", []):
+        b = base.get((r["case"], r["size"]))
+        if not b or not b.get("seconds"):
+            continue
+        ratio = r["seconds"] / b["seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append({"case": r["case"], "size": r["size"], "seconds": r["seconds"], "baseline": b["seconds"], "ratio": round(ratio, 3)})
+    return regressions
+
+
+def run_benchmarks(sizes: list[str], *, seed: int = 0) -> dict[str, Any]:
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark size(s): {unknown}; available: {sorted(SIZES)}")
+    try:
+        from importlib.metadata import version
+
+        pkg_version = version("view-service")
+    except Exception:
+        pkg_version = None
+
+    started = datetime.now()
+    results: list[dict[str, Any]] = []
+    for name in sizes:
+        results.extend(run_size(SIZES[name], seed=seed))
+    return {
+        "meta": {
+            "started_at": started.isoformat(timespec="seconds"),
+            "view_service_version": pkg_version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "seed": seed,
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Offline backtest benchmarks (synthetic data)")
+    p.add_argument("--sizes", default="small,medium", help=f"Comma-separated: {','.join(SIZES)}")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out-json", default="", help="Write JSON report to path")
+    p.add_argument("--baseline", default="", help="Previous report; exit 1 if any case is slower by more than --tolerance")
+    p.add_argument("--tolerance", type=float, default=0.25)
+    args = p.parse_args(argv)
+
+    report = run_benchmarks([s.strip() for s in args.sizes.split(",") if s.strip()], seed=args.seed)
+    if args.baseline:
+        report["regressions"] = compare(report, json.loads(Path(args.baseline).read_text(encoding="utf-8")), tolerance=args.tolerance)
+
+    for r in report["results"]:
+        print(f"{r['size']:>7} {r['case']:<36} {r['seconds']:>9.4f}s {r['peak_mb']:>9.2f}MB", file=sys.stderr)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out_json:
+        out = Path(args.out_json)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
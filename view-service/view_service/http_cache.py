@@ -0,0 +1,153 @@
+"""
+HTTP validators and freshness headers for view responses.
+
+`/run` and `/run/batch` envelopes get:
+- `ETag` (weak): a hash of the view name, params and each tool result's version — its function, params,
+  `as_of` (when the data was fetched upstream; cached results keep it) and errors. Only metadata is hashed,
+  so a matching `If-None-Match` is answered with `304` before the body is serialized. Results without
+  `as_of` fall back to hashing their data.
+- `Last-Modified`: the newest tool `as_of`.
+- `Cache-Control: max-age=<n>`: the smallest remaining TTL over the tool results (`ttl_seconds - age_seconds`
+  from the provider cache meta, i.e. the tool's TTL class). Never-expiring (closed historical) results are capped at
+  the in-process historical TTL (`CacheTTL.historical`). `no-cache` when a result has no cache info, `no-store`
+  when the view has errors.
+
+`max-age` is only sent on `GET /run?name=..&params=<json>`, which browsers and proxies can cache and
+revalidate normally. `POST /run` and `/run/batch` are not stored by shared caches, and RFC 9110 has a failed
+`If-None-Match` on POST answered with 412 instead of 304. So POST responses only get `no-cache`/`no-store`,
+and the 304 they return for a matching `If-None-Match` is a client-side revalidation shortcut for our own
+clients (dashboards, `views_runner`), not standard HTTP caching.
+
+`GET /views` and `/views/<name>` get an ETag over the payload and `max-age=FINSKILLS_VIEW_SPEC_MAX_AGE`
+(default 300); `/health` is `no-store`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterator, Optional
+
+from .result_cache import CacheTTL
+
+
+@dataclass(frozen=True)
+class Validators:
+    cache_control: str
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None  # UTC
+
+    def headers(self) -> list[tuple[str, str]]:
+        out = [("Cache-Control", self.cache_control)]
+        if self.etag:
+            out.append(("ETag", self.etag))
+        if self.last_modified:
+            out.append(("Last-Modified", format_datetime(self.last_modified, usegmt=True)))
+        return out
+
+
+def _digest(obj: Any) -> str:
+    raw = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:32]
+
+
+def _views(payload: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    if isinstance(payload.get("results"), list):
+        yield from (v for v in payload["results"] if isinstance(v, dict))
+    else:
+        yield payload
+
+
+def _as_of(meta: dict[str, Any]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(str(meta["as_of"])).astimezone(timezone.utc).replace(microsecond=0)
+    except Exception:
+        return None
+
+
+def view_validators(payload: dict[str, Any], *, variant: str, method: str = "GET") -> Validators:
+    """
+    Validators for a `/run` envelope or `/run/batch` response (`variant`: the negotiated format).
+
+    `max-age` is only advertised for GET/HEAD; other methods get `no-cache` with the same ETag.
+    """
+    versions: list[Any] = []
+    newest: Optional[datetime] = None
+    max_age: Optional[float] = None
+    has_errors = False
+    unknown_ttl = False
+    for view in _views(payload):
+        meta = view.get("meta") or {}
+        has_errors = has_errors or bool(view.get("errors"))
+        parts: list[Any] = [meta.get("view"), meta.get("params")]
+        for key, res in sorted((view.get("data") or {}).items()):
+            res = res if isinstance(res, dict) else {"data": res}
+            rmeta = res.get("meta") or {}
+            fetched = _as_of(rmeta)
+            if fetched is None:
+                version: Any = _digest(res.get("data"))
+            else:
+                version = rmeta.get("as_of")
+                newest = fetched if newest is None or fetched > newest else newest
+            parts.append([key, rmeta.get("function"), rmeta.get("params"), version, res.get("errors")])
+
+            cache = rmeta.get("cache")
+            ttl = cache.get("ttl_seconds") if isinstance(cache, dict) else None
+            if ttl is None and isinstance(cache, dict) and cache.get("ttl_class") == "historical":
+                ttl = math.inf  # closed history window: reported as null, never expires
+            if ttl is None:
+                unknown_ttl = True
+                continue
+            remaining = float(ttl) - float(cache.get("age_seconds") or 0.0)
+            max_age = remaining if max_age is None else min(max_age, remaining)
+        versions.append(parts)
+
+    etag = f'W/"{_digest([variant, versions])}"'
+    if has_errors:
+        control = "no-store"
+    elif unknown_ttl or max_age is None or method not in ("GET", "HEAD"):
+        control = "no-cache"
+    else:
+        control = f"max-age={int(CacheTTL.historical) if math.isinf(max_age) else max(0, int(max_age))}"
+    return Validators(cache_control=control, etag=etag, last_modified=newest)
+
+
+def validators_for(path: str, payload: dict[str, Any], *, variant: str = "json", method: str = "GET") -> Validators:
+    if path == "/health":
+        return Validators(cache_control="no-store")
+    if path in ("/run", "/run/batch"):
+        return view_validators(payload, variant=variant, method=method)
+    max_age = int(os.getenv("FINSKILLS_VIEW_SPEC_MAX_AGE", "300"))
+    return Validators(cache_control=f"max-age={max_age}", etag=f'W/"{_digest([variant, payload])}"')
+
+
+def _etag_value(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def not_modified(v: Validators, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """Conditional request check (weak ETag comparison; If-Modified-Since only without If-None-Match)."""
+    if v.cache_control == "no-store":
+        return False
+    if if_none_match:
+        if not v.etag:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        wanted = _etag_value(v.etag)
+        return any(_etag_value(t) == wanted for t in if_none_match.split(","))
+    if if_modified_since and v.last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return v.last_modified <= since
+    return False
@@ -2,25 +2,195 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+import time
+from datetime import datetime
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from typing import Any
+from urllib.parse import parse_qs
 
 from .provider_akshare import AkshareProvider
+from .provider_base import ToolProvider
+from .http_cache import Validators, not_modified, validators_for
+from .negotiation import ResponseOptions, negotiate, render
+from .streaming import NDJSON_CONTENT_TYPE, chunk_frame, iter_chunks, iter_ndjson
 from .tool_registry import ToolRegistry
-from .view_runner import run_view
+from .view_runner import run_view, run_views_batch
 from .views_cn import ViewSpec, build_tool_views, discover_custom_views
 
 
-def _json_response(handler: BaseHTTPRequestHandler, status: int, payload: dict[str, Any]) -> None:
-    raw = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+def cache_validators(
+    method: str, path: str, status: int, payload: dict[str, Any], opts: ResponseOptions
+) -> Validators | None:
+    """Validators for a successful response; the variant keys the ETag by representation."""
+    if status != 200:
+        return None
+    path = path.partition("?")[0]
+    variant = "ndjson" if opts.stream else f"{opts.format}:{opts.table or ''}"
+    return validators_for(path, payload, variant=variant, method=method)
+
+
+def _json_response(
+    handler: BaseHTTPRequestHandler,
+    status: int,
+    payload: dict[str, Any],
+    opts: ResponseOptions = ResponseOptions(),
+    validators: Validators | None = None,
+) -> None:
+    status, raw, headers = render(status, payload, opts)
     handler.send_response(status)
-    handler.send_header("Content-Type", "application/json; charset=utf-8")
-    handler.send_header("Content-Length", str(len(raw)))
+    for name, value in headers + (validators.headers() if validators and status == 200 else []):
+        handler.send_header(name, value)
     handler.end_headers()
     handler.wfile.write(raw)
 
 
+def _not_modified_response(handler: BaseHTTPRequestHandler, validators: Validators) -> None:
+    handler.send_response(304)
+    for name, value in validators.headers():
+        handler.send_header(name, value)
+    handler.send_header("Vary", "Accept, Accept-Encoding")
+    handler.end_headers()
+
+
+def _ndjson_response(
+    handler: BaseHTTPRequestHandler, status: int, payload: dict[str, Any], validators: Validators | None = None
+) -> None:
+    """Stream `payload` as NDJSON; chunked for HTTP/1.1 clients, plain body + close for HTTP/1.0."""
+    chunked = handler.request_version == "HTTP/1.1"
+    handler.protocol_version = "HTTP/1.1" if chunked else "HTTP/1.0"
+    handler.close_connection = True
+    handler.send_response(status)
+    handler.send_header("Content-Type", NDJSON_CONTENT_TYPE)
+    if chunked:
+        handler.send_header("Transfer-Encoding", "chunked")
+    handler.send_header("Connection", "close")
+    for name, value in validators.headers() if validators else []:
+        handler.send_header(name, value)
+    handler.end_headers()
+    for chunk in iter_chunks(iter_ndjson(payload)):
+        handler.wfile.write(chunk_frame(chunk) if chunked else chunk)
+    if chunked:
+        handler.wfile.write(chunk_frame(b""))
+
+
+def handle_get(path: str, views: dict[str, ViewSpec]) -> tuple[int, dict[str, Any]]:
+    if path == "/health":
+        return 200, {"ok": True}
+
+    if path == "/views":
+        names = sorted(views.keys())
+        return 200, {"views": names, "count": len(names)}
+
+    if path.startswith("/views/"):
+        name = path[len("/views/") :].strip()
+        spec = views.get(name)
+        if not spec:
+            return 404, {"error": f"Unknown view: {name}"}
+        return 200, {
+            "name": spec.name,
+            "kind": spec.kind,
+            "description": spec.description,
+            "params_schema": spec.params_schema,
+        }
+
+    return 404, {"error": "Not found"}
+
+
+POST_ROUTES = ("/run", "/run/batch")
+GET_RUN_ROUTE = "/run"
+
+
+def run_query_body(query: str) -> bytes:
+    """
+    The `POST /run` body equivalent to `GET /run?name=..&params=<json>&refresh=1&format=..&table=..`.
+
+    The GET form exists so a view response can carry a TTL-based `max-age` and be revalidated like
+    any other GET resource.
+    """
+    q = {k: v[-1] for k, v in parse_qs(query, keep_blank_values=True).items()}
+    req: dict[str, Any] = {k: q[k] for k in ("name", "format", "table") if k in q}
+    if q.get("params"):
+        try:
+            req["params"] = json.loads(q["params"])
+        except ValueError:
+            req["params"] = q["params"]  # rejected by handle_post as a non-object
+    req["refresh"] = q.get("refresh", "").lower() in ("1", "true", "yes")
+    return json.dumps(req, ensure_ascii=False).encode("utf-8")
+
+
+def handle_post(path: str, body: bytes, views: dict[str, ViewSpec], provider: ToolProvider) -> tuple[int, dict[str, Any]]:
+    """POST routes. Blocking: they call upstream tools (the async server runs this on its executor)."""
+    if path not in POST_ROUTES:
+        return 404, {"error": "Not found"}
+
+    try:
+        req = json.loads((body or b"{}").decode("utf-8"))
+    except Exception as e:
+        return 400, {"error": f"Invalid JSON body: {e}"}
+    if not isinstance(req, dict):
+        return 400, {"error": "Invalid JSON body: expected an object"}
+
+    if path == "/run/batch":
+        return _handle_batch(req, views, provider)
+
+    name = (req.get("name") or "").strip()
+    params = req.get("params") or {}
+    refresh = bool(req.get("refresh") or False)
+
+    if not name:
+        return 400, {"error": "Missing 'name'"}
+    if not isinstance(params, dict):
+        return 400, {"error": "'params' must be an object"}
+
+    spec = views.get(name)
+    if not spec:
+        return 404, {"error": f"Unknown view: {name}"}
+
+    result = run_view(spec, params=params, provider=provider, refresh=refresh)
+    return 200, result.to_dict()
+
+
+def _handle_batch(req: dict[str, Any], views: dict[str, ViewSpec], provider: ToolProvider) -> tuple[int, dict[str, Any]]:
+    items = req.get("views")
+    refresh = bool(req.get("refresh") or False)
+    if not isinstance(items, list) or not items:
+        return 400, {"error": "'views' must be a non-empty list of {name, params}"}
+    limit = max(1, int(os.getenv("FINSKILLS_VIEW_BATCH_MAX", "32")))
+    if len(items) > limit:
+        return 400, {"error": f"Too many views in one batch: {len(items)} > {limit}"}
+
+    batch: list[tuple[ViewSpec, dict[str, Any]]] = []
+    unknown: list[str] = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            return 400, {"error": f"views[{i}] must be an object"}
+        name = (item.get("name") or "").strip()
+        params = item.get("params") or {}
+        if not name:
+            return 400, {"error": f"Missing 'name' in views[{i}]"}
+        if not isinstance(params, dict):
+            return 400, {"error": f"'params' in views[{i}] must be an object"}
+        spec = views.get(name)
+        if not spec:
+            unknown.append(name)
+            continue
+        batch.append((spec, params))
+    if unknown:
+        return 404, {"error": f"Unknown view(s): {', '.join(unknown)}"}
+
+    started = time.time()
+    results, stats = run_views_batch(batch, provider=provider, refresh=refresh)
+    meta = {
+        "layer": "views_batch",
+        "as_of": datetime.now().isoformat(timespec="seconds"),
+        "elapsed_seconds": round(time.time() - started, 3),
+        **stats,
+    }
+    return 200, {"meta": meta, "results": [r.to_dict() for r in results]}
+
+
 class ViewServiceHandler(BaseHTTPRequestHandler):
     registry: ToolRegistry
     provider: AkshareProvider
@@ -30,58 +200,43 @@ class ViewServiceHandler(BaseHTTPRequestHandler):
         # Keep stdout clean by default; uncomment if needed.
         return
 
+    def _conditional(self, status: int, payload: dict[str, Any], opts: ResponseOptions) -> tuple[Validators | None, bool]:
+        validators = cache_validators(self.command, self.path, status, payload, opts)
+        hit = validators is not None and not_modified(
+            validators, self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since")
+        )
+        return validators, hit
+
     def do_GET(self) -> None:  # noqa: N802
-        if self.path == "/health":
-            return _json_response(self, 200, {"ok": True})
-
-        if self.path == "/views":
-            names = sorted(self.views.keys())
-            return _json_response(self, 200, {"views": names, "count": len(names)})
-
-        if self.path.startswith("/views/"):
-            name = self.path[len("/views/") :].strip()
-            spec = self.views.get(name)
-            if not spec:
-                return _json_response(self, 404, {"error": f"Unknown view: {name}"})
-            return _json_response(
-                self,
-                200,
-                {
-                    "name": spec.name,
-                    "kind": spec.kind,
-                    "description": spec.description,
-                    "params_schema": spec.params_schema,
-                },
-            )
-
-        return _json_response(self, 404, {"error": "Not found"})
+        path, _, query = self.path.partition("?")
+        body = b""
+        if path == GET_RUN_ROUTE:
+            body = run_query_body(query)
+            status, payload = handle_post(path, body, self.views, self.provider)
+        else:
+            status, payload = handle_get(self.path, self.views)
+        opts = negotiate(self.headers.get("Accept"), self.headers.get("Accept-Encoding"), body, streamable=False)
+        validators, hit = self._conditional(status, payload, opts)
+        if hit:
+            return _not_modified_response(self, validators)
+        return _json_response(self, status, payload, opts, validators)
 
     def do_POST(self) -> None:  # noqa: N802
-        if self.path != "/run":
+        if self.path not in POST_ROUTES:
             return _json_response(self, 404, {"error": "Not found"})
-
         try:
             length = int(self.headers.get("Content-Length") or "0")
             body = self.rfile.read(length) if length > 0 else b"{}"
-            req = json.loads(body.decode("utf-8"))
         except Exception as e:
             return _json_response(self, 400, {"error": f"Invalid JSON body: {e}"})
-
-        name = (req.get("name") or "").strip()
-        params = req.get("params") or {}
-        refresh = bool(req.get("refresh") or False)
-
-        if not name:
-            return _json_response(self, 400, {"error": "Missing 'name'"})
-        if not isinstance(params, dict):
-            return _json_response(self, 400, {"error": "'params' must be an object"})
-
-        spec = self.views.get(name)
-        if not spec:
-            return _json_response(self, 404, {"error": f"Unknown view: {name}"})
-
-        result = run_view(spec, params=params, provider=self.provider, refresh=refresh)
-        return _json_response(self, 200, result.to_dict())
+        status, payload = handle_post(self.path, body, self.views, self.provider)
+        opts = negotiate(self.headers.get("Accept"), self.headers.get("Accept-Encoding"), body)
+        validators, hit = self._conditional(status, payload, opts)
+        if hit:
+            return _not_modified_response(self, validators)
+        if status == 200 and opts.stream:
+            return _ndjson_response(self, status, payload, validators)
+        return _json_response(self, status, payload, opts, validators)
 
 
 def _build_views(cn_toolkit_root: Path, registry: ToolRegistry) -> dict[str, ViewSpec]:
@@ -117,6 +272,12 @@ def main() -> int:
     p.add_argument("--host", default="127.0.0.1")
     p.add_argument("--port", type=int, default=8808)
     p.add_argument("--cn-toolkit-root", default="China-market/findata-toolkit-cn")
+    p.add_argument(
+        "--mode",
+        choices=("threaded", "async"),
+        default=os.getenv("FINSKILLS_VIEW_SERVER_MODE", "threaded"),
+        help="threaded: one thread per connection; async: asyncio keep-alive server with a bounded executor",
+    )
     args = p.parse_args()
 
     cn_root = Path(args.cn_toolkit_root).resolve()
@@ -125,6 +286,11 @@ def main() -> int:
     provider = AkshareProvider(registry=registry)
     views = _build_views(cn_root, registry)
 
+    if args.mode == "async":
+        from .async_server import serve
+
+        return serve(views=views, provider=provider, host=args.host, port=args.port)
+
     def handler_factory(*_args, **_kwargs):
         cls = ViewServiceHandler
         cls.registry = registry
@@ -0,0 +1,204 @@
+"""
+Response content negotiation for the view service.
+
+Formats (picked from `Accept` by q-value, `q=0` excluding a type; or `"format"` in the POST body, which wins):
+- `json` (default, `application/json`): the envelope as before, pretty-printed.
+- `columnar` (`application/vnd.finskills.columnar+json`): compact JSON; every tabular tool result
+  (a list of row objects) becomes `{"columns": [...], "rows": [[...], ...]}` and its meta gets
+  `"data_format": "columnar"`, so column names are sent once per table instead of once per row.
+- `arrow` (`application/vnd.apache.arrow.stream`, needs pyarrow; `/run` only): one table as an Arrow IPC stream.
+  Pick it with `"table": "<result key>"` (default: the only tabular result); the rest of the envelope
+  is in the schema metadata under `finskills`.
+
+Any format is compressed with gzip or deflate when `Accept-Encoding` allows it and the body is at least
+`FINSKILLS_VIEW_COMPRESS_MIN_BYTES` (default 1024). NDJSON streaming (streaming.py) takes precedence.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import zlib
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .streaming import wants_stream
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+COLUMNAR_CONTENT_TYPE = "application/vnd.finskills.columnar+json; charset=utf-8"
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+
+_ACCEPT_FORMATS = (
+    ("application/vnd.finskills.columnar+json", "columnar"),
+    ("application/vnd.apache.arrow.stream", "arrow"),
+)
+
+
+@dataclass(frozen=True)
+class ResponseOptions:
+    format: str = "json"  # json | columnar | arrow
+    encoding: Optional[str] = None  # gzip | deflate
+    stream: bool = False
+    table: Optional[str] = None
+
+
+def _q_values(header: Optional[str]) -> dict[str, float]:
+    """`Accept`-style header -> {token: q} (q defaults to 1; a malformed q counts as 0)."""
+    offered: dict[str, float] = {}
+    for part in (header or "").lower().split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if name:
+            offered[name] = q
+    return offered
+
+
+def _accepted_format(accept: Optional[str]) -> str:
+    offered = _q_values(accept)
+    if not offered:
+        return "json"
+    wildcard = max(offered.get("*/*", 0.0), offered.get("application/*", 0.0))
+    candidates = [(offered.get(media, 0.0), name) for media, name in _ACCEPT_FORMATS]
+    candidates.append((offered.get("application/json", wildcard), "json"))
+    q, name = max(candidates, key=lambda c: c[0])  # first wins on ties: columnar, arrow, json
+    return name if q > 0 else "json"
+
+
+def _accepted_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    offered = _q_values(accept_encoding)
+    for enc in ("gzip", "deflate"):
+        if offered.get(enc, offered.get("*", 0.0)) > 0:
+            return enc
+    return None
+
+
+def negotiate(
+    accept: Optional[str], accept_encoding: Optional[str], body: bytes = b"", *, streamable: bool = True
+) -> ResponseOptions:
+    """Response options for a request; `streamable=False` (GET routes) never selects NDJSON."""
+    fmt = _accepted_format(accept)
+    table: Optional[str] = None
+    if body:
+        try:
+            req = json.loads(body.decode("utf-8"))
+        except Exception:
+            req = None
+        if isinstance(req, dict):
+            if req.get("format") in ("json", "columnar", "arrow"):
+                fmt = str(req["format"])
+            table = str(req["table"]) if req.get("table") else None
+    return ResponseOptions(
+        format=fmt,
+        encoding=_accepted_encoding(accept_encoding),
+        stream=streamable and (_q_values(accept).get("application/x-ndjson", 0.0) > 0 or wants_stream(None, body)),
+        table=table,
+    )
+
+
+def _is_records(data: Any) -> bool:
+    return isinstance(data, list) and len(data) > 0 and all(isinstance(r, dict) for r in data)
+
+
+def _columns(records: list[dict[str, Any]]) -> tuple[list[str], list[list[Any]]]:
+    columns: dict[str, None] = {}
+    for r in records:
+        for k in r:
+            columns.setdefault(k, None)
+    cols = list(columns)
+    return cols, [[r.get(c) for c in cols] for r in records]
+
+
+def _view_columnar(view: dict[str, Any]) -> dict[str, Any]:
+    data = view.get("data")
+    if not isinstance(data, dict):
+        return view
+    out: dict[str, Any] = {}
+    for key, res in data.items():
+        if isinstance(res, dict) and _is_records(res.get("data")):
+            cols, rows = _columns(res["data"])
+            res = {**res, "meta": {**(res.get("meta") or {}), "data_format": "columnar"}, "data": {"columns": cols, "rows": rows}}
+        out[key] = res
+    return {**view, "meta": {**(view.get("meta") or {}), "format": "columnar"}, "data": out}
+
+
+def to_columnar(payload: dict[str, Any]) -> dict[str, Any]:
+    """Columnar copy of a `/run` envelope or `/run/batch` response (the input is not modified)."""
+    if isinstance(payload.get("results"), list):
+        return {**payload, "results": [_view_columnar(v) if isinstance(v, dict) else v for v in payload["results"]]}
+    return _view_columnar(payload)
+
+
+class NotAcceptable(Exception):
+    pass
+
+
+def to_arrow_ipc(payload: dict[str, Any], table: Optional[str] = None) -> bytes:
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise NotAcceptable("Arrow output needs pyarrow on the server") from e
+
+    data = payload.get("data") if isinstance(payload.get("data"), dict) else {}
+    tabular = [k for k, res in data.items() if isinstance(res, dict) and _is_records(res.get("data"))]
+    if table is None:
+        if len(tabular) != 1:
+            raise NotAcceptable(f"Arrow output needs 'table' (one of: {', '.join(tabular) or 'none'})")
+        table = tabular[0]
+    elif table not in tabular:
+        raise NotAcceptable(f"No tabular result {table!r} (tabular: {', '.join(tabular) or 'none'})")
+
+    cols, rows = _columns(data[table]["data"])
+    arrays = []
+    for i in range(len(cols)):
+        values = [r[i] for r in rows]
+        try:
+            arrays.append(pa.array(values))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed-type column (e.g. "-" placeholders among numbers): ship it as strings.
+            arrays.append(pa.array([None if v is None else str(v) for v in values], type=pa.string()))
+    envelope = {**payload, "data": {k: ({**v, "data": None} if k == table else v) for k, v in data.items()}, "table": table}
+    schema_meta = {b"finskills": json.dumps(envelope, ensure_ascii=False, default=str).encode("utf-8")}
+    tbl = pa.Table.from_arrays(arrays, names=cols).replace_schema_metadata(schema_meta)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, tbl.schema) as writer:
+        writer.write_table(tbl)
+    return sink.getvalue().to_pybytes()
+
+
+def _compress(raw: bytes, encoding: Optional[str]) -> tuple[bytes, Optional[str]]:
+    if encoding is None or len(raw) < int(os.getenv("FINSKILLS_VIEW_COMPRESS_MIN_BYTES", "1024")):
+        return raw, None
+    level = int(os.getenv("FINSKILLS_VIEW_GZIP_LEVEL", "5"))
+    if encoding == "gzip":
+        return gzip.compress(raw, compresslevel=level, mtime=0), "gzip"
+    return zlib.compress(raw, level), "deflate"
+
+
+def render(status: int, payload: dict[str, Any], opts: ResponseOptions) -> tuple[int, bytes, list[tuple[str, str]]]:
+    """Encode a response body for `opts`. Returns (status, body, headers); Content-Length is included."""
+    content_type = JSON_CONTENT_TYPE
+    if status == 200 and opts.format == "arrow" and "data" in payload:
+        try:
+            raw = to_arrow_ipc(payload, opts.table)
+            content_type = ARROW_CONTENT_TYPE
+        except NotAcceptable as e:
+            status, raw = 406, json.dumps({"error": str(e)}, ensure_ascii=False, indent=2).encode("utf-8")
+    elif status == 200 and opts.format == "columnar":
+        raw = json.dumps(to_columnar(payload), ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        content_type = COLUMNAR_CONTENT_TYPE
+    else:
+        raw = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+
+    raw, encoding = _compress(raw, opts.encoding)
+    headers = [("Content-Type", content_type), ("Content-Length", str(len(raw))), ("Vary", "Accept, Accept-Encoding")]
+    if encoding:
+        headers.append(("Content-Encoding", encoding))
+    return status, raw, headers
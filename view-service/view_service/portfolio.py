@@ -0,0 +1,289 @@
+"""
+组合层面的回测模拟（CN）
+
+`calculate_returns` 把每条信号当作独立交易；这里把同一批信号放进一个资金账户里按日模拟：
+
+- 仓位：每笔按当日权益的固定比例（position_size）开仓，A 股按手（lot_size）取整，受现金约束
+- 并发上限：同时持仓数不超过 max_positions，超出的信号按信号顺序丢弃
+- 成本：买卖佣金 + 滑点（bps），卖出另计印花税
+- 涨跌停：收盘涨停的信号买不进（丢弃）；到期当日收盘跌停卖不出，顺延到下一个非跌停交易日
+- 停牌：无行情的交易日不成交，持有天数只按该股票自己的交易日计
+
+入场/出场口径与 calculate_returns 一致：信号日（或之后首个交易日）收盘买入，持有 holding_period 个交易日后收盘卖出。
+按交易日循环：持有天数、涨跌停、估值对全部股票做数组运算；当日成交的出场/入场仍逐笔循环（只涉及当日成交的股票）。
+行情从最早信号日前 LOOKBACK_DAYS 自然日开始取，保证首个交易日也有前收盘价用于判断涨跌停。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from .backtest_framework import BacktestFramework
+
+
+@dataclass
+class PortfolioConfig:
+    """组合模拟配置"""
+
+    holding_period: int = 5  # 持有交易日数
+    initial_capital: float = 1_000_000.0
+    position_size: float = 0.1  # 每笔目标仓位占当日权益比例
+    max_positions: int = 10  # 同时持仓上限
+    commission_bps: float = 2.5  # 买卖双边佣金
+    slippage_bps: float = 5.0  # 买卖双边滑点
+    stamp_duty_bps: float = 5.0  # 卖出印花税
+    lot_size: int = 100  # 每手股数；0 表示允许零股
+    limit_pct: Optional[float] = None  # 涨跌停幅度；None 按板块（主板 10%、创业/科创 20%、北交所 30%）
+    periods_per_year: int = 252
+
+
+@dataclass
+class PortfolioResult:
+    """组合模拟结果"""
+
+    config: PortfolioConfig
+    equity: pd.Series  # 每日收盘权益
+    daily_returns: pd.Series
+    drawdown: pd.Series
+    turnover: pd.Series  # 当日成交额 / 前一日权益
+    positions: pd.Series  # 每日持仓数
+    trades: pd.DataFrame  # 每笔交易（未平仓的 exit_date 为空）
+    stats: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "config": self.config.__dict__,
+            "statistics": {k: (round(v, 6) if isinstance(v, float) else v) for k, v in self.stats.items()},
+            "equity_curve": [[d, round(float(v), 2)] for d, v in self.equity.items()],
+        }
+
+
+LOOKBACK_DAYS = 20  # 覆盖春节等长假，取到信号日之前至少一根 K 线
+
+
+def board_limit_pct(symbol: str) -> float:
+    """按代码前缀推断涨跌停幅度（不识别 ST）。"""
+    if symbol.startswith(("300", "301", "688", "689")):
+        return 0.20
+    if symbol.startswith(("4", "8", "92")):
+        return 0.30
+    return 0.10
+
+
+def _price_panel(
+    framework: "BacktestFramework", symbols: list[str], start: str, end: str
+) -> tuple[np.ndarray, np.ndarray]:
+    """-> (交易日 YYYY-MM-DD, 收盘矩阵 T x N；该股票当日无行情为 NaN)"""
+    series: list[pd.Series] = []
+    for sym in symbols:
+        arrays = framework._price_arrays(framework.get_price_history(sym, start, end))
+        if arrays is None:
+            series.append(pd.Series(dtype=float, name=sym))
+            continue
+        dates, closes = arrays
+        s = pd.Series(closes, index=dates, name=sym)
+        series.append(s[~s.index.duplicated(keep="last")])
+    panel = pd.concat(series, axis=1).sort_index() if series else pd.DataFrame()
+    panel = panel[(panel.index >= start) & (panel.index <= end)]
+    return panel.index.to_numpy(dtype="U10"), panel.to_numpy(dtype=float)
+
+
+def simulate_portfolio(
+    framework: "BacktestFramework",
+    signals: pd.DataFrame,
+    config: Optional[PortfolioConfig] = None,
+    *,
+    end_date: Optional[str] = None,
+) -> PortfolioResult:
+    """
+    按日模拟信号组合。signals 为 rule_* 产出的信号表（交易日期/股票代码/信号类型 列，与 calculate_returns 相同）。
+    end_date 默认取最后一条信号之后 max(3*持有期, 30) 自然日。
+    """
+    cfg = config or PortfolioConfig()
+    sig = framework._signal_frame(signals)
+    symbols = list(dict.fromkeys(sig["symbol"].tolist()))
+    empty = pd.Series(dtype=float)
+    if sig.empty:
+        return PortfolioResult(cfg, empty, empty, empty, empty, empty, pd.DataFrame(), _stats(cfg, empty, empty, pd.DataFrame(), {}))
+
+    start = sig["d0"].min().strftime("%Y-%m-%d")
+    fetch_start = (sig["d0"].min() - pd.Timedelta(days=LOOKBACK_DAYS)).strftime("%Y-%m-%d")
+    end = end_date or (sig["d0"].max() + framework._window_days(cfg.holding_period)).strftime("%Y-%m-%d")
+    framework.prefetch_prices(symbols, fetch_start, end)
+    dates, close = _price_panel(framework, symbols, fetch_start, end)
+    N = close.shape[1]
+
+    mark = pd.DataFrame(close).ffill().to_numpy()  # 停牌日按最近收盘价估值
+    prev = np.vstack([np.full((1, N), np.nan), mark[:-1]])
+    # 前收盘价算完后再裁掉 start 之前的回看区间
+    first = int(np.searchsorted(dates, start, side="left"))
+    dates, close, mark, prev = dates[first:], close[first:], mark[first:], prev[first:]
+    T = len(dates)
+    if T == 0:
+        return PortfolioResult(cfg, empty, empty, empty, empty, empty, pd.DataFrame(), _stats(cfg, empty, empty, pd.DataFrame(), {}))
+
+    has_bar = ~np.isnan(close)
+    limit = np.array([cfg.limit_pct if cfg.limit_pct is not None else board_limit_pct(s) for s in symbols])
+    with np.errstate(invalid="ignore"):
+        # 价格按分取整，留 1 分钱容差
+        limit_up = has_bar & (close >= np.round(prev * (1 + limit), 2) - 0.005)
+        limit_down = has_bar & (close <= np.round(prev * (1 - limit), 2) + 0.005)
+
+    # 信号 -> (入场交易日下标, 股票下标)，保持信号顺序
+    # 入场日 = 该股票自己首个 日期 >= 信号日 的交易日（与 calculate_returns 一致）
+    sym_idx = {s: i for i, s in enumerate(symbols)}
+    d0 = sig["d0"].dt.strftime("%Y-%m-%d").to_numpy(dtype="U10")
+    sig_sym = sig["symbol"].map(sym_idx).to_numpy()
+    entry_t = np.full(len(sig), T)
+    for i in range(N):
+        rows = np.flatnonzero(sig_sym == i)
+        bar_t = np.flatnonzero(has_bar[:, i])
+        if len(rows) == 0 or len(bar_t) == 0:
+            continue
+        k = np.searchsorted(dates[bar_t], d0[rows], side="left")
+        ok = k < len(bar_t)
+        entry_t[rows[ok]] = bar_t[k[ok]]
+    skipped_no_bar = int((entry_t >= T).sum())
+    keep = entry_t < T
+    entry_t, sig_sym = entry_t[keep], sig_sym[keep]
+    order = np.argsort(entry_t, kind="mergesort")
+    entry_t, sig_sym = entry_t[order], sig_sym[order]
+    bounds = np.searchsorted(entry_t, np.arange(T + 1), side="left")
+
+    buy_cost = (cfg.commission_bps + cfg.slippage_bps) / 1e4
+    sell_cost = (cfg.commission_bps + cfg.slippage_bps + cfg.stamp_duty_bps) / 1e4
+    lot = max(int(cfg.lot_size), 0)
+
+    cash = float(cfg.initial_capital)
+    shares = np.zeros(N)
+    bars_held = np.zeros(N, dtype=int)
+    open_trade = np.full(N, -1)
+    equity = np.zeros(T)
+    traded = np.zeros(T)
+    n_pos = np.zeros(T, dtype=int)
+    trades: list[dict[str, Any]] = []
+    skipped = {"limit_up": 0, "capacity": 0, "held": 0, "no_bar": skipped_no_bar, "cash": 0}
+
+    prev_equity = cash
+    for t in range(T):
+        held = shares > 0
+        bars_held[held & has_bar[t]] += 1
+
+        # 出场：到期 + 当日有行情 + 非跌停
+        exits = np.flatnonzero(held & (bars_held >= cfg.holding_period) & has_bar[t] & ~limit_down[t])
+        if len(exits):
+            px = close[t, exits]
+            proceeds = shares[exits] * px
+            cash += float((proceeds * (1 - sell_cost)).sum())
+            traded[t] += float(proceeds.sum())
+            for j, i in enumerate(exits):
+                tr = trades[open_trade[i]]
+                tr.update(exit_date=str(dates[t]), exit_price=float(px[j]), holding_days=int(bars_held[i]))
+                tr["pnl"] = float(shares[i] * px[j] * (1 - sell_cost) - tr["cost_basis"])
+                tr["return_pct"] = tr["pnl"] / tr["cost_basis"]
+            shares[exits] = 0.0
+            bars_held[exits] = 0
+            open_trade[exits] = -1
+
+        # 入场：当日信号按顺序，受并发上限、涨停、现金约束
+        lo, hi = bounds[t], bounds[t + 1]
+        if hi > lo:
+            equity_now = cash + float(np.nansum(shares * mark[t]))
+            slots = cfg.max_positions - int((shares > 0).sum())
+            for i in sig_sym[lo:hi]:
+                if shares[i] > 0 or open_trade[i] >= 0:
+                    skipped["held"] += 1
+                    continue
+                if limit_up[t, i]:
+                    skipped["limit_up"] += 1
+                    continue
+                if slots <= 0:
+                    skipped["capacity"] += 1
+                    continue
+                px = close[t, i]
+                budget = min(equity_now * cfg.position_size, cash)
+                qty = budget / (px * (1 + buy_cost))
+                if lot:
+                    qty = np.floor(qty / lot) * lot
+                if qty <= 0:
+                    skipped["cash"] += 1
+                    continue
+                notional = qty * px
+                cash -= notional * (1 + buy_cost)
+                traded[t] += notional
+                shares[i] = qty
+                bars_held[i] = 0
+                open_trade[i] = len(trades)
+                trades.append(
+                    {
+                        "symbol": symbols[i],
+                        "entry_date": str(dates[t]),
+                        "entry_price": float(px),
+                        "shares": float(qty),
+                        "cost_basis": float(notional * (1 + buy_cost)),
+                        "exit_date": None,
+                        "exit_price": None,
+                        "holding_days": None,
+                        "pnl": None,
+                        "return_pct": None,
+                    }
+                )
+                slots -= 1
+
+        equity[t] = cash + float(np.nansum(shares * mark[t]))
+        n_pos[t] = int((shares > 0).sum())
+        traded[t] = traded[t] / prev_equity if prev_equity > 0 else 0.0
+        prev_equity = equity[t]
+
+    index = pd.Index(dates, name="date")
+    eq = pd.Series(equity, index=index, name="equity")
+    rets = eq.pct_change().fillna(eq.iloc[0] / cfg.initial_capital - 1.0)
+    dd = eq / eq.cummax() - 1.0
+    trades_df = pd.DataFrame(trades)
+    return PortfolioResult(
+        config=cfg,
+        equity=eq,
+        daily_returns=rets,
+        drawdown=dd,
+        turnover=pd.Series(traded, index=index, name="turnover"),
+        positions=pd.Series(n_pos, index=index, name="positions"),
+        trades=trades_df,
+        stats=_stats(cfg, eq, rets, trades_df, skipped, dd=dd, turnover=traded),
+    )
+
+
+def _stats(
+    cfg: PortfolioConfig,
+    equity: pd.Series,
+    rets: pd.Series,
+    trades: pd.DataFrame,
+    skipped: dict[str, int],
+    *,
+    dd: Optional[pd.Series] = None,
+    turnover: Optional[np.ndarray] = None,
+) -> dict[str, Any]:
+    if equity.empty:
+        return {"trading_days": 0, "trades": 0, "total_return": 0.0, "max_drawdown": 0.0, "skipped_signals": skipped}
+    n = len(equity)
+    total = float(equity.iloc[-1] / cfg.initial_capital - 1.0)
+    vol = float(rets.std(ddof=0))
+    closed = trades[trades["exit_date"].notna()] if not trades.empty else trades
+    return {
+        "trading_days": int(n),
+        "trades": int(len(trades)),
+        "open_positions": int(len(trades) - len(closed)),
+        "final_equity": float(equity.iloc[-1]),
+        "total_return": total,
+        "annualized_return": float((1 + total) ** (cfg.periods_per_year / n) - 1.0) if total > -1 else -1.0,
+        "annualized_volatility": vol * float(np.sqrt(cfg.periods_per_year)),
+        "sharpe_ratio": float(rets.mean() / vol * np.sqrt(cfg.periods_per_year)) if vol > 0 else 0.0,
+        "max_drawdown": float(dd.min()) if dd is not None else 0.0,
+        "avg_daily_turnover": float(np.mean(turnover)) if turnover is not None else 0.0,
+        "win_rate": float((closed["pnl"] > 0).mean()) if len(closed) else 0.0,
+        "skipped_signals": skipped,
+    }
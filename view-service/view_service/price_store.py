@@ -0,0 +1,198 @@
+"""
+Per-symbol daily-bar store for backtests.
+
+`BacktestFramework` used to cache price history per (symbol, start, end) window, so every signal
+window became its own upstream call and its own file. This store keeps one contiguous, extendable
+range per symbol (`<symbol>.parquet` + `<symbol>.json` coverage sidecar) and serves any sub-window by
+slicing locally. A request outside the covered range only fetches the missing edges.
+
+Coverage never extends past yesterday, so today's (possibly incomplete) bar is re-fetched later. It only
+grows over edges that returned bars (to the whole requested edge, so windows starting or ending on a
+weekend/holiday are covered); a completely empty (possibly transient) upstream answer is asked again next
+time instead of being remembered as "no bars".
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from .fileio import atomic_path, file_lock
+from .ratelimit import TokenBucket
+
+PriceFetcher = Callable[[str, str, str], pd.DataFrame]
+
+
+def _day(s: str) -> date:
+    s = (s or "").strip()
+    return datetime.strptime(s[:10], "%Y-%m-%d").date() if "-" in s else datetime.strptime(s[:8], "%Y%m%d").date()
+
+
+def _date_column(df: pd.DataFrame) -> str | None:
+    for col in ("日期", "date"):
+        if col in df.columns:
+            return col
+    return None
+
+
+class PriceStore:
+    def __init__(self, root: Path, fetch: PriceFetcher, *, limiter: TokenBucket | None = None) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._fetch = fetch
+        self._limiter = limiter  # shared by every upstream edge fetch (e.g. concurrent prefetch workers)
+        self._calls_lock = threading.Lock()
+        self.upstream_calls = 0
+
+    def _paths(self, symbol: str) -> tuple[Path, Path, Path]:
+        return (self.root / f"{symbol}.parquet", self.root / f"{symbol}.csv.gz", self.root / f"{symbol}.json")
+
+    def _lock_path(self, symbol: str) -> Path:
+        return self.root / ".locks" / f"{symbol}.lock"
+
+    def coverage(self, symbol: str) -> tuple[date, date] | None:
+        _, _, meta_path = self._paths(symbol)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            return _day(meta["start"]), _day(meta["end"])
+        except Exception:
+            return None
+
+    def _read(self, symbol: str) -> pd.DataFrame | None:
+        parquet_path, csv_path, _ = self._paths(symbol)
+        if parquet_path.exists():
+            try:
+                return pd.read_parquet(parquet_path)
+            except Exception:
+                pass
+        if csv_path.exists():
+            try:
+                return pd.read_csv(csv_path, dtype={"日期": str, "date": str})
+            except Exception:
+                pass
+        return None
+
+    def _write(self, symbol: str, df: pd.DataFrame, start: date, end: date) -> None:
+        parquet_path, csv_path, meta_path = self._paths(symbol)
+        try:
+            with atomic_path(parquet_path) as tmp:
+                df.to_parquet(tmp, index=False)
+            stale = csv_path
+        except Exception:
+            with atomic_path(csv_path) as tmp:
+                df.to_csv(tmp, index=False, compression="gzip")
+            stale = parquet_path
+        stale.unlink(missing_ok=True)
+        # Sidecar last: the new coverage only becomes visible once the bars are in place.
+        with atomic_path(meta_path) as tmp:
+            tmp.write_text(
+                json.dumps({"start": start.isoformat(), "end": end.isoformat(), "rows": int(len(df))}),
+                encoding="utf-8",
+            )
+
+    @staticmethod
+    def _slice(df: pd.DataFrame | None, start: date, end: date) -> pd.DataFrame:
+        if df is None or df.empty:
+            return pd.DataFrame()
+        col = _date_column(df)
+        if col is None:
+            return df
+        mask = (df[col] >= start.isoformat()) & (df[col] <= end.isoformat())
+        return df[mask].reset_index(drop=True)
+
+    def invalidate(self, symbol: str) -> bool:
+        """Drop the stored bars and coverage of `symbol` (and its lock file); True if anything was stored."""
+        lock_path = self._lock_path(symbol)
+        with file_lock(lock_path):
+            existed = False
+            for p in self._paths(symbol):
+                existed = p.exists() or existed
+                p.unlink(missing_ok=True)
+            lock_path.unlink(missing_ok=True)
+        return existed
+
+    def covers(self, symbol: str, start_date: str, end_date: str) -> bool:
+        cov = self.coverage(symbol)
+        return cov is not None and cov[0] <= _day(start_date) and _day(end_date) <= cov[1]
+
+    def _fetch_range(self, symbol: str, start: date, end: date) -> pd.DataFrame:
+        if self._limiter is not None:
+            self._limiter.acquire()
+        with self._calls_lock:
+            self.upstream_calls += 1
+        df = self._fetch(symbol, start.isoformat(), end.isoformat())
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            return pd.DataFrame()
+        col = _date_column(df)
+        if col is None:
+            return df
+        df = df.copy()
+        df[col] = df[col].astype(str).str.slice(0, 10)
+        return df
+
+    @staticmethod
+    def _merge(frames: list[pd.DataFrame]) -> pd.DataFrame:
+        frames = [f for f in frames if f is not None and not f.empty]
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        col = _date_column(df)
+        if col is None:
+            return df
+        df = df.drop_duplicates(subset=[col], keep="last").sort_values(col, kind="mergesort")
+        return df.reset_index(drop=True)
+
+    def get(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """Bars for `symbol` in [start_date, end_date] (inclusive); fetches only the uncovered edges."""
+        start, end = _day(start_date), _day(end_date)
+        if end < start:
+            return pd.DataFrame()
+
+        cov = self.coverage(symbol)
+        if cov is not None and cov[0] <= start and end <= cov[1]:
+            return self._slice(self._read(symbol), start, end)
+
+        with file_lock(self._lock_path(symbol)):
+            cov = self.coverage(symbol)  # another process may have extended it while we waited
+            stored = self._read(symbol) if cov is not None else None
+            if cov is not None and stored is not None and cov[0] <= start and end <= cov[1]:
+                return self._slice(stored, start, end)
+            if stored is None:
+                cov = None
+
+            if cov is None:
+                edges = [(start, end)]
+                fetched: list[pd.DataFrame] = []
+            else:
+                edges = []
+                if start < cov[0]:
+                    edges.append((start, cov[0] - timedelta(days=1)))
+                if end > cov[1]:
+                    edges.append((cov[1] + timedelta(days=1), end))
+                fetched = [stored]
+
+            yesterday = date.today() - timedelta(days=1)
+            new_cov = cov
+            for lo, hi in edges:
+                df = self._fetch_range(symbol, lo, hi)
+                fetched.append(df)
+                last = min(hi, yesterday)
+                if df.empty or lo > last:
+                    continue
+                # Edges are adjacent to stored coverage, so the union stays contiguous.
+                if new_cov is None:
+                    new_cov = (lo, last)
+                elif hi < new_cov[0]:
+                    new_cov = (lo, new_cov[1])
+                else:
+                    new_cov = (new_cov[0], max(new_cov[1], last))
+
+            merged = self._merge(fetched)
+            if not merged.empty and new_cov is not None and new_cov != cov:
+                self._write(symbol, merged, *new_cov)
+            return self._slice(merged, start, end)
@@ -2,14 +2,20 @@ from __future__ import annotations
 
 import inspect
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from urllib.parse import urlparse
 from typing import Any
 
 from .provider_base import ToolProvider, ToolResult
+from .ratelimit import TokenBucket as _TokenBucket
+from .result_cache import ResultCache, cache_key, estimate_nbytes, ttl_class, ttl_meta
+from .singleflight import SingleFlight
+from .symbol_universe import get_symbol_universe, tx_prefix_symbol as _tx_prefix_symbol
 from .tool_registry import ToolRegistry
 from .akshare_health import get_health_monitor, check_akshare_health
 
@@ -56,24 +62,6 @@ def _normalize_yyyymmdd(val: Any, *, default: str) -> str:
     return default
 
 
-def _tx_prefix_symbol(symbol: str) -> str:
-    s = (symbol or "").strip()
-    if not s:
-        return s
-    if s.startswith(("sh", "sz", "bj")) and len(s) >= 8:
-        return s
-    code = s
-    if code.startswith(("SH", "SZ", "BJ")):
-        return code.lower()
-    if code.startswith("6"):
-        return f"sh{code}"
-    if code.startswith(("0", "3")):
-        return f"sz{code}"
-    if code.startswith(("4", "8")):
-        return f"bj{code}"
-    return f"sz{code}"
-
-
 def _parse_tx_quote_payload(payload: str) -> dict[str, Any] | None:
     # 腾讯行情: "~" 分隔字段，见 https://qt.gtimg.cn
     fields = (payload or "").split("~")
@@ -158,44 +146,127 @@ def _requests_session_no_proxy():
     return s
 
 
+_TX_URL = "https://qt.gtimg.cn/q="
+_tx_lock = threading.Lock()
+_tx_session = None
+_tx_bucket: _TokenBucket | None = None
+
+
+def _tx_workers() -> int:
+    return max(1, int(os.getenv("FINSKILLS_TX_WORKERS", "8")))
+
+
+def _tx_shared() -> tuple[Any, _TokenBucket]:
+    """Process-wide pooled session + rate limiter for qt.gtimg.cn (created lazily)."""
+    global _tx_session, _tx_bucket
+    with _tx_lock:
+        if _tx_session is None:
+            from requests.adapters import HTTPAdapter
+
+            s = _requests_session_no_proxy()
+            pool = _tx_workers()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _tx_session = s
+        if _tx_bucket is None:
+            _tx_bucket = _TokenBucket(
+                rate=float(os.getenv("FINSKILLS_TX_RATE", "20")),
+                burst=int(os.getenv("FINSKILLS_TX_BURST", str(_tx_workers()))),
+            )
+        return _tx_session, _tx_bucket
+
+
+def _parse_tx_batch(text: str) -> dict[str, dict[str, Any]]:
+    out: dict[str, dict[str, Any]] = {}
+    parts = [p.strip() for p in (text or "").split(";") if p.strip()]
+    for part in parts:
+        if "=\"" not in part:
+            continue
+        try:
+            left, rest = part.split("=\"", 1)
+            payload = rest.rsplit("\"", 1)[0]
+            # left is like v_sz000001
+            sym = left.strip()
+            if sym.startswith("v_"):
+                sym = sym[2:]
+            parsed = _parse_tx_quote_payload(payload)
+            if parsed and parsed.get("代码"):
+                out[sym] = parsed
+        except Exception:
+            continue
+    return out
+
+
+def _fetch_tx_batch(batch: list[str], *, timeout: float, retries: int, retry_sleep: float) -> dict[str, dict[str, Any]]:
+    """Fetch one multi-quote batch, retrying only this batch on failure."""
+    session, bucket = _tx_shared()
+    headers = {"User-Agent": os.getenv("FINSKILLS_UA", "Mozilla/5.0")}
+    attempt = 0
+    while True:
+        bucket.acquire()
+        try:
+            r = session.get(_TX_URL + ",".join(batch), timeout=timeout, headers=headers)
+            r.raise_for_status()
+            return _parse_tx_batch(r.text or "")
+        except Exception:
+            if attempt >= retries:
+                raise
+            attempt += 1
+            time.sleep(retry_sleep * attempt)
+
+
 def _fetch_tx_quotes(symbols: list[str], *, timeout: float) -> dict[str, dict[str, Any]]:
+    """
+    Tencent multi-quote for many symbols.
+
+    Batches run concurrently on a pooled keep-alive session under a shared token-bucket rate limit;
+    a failed batch is retried on its own instead of restarting the whole universe.
+    """
     if not symbols:
         return {}
-    s = _requests_session_no_proxy()
-    out: dict[str, dict[str, Any]] = {}
-    # Tencent supports multi-symbol query.
-    url = "https://qt.gtimg.cn/q="
-    batch_size = int(os.getenv("FINSKILLS_TX_BATCH_SIZE", "200"))
-    sleep_s = float(os.getenv("FINSKILLS_TX_SLEEP", "0.05"))
-    headers = {"User-Agent": os.getenv("FINSKILLS_UA", "Mozilla/5.0")}
+    batch_size = max(1, int(os.getenv("FINSKILLS_TX_BATCH_SIZE", "200")))
+    retries = int(os.getenv("FINSKILLS_TX_BATCH_RETRIES", "2"))
+    retry_sleep = float(os.getenv("FINSKILLS_CALL_RETRY_SLEEP", "0.3"))
+    batches = [symbols[i : i + batch_size] for i in range(0, len(symbols), batch_size)]
+
+    def fetch(batch: list[str]) -> dict[str, dict[str, Any]]:
+        return _fetch_tx_batch(batch, timeout=timeout, retries=retries, retry_sleep=retry_sleep)
 
-    for i in range(0, len(symbols), batch_size):
-        batch = symbols[i : i + batch_size]
-        q = ",".join(batch)
-        r = s.get(url + q, timeout=timeout, headers=headers)
-        r.raise_for_status()
-        text = r.text or ""
-        parts = [p.strip() for p in text.split(";") if p.strip()]
-        for part in parts:
-            if "=\"" not in part:
-                continue
+    if len(batches) == 1:
+        return fetch(batches[0])
+
+    out: dict[str, dict[str, Any]] = {}
+    failures: list[str] = []
+    with ThreadPoolExecutor(max_workers=min(_tx_workers(), len(batches)), thread_name_prefix="tx-quotes") as pool:
+        for batch, fut in [(b, pool.submit(fetch, b)) for b in batches]:
             try:
-                left, rest = part.split("=\"", 1)
-                payload = rest.rsplit("\"", 1)[0]
-                # left is like v_sz000001
-                sym = left.strip()
-                if sym.startswith("v_"):
-                    sym = sym[2:]
-                parsed = _parse_tx_quote_payload(payload)
-                if parsed and parsed.get("代码"):
-                    out[sym] = parsed
-            except Exception:
-                continue
-        if sleep_s > 0:
-            time.sleep(sleep_s)
+                out.update(fut.result())
+            except Exception as e:
+                failures.append(f"{batch[0]}..{batch[-1]}: {e}")
+    if failures:
+        raise RuntimeError(f"Tencent quotes: {len(failures)}/{len(batches)} batches failed ({failures[0]})")
     return out
 
 
+def _tx_spot_rows(market: str, *, timeout: float) -> list[dict[str, Any]]:
+    """Spot rows for one symbol-universe market from Tencent quotes, in universe order."""
+    symbols = list(get_symbol_universe().get(market).tx_symbols)
+    quotes = _fetch_tx_quotes(symbols, timeout=timeout)
+    # Build stable-ish output schema (fill missing as None).
+    rows: list[dict[str, Any]] = []
+    seq = 0
+    for sym in symbols:
+        q = quotes.get(sym)
+        if not q:
+            continue
+        seq += 1
+        row = {"序号": seq}
+        row.update({k: v for k, v in q.items() if k != "trade_date"})
+        rows.append(row)
+    return rows
+
+
 def _is_local_proxy_unreachable(proxy_url: str) -> bool:
     try:
         u = urlparse(proxy_url)
@@ -390,14 +461,82 @@ def _validate_and_convert_parameters(
     return converted
 
 
+def _singleflight_from_env() -> SingleFlight | None:
+    enabled = os.getenv("FINSKILLS_PROVIDER_SINGLEFLIGHT", "1").strip().lower() in {"1", "true", "yes", "y"}
+    return SingleFlight() if enabled else None
+
+
 @dataclass
 class AkshareProvider(ToolProvider):
     registry: ToolRegistry
+    cache: ResultCache | None = field(default_factory=ResultCache.from_env)
+    inflight: SingleFlight | None = field(default_factory=_singleflight_from_env)
 
     def call_tool(self, name: str, args: dict[str, Any], *, refresh: bool, meta_script: str) -> ToolResult:
-        # refresh is accepted for parity; caching is handled at higher layers for now.
-        _ = refresh
-        
+        if self.cache is None and self.inflight is None:
+            return self._call_upstream(name, args, meta_script=meta_script)
+
+        if name not in self.registry.tool_index:
+            raise ValueError(f"Unknown tool: {name}")
+        converted = _validate_and_convert_parameters(name, self.registry, dict(args or {}))
+        key = cache_key(name, converted)
+
+        if not refresh:
+            cached = self._cached_result(name, converted, key, meta_script=meta_script)
+            if cached is not None:
+                return cached
+
+        def fill() -> ToolResult:
+            return self._fill(name, args, converted, key=key, refresh=refresh, meta_script=meta_script)
+
+        if self.inflight is None:
+            return fill()
+
+        # Identical concurrent calls (same tool + normalized args) share one upstream execution. Refresh
+        # calls never join a non-refresh leader, which may answer from the cache.
+        res, shared = self.inflight.do(f"{key}:refresh" if refresh else key, fill)
+        if not shared:
+            return res
+        meta = dict(res.meta)
+        meta["script"] = meta_script
+        meta["singleflight"] = {"shared": True}
+        return ToolResult(meta=meta, data=res.data, warnings=list(res.warnings), errors=list(res.errors))
+
+    def _cached_result(self, name: str, converted: dict[str, Any], key: str, *, meta_script: str) -> ToolResult | None:
+        if self.cache is None:
+            return None
+        hit = self.cache.get(key)
+        if hit is None:
+            return None
+        cached, age = hit
+        meta = dict(cached.meta)
+        meta["script"] = meta_script
+        ttl = self.cache.get_ttl(name, converted)
+        meta["cache"] = {"hit": True, "ttl_class": ttl_class(name), "ttl_seconds": ttl_meta(ttl), "age_seconds": round(age, 3)}
+        return ToolResult(meta=meta, data=cached.data, warnings=list(cached.warnings), errors=[])
+
+    def _fill(
+        self, name: str, args: dict[str, Any], converted: dict[str, Any], *, key: str, refresh: bool, meta_script: str
+    ) -> ToolResult:
+        if not refresh:
+            # A previous leader may have filled the entry between our lookup and taking the lead.
+            cached = self._cached_result(name, converted, key, meta_script=meta_script)
+            if cached is not None:
+                return cached
+
+        res = self._call_upstream(name, args, meta_script=meta_script)
+        if self.cache is None:
+            return res
+        ttl = self.cache.get_ttl(name, converted)
+        meta = dict(res.meta)
+        meta["cache"] = {"hit": False, "ttl_class": ttl_class(name), "ttl_seconds": ttl_meta(ttl), "refresh": bool(refresh)}
+        res = ToolResult(meta=meta, data=res.data, warnings=res.warnings, errors=res.errors)
+        # Only cache clean results so failed calls are retried on the next request.
+        if not res.errors and res.data is not None:
+            self.cache.put(key, res, ttl=ttl, nbytes=estimate_nbytes(res.data))
+        return res
+
+    def _call_upstream(self, name: str, args: dict[str, Any], *, meta_script: str) -> ToolResult:
         # 获取健康监控器
         health_monitor = get_health_monitor()
         
@@ -464,35 +603,12 @@ class AkshareProvider(ToolProvider):
                 started = time.time()
                 errors: list[str] = []
                 data = None
-                attempt = 0
-                while True:
-                    try:
-                        timeout = _float_or_none(converted.get("timeout")) or default_timeout
-                        code_df = ak.stock_info_a_code_name()
-                        codes = [str(c).zfill(6) for c in code_df["code"].tolist()]
-                        symbols = [_tx_prefix_symbol(c) for c in codes]
-                        quotes = _fetch_tx_quotes(symbols, timeout=timeout)
-                        # Build stable-ish output schema (fill missing as None).
-                        rows: list[dict[str, Any]] = []
-                        seq = 0
-                        for sym in symbols:
-                            q = quotes.get(sym)
-                            if not q:
-                                continue
-                            seq += 1
-                            row = {"序号": seq}
-                            row.update({k: v for k, v in q.items() if k != "trade_date"})
-                            rows.append(row)
-                        data = rows
-                        errors = []
-                        break
-                    except Exception as e:
-                        errors = [str(e)]
-                        if attempt >= max_retries:
-                            break
-                        attempt += 1
-                        time.sleep(retry_sleep * (attempt + 1))
-                        continue
+                # No call-level retry: each quote batch already retries on its own.
+                try:
+                    timeout = _float_or_none(converted.get("timeout")) or default_timeout
+                    data = _tx_spot_rows("a", timeout=timeout)
+                except Exception as e:
+                    errors = [str(e)]
                 elapsed = time.time() - started
                 meta = {
                     "provider": "tencent",
@@ -511,34 +627,12 @@ class AkshareProvider(ToolProvider):
                 started = time.time()
                 errors: list[str] = []
                 data = None
-                attempt = 0
-                while True:
-                    try:
-                        timeout = _float_or_none(converted.get("timeout")) or default_timeout
-                        bj_df = ak.stock_info_bj_name_code()
-                        codes = [str(c).zfill(6) for c in bj_df["证券代码"].tolist()]
-                        symbols = [_tx_prefix_symbol(c) for c in codes]
-                        quotes = _fetch_tx_quotes(symbols, timeout=timeout)
-                        rows: list[dict[str, Any]] = []
-                        seq = 0
-                        for sym in symbols:
-                            q = quotes.get(sym)
-                            if not q:
-                                continue
-                            seq += 1
-                            row = {"序号": seq}
-                            row.update({k: v for k, v in q.items() if k != "trade_date"})
-                            rows.append(row)
-                        data = rows
-                        errors = []
-                        break
-                    except Exception as e:
-                        errors = [str(e)]
-                        if attempt >= max_retries:
-                            break
-                        attempt += 1
-                        time.sleep(retry_sleep * (attempt + 1))
-                        continue
+                # No call-level retry: each quote batch already retries on its own.
+                try:
+                    timeout = _float_or_none(converted.get("timeout")) or default_timeout
+                    data = _tx_spot_rows("bj", timeout=timeout)
+                except Exception as e:
+                    errors = [str(e)]
                 elapsed = time.time() - started
                 meta = {
                     "provider": "tencent",
@@ -611,8 +705,7 @@ class AkshareProvider(ToolProvider):
                         timeout = _float_or_none(converted.get("timeout")) or default_timeout
                         symbol_arg = str(converted.get("symbol") or "").strip()
                         if not symbol_arg or symbol_arg.lower() == "all":
-                            df = ak.stock_info_a_code_name()
-                            data = _normalize_result(df)
+                            data = [dict(r) for r in get_symbol_universe().get("a").records]
                             errors = []
                             break
 
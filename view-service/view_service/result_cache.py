@@ -0,0 +1,204 @@
+"""
+In-process result cache for tool calls (TTL + LRU, memory bounded).
+
+TTL classes mirror `common.cache.CacheManager.get_ttl` in the CN toolkit so the view service and
+toolkit scripts agree on how long a given tool's result stays fresh. The one difference: a long-running
+server must not pin open-ended history (today's or intraday bars) forever, so "historical" results are
+only kept indefinitely when the requested `end_date` is strictly in the past.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from threading import Lock
+from typing import Any
+
+
+@dataclass(frozen=True)
+class CacheTTL:
+    realtime: float = 60  # seconds
+    daily: float = 3600
+    historical: float = 300  # open-ended windows; closed ones never expire (see `get_ttl`)
+    static: float = 7 * 24 * 3600
+    default: float = 3600
+
+
+def ttl_class(name: str) -> str:
+    """Classify a tool by name (same heuristics as `CacheManager.get_ttl`)."""
+    name_lower = name.lower()
+    if any(k in name_lower for k in ["spot", "realtime", "real_time", "current", "bid_ask", "intraday"]):
+        return "realtime"
+    if any(k in name_lower for k in ["hist", "daily", "minute", "min", "tick", "kline"]):
+        return "historical"
+    if any(k in name_lower for k in ["info", "name", "code", "list", "category", "profile", "components", "cons"]):
+        return "static"
+    return "default"
+
+
+def _closed_window(args: dict[str, Any] | None) -> bool:
+    """True when `args` ask for a window that ended before today (its bars can no longer change)."""
+    end = (args or {}).get("end_date")
+    digits = re.sub(r"\D", "", str(end or ""))[:8]
+    if len(digits) != 8:
+        return False
+    try:
+        return date(int(digits[:4]), int(digits[4:6]), int(digits[6:])) < date.today()
+    except ValueError:
+        return False
+
+
+def get_ttl(name: str, ttl: CacheTTL | None = None, args: dict[str, Any] | None = None) -> float:
+    cls = ttl_class(name)
+    if cls == "historical" and _closed_window(args):
+        return math.inf
+    return float(getattr(ttl or CacheTTL(), cls))
+
+
+def ttl_meta(ttl: float) -> float | None:
+    """`ttl_seconds` as reported in tool meta: None for never-expiring entries (JSON has no Infinity)."""
+    return None if math.isinf(ttl) else ttl
+
+
+def cache_key(name: str, args: dict[str, Any]) -> str:
+    key_data = f"{name}:{json.dumps(args, sort_keys=True, ensure_ascii=False, default=str)}"
+    return hashlib.md5(key_data.encode("utf-8")).hexdigest()
+
+
+_SAMPLE_ROWS = 8
+
+
+def _json_nbytes(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def estimate_nbytes(value: Any) -> int:
+    """
+    Approximate in-memory footprint via the JSON size (what the view service ships anyway).
+
+    Long lists (table rows) are sized from a few evenly spaced sample rows scaled by the
+    row count, so a cache miss on a full-market table doesn't pay for a second render.
+    """
+    try:
+        if isinstance(value, dict):
+            return 2 + sum(_json_nbytes(k) + 2 + estimate_nbytes(v) for k, v in value.items())
+        if isinstance(value, (list, tuple)):
+            n = len(value)
+            if n <= _SAMPLE_ROWS:
+                return _json_nbytes(value)
+            step = n / _SAMPLE_ROWS
+            sample = [value[int(i * step)] for i in range(_SAMPLE_ROWS)]
+            per_row = (_json_nbytes(sample) - 2) / _SAMPLE_ROWS
+            return int(2 + per_row * n)
+        return _json_nbytes(value)
+    except Exception:
+        return 0
+
+
+@dataclass
+class _Entry:
+    value: Any
+    stored_at: float
+    ttl: float
+    nbytes: int
+
+
+class ResultCache:
+    """
+    Thread-safe TTL + LRU cache bounded by entry count and (approximate) bytes.
+
+    Values are shared between hits; callers must treat them as read-only.
+    """
+
+    def __init__(self, *, max_entries: int = 256, max_bytes: int = 256 * 1024 * 1024, ttl: CacheTTL | None = None) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.ttl = ttl or CacheTTL()
+        self._lock = Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def from_env() -> "ResultCache | None":
+        enabled = os.getenv("FINSKILLS_PROVIDER_CACHE_ENABLED", "1").strip().lower() in {"1", "true", "yes", "y"}
+        if not enabled:
+            return None
+        return ResultCache(
+            max_entries=int(os.getenv("FINSKILLS_PROVIDER_CACHE_MAX_ENTRIES", "256")),
+            max_bytes=int(float(os.getenv("FINSKILLS_PROVIDER_CACHE_MAX_MB", "256")) * 1024 * 1024),
+        )
+
+    def get_ttl(self, name: str, args: dict[str, Any] | None = None) -> float:
+        return get_ttl(name, self.ttl, args)
+
+    def get(self, key: str) -> tuple[Any, float] | None:
+        """Return `(value, age_seconds)` for a fresh entry, else None."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            age = now - entry.stored_at
+            if age > entry.ttl:
+                self._drop(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.value, age
+
+    def put(self, key: str, value: Any, *, ttl: float, nbytes: int | None = None) -> bool:
+        if ttl <= 0:
+            return False
+        size = estimate_nbytes(value) if nbytes is None else int(nbytes)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(value=value, stored_at=time.time(), ttl=ttl, nbytes=size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._evictions += 1
+        return True
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def clear(self) -> int:
+        with self._lock:
+            n = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            return n
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.nbytes
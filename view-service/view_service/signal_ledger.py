@@ -0,0 +1,104 @@
+"""
+Append-only store of scored backtest signals.
+
+One ledger per (skill, rule, thresholds, horizons, data source) key under `<cache_dir>/ledger/`:
+`<key>.parquet` holds one row per signal in `BacktestFramework.forward_returns` format plus a
+`closed` flag (every horizon's holding window is complete), and `<key>.json` records what has been
+processed (`start_date`, `end_date`). Incremental reruns only append new signals and re-score the
+rows that are still open.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+
+from .fileio import atomic_path
+
+
+def ledger_key(
+    *,
+    skill: str,
+    rule: str,
+    thresholds: dict[str, Any],
+    horizons: list[int],
+    data_source: str,
+    data_kwargs: dict[str, Any],
+    benchmark: Optional[str] = None,
+) -> str:
+    payload = json.dumps(
+        {
+            "skill": skill,
+            "rule": rule,
+            "thresholds": thresholds,
+            "horizons": sorted(int(h) for h in horizons),
+            "data_source": data_source,
+            "data_kwargs": data_kwargs,
+            # only keyed when set, so ledgers written before benchmarks existed keep their key
+            **({"benchmark": benchmark} if benchmark else {}),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:20]
+
+
+@dataclass
+class LedgerState:
+    frame: pd.DataFrame
+    meta: dict[str, Any]
+
+
+class SignalLedger:
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, key: str) -> tuple[Path, Path, Path]:
+        return (self.root / f"{key}.parquet", self.root / f"{key}.csv.gz", self.root / f"{key}.json")
+
+    def lock_path(self, key: str) -> Path:
+        return self.root / ".locks" / f"{key}.lock"
+
+    def load(self, key: str) -> Optional[LedgerState]:
+        parquet_path, csv_path, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except Exception:
+            return None
+        frame: Optional[pd.DataFrame] = None
+        if parquet_path.exists():
+            try:
+                frame = pd.read_parquet(parquet_path)
+            except Exception:
+                frame = None
+        if frame is None and csv_path.exists():
+            try:
+                frame = pd.read_csv(csv_path, dtype={"date": str, "symbol": str, "signal_type": str})
+            except Exception:
+                frame = None
+        if frame is None:
+            return None
+        return LedgerState(frame=frame.reset_index(drop=True), meta=meta)
+
+    def save(self, key: str, frame: pd.DataFrame, meta: dict[str, Any]) -> None:
+        parquet_path, csv_path, meta_path = self._paths(key)
+        frame = frame.reset_index(drop=True)
+        try:
+            with atomic_path(parquet_path) as tmp:
+                frame.to_parquet(tmp, index=False)
+            stale = csv_path
+        except Exception:
+            with atomic_path(csv_path) as tmp:
+                frame.to_csv(tmp, index=False, compression="gzip")
+            stale = parquet_path
+        stale.unlink(missing_ok=True)
+        # Meta last: a reader never sees a processed range the signal file does not cover yet.
+        with atomic_path(meta_path) as tmp:
+            tmp.write_text(json.dumps(meta, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
@@ -0,0 +1,93 @@
+"""
+NDJSON streaming for view responses (opt-in: `"stream": true` in the POST body or `Accept: application/x-ndjson`).
+
+Instead of serializing the whole envelope into one buffer, a view is emitted as one JSON object per line:
+
+    {"type": "meta", "meta": {...}, "warnings": [...], "errors": [...]}
+    {"type": "result", "key": "spot", "meta": {...}, "warnings": [], "errors": [], "rows": 5300}
+    {"type": "row", "key": "spot", "row": {...}}            # one per row when the result data is a table
+    {"type": "data", "key": "info", "data": {...}}          # non-tabular result data, in one line
+    {"type": "end"}
+
+`/run/batch` streams `{"type": "batch", "meta": {...}}` first, then each view's lines tagged with `"view": <index>`.
+Lines are grouped into chunks of about `FINSKILLS_VIEW_STREAM_CHUNK_KB` (default 64) so the server holds one
+chunk per request, not the encoded table.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Iterable, Iterator, Optional
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson; charset=utf-8"
+
+
+def wants_stream(accept: Optional[str], body: bytes) -> bool:
+    if "application/x-ndjson" in (accept or "").lower():
+        return True
+    try:
+        req = json.loads((body or b"{}").decode("utf-8"))
+    except Exception:
+        return False
+    return isinstance(req, dict) and bool(req.get("stream"))
+
+
+def _line(obj: dict[str, Any]) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+
+
+def _iter_view(view: dict[str, Any], tag: dict[str, Any]) -> Iterator[bytes]:
+    yield _line({"type": "meta", **tag, "meta": view.get("meta"), "warnings": view.get("warnings"), "errors": view.get("errors")})
+    for key, result in (view.get("data") or {}).items():
+        result = result if isinstance(result, dict) else {"data": result}
+        data = result.get("data")
+        rows = data if isinstance(data, list) else None
+        yield _line(
+            {
+                "type": "result",
+                **tag,
+                "key": key,
+                "meta": result.get("meta"),
+                "warnings": result.get("warnings", []),
+                "errors": result.get("errors", []),
+                "rows": len(rows) if rows is not None else None,
+            }
+        )
+        if rows is not None:
+            for row in rows:
+                yield _line({"type": "row", **tag, "key": key, "row": row})
+        elif data is not None:
+            yield _line({"type": "data", **tag, "key": key, "data": data})
+
+
+def iter_ndjson(payload: dict[str, Any]) -> Iterator[bytes]:
+    """NDJSON lines for a `/run` envelope or a `/run/batch` response."""
+    if "results" in payload and isinstance(payload["results"], list):
+        yield _line({"type": "batch", "meta": payload.get("meta")})
+        for i, view in enumerate(payload["results"]):
+            yield from _iter_view(view, {"view": i})
+    else:
+        yield from _iter_view(payload, {})
+    yield _line({"type": "end"})
+
+
+def iter_chunks(lines: Iterable[bytes], chunk_bytes: Optional[int] = None) -> Iterator[bytes]:
+    """Group lines into chunks of roughly `chunk_bytes`."""
+    if chunk_bytes is None:
+        chunk_bytes = int(float(os.getenv("FINSKILLS_VIEW_STREAM_CHUNK_KB", "64")) * 1024)
+    buf: list[bytes] = []
+    size = 0
+    for line in lines:
+        buf.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield b"".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield b"".join(buf)
+
+
+def chunk_frame(data: bytes) -> bytes:
+    """One HTTP/1.1 chunked-transfer frame (an empty `data` is the terminating frame)."""
+    return f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n"
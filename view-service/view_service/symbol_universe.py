@@ -0,0 +1,228 @@
+"""
+Shared A-share symbol universe.
+
+Full-market paths (Tencent spot fallbacks, `stock_a_indicator_lg` "all", BJ spot) used to download the
+code list on every call. This module keeps one copy per market in memory, persists it to disk, and
+refreshes it on a schedule (daily by default) with stale-while-revalidate semantics: a stale list is
+served while a background thread refreshes it; only a cold start without a persisted copy blocks.
+
+Markets:
+- "a":  `ak.stock_info_a_code_name()` (SH/SZ/BJ)
+- "bj": `ak.stock_info_bj_name_code()`
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Any, Callable
+
+
+def tx_prefix_symbol(symbol: str) -> str:
+    """6-digit code -> Tencent-prefixed symbol (sh600000 / sz000001 / bj830799)."""
+    s = (symbol or "").strip()
+    if not s:
+        return s
+    if s.startswith(("sh", "sz", "bj")) and len(s) >= 8:
+        return s
+    code = s
+    if code.startswith(("SH", "SZ", "BJ")):
+        return code.lower()
+    if code.startswith("6"):
+        return f"sh{code}"
+    if code.startswith(("0", "3")):
+        return f"sz{code}"
+    if code.startswith(("4", "8")):
+        return f"bj{code}"
+    return f"sz{code}"
+
+
+@dataclass(frozen=True)
+class UniverseSnapshot:
+    market: str
+    as_of: float  # epoch seconds of the upstream fetch
+    records: tuple[dict[str, str], ...]  # [{"code": "000001", "name": "平安银行"}, ...]
+    codes: tuple[str, ...] = field(default=())
+    tx_symbols: tuple[str, ...] = field(default=())
+    buckets: dict[str, tuple[str, ...]] = field(default_factory=dict)  # "sh"/"sz"/"bj" -> tx symbols
+
+    @staticmethod
+    def build(market: str, records: list[dict[str, Any]], *, as_of: float | None = None) -> "UniverseSnapshot":
+        clean: list[dict[str, str]] = []
+        seen: set[str] = set()
+        for r in records:
+            code = str(r.get("code") or "").strip()
+            if not code:
+                continue
+            code = code.zfill(6)
+            if code in seen:
+                continue
+            seen.add(code)
+            clean.append({"code": code, "name": str(r.get("name") or "")})
+        codes = tuple(r["code"] for r in clean)
+        tx_symbols = tuple(tx_prefix_symbol(c) for c in codes)
+        buckets: dict[str, list[str]] = {}
+        for sym in tx_symbols:
+            buckets.setdefault(sym[:2], []).append(sym)
+        return UniverseSnapshot(
+            market=market,
+            as_of=time.time() if as_of is None else float(as_of),
+            records=tuple(clean),
+            codes=codes,
+            tx_symbols=tx_symbols,
+            buckets={k: tuple(v) for k, v in buckets.items()},
+        )
+
+    def age_seconds(self) -> float:
+        return max(0.0, time.time() - self.as_of)
+
+
+def _fetch_a_records() -> list[dict[str, Any]]:
+    from .provider_akshare import _without_proxies  # local import: provider imports this module
+
+    with _without_proxies():
+        import akshare as ak
+
+        df = ak.stock_info_a_code_name()
+    return [{"code": c, "name": n} for c, n in zip(df["code"].tolist(), df["name"].tolist())]
+
+
+def _fetch_bj_records() -> list[dict[str, Any]]:
+    from .provider_akshare import _without_proxies  # local import: provider imports this module
+
+    with _without_proxies():
+        import akshare as ak
+
+        df = ak.stock_info_bj_name_code()
+    names = df["证券简称"].tolist() if "证券简称" in df.columns else [""] * len(df)
+    return [{"code": c, "name": n} for c, n in zip(df["证券代码"].tolist(), names)]
+
+
+def _default_store_dir() -> Path:
+    env_dir = os.getenv("FINSKILLS_UNIVERSE_DIR")
+    if env_dir:
+        return Path(env_dir).expanduser()
+    # Keep out of the top level of the shared cache dir: the toolkit CacheManager
+    # treats every `*.json` there as one of its entries (reindex/evict/clear).
+    cache_dir = os.getenv("FINSKILLS_CACHE_DIR")
+    base = Path(cache_dir).expanduser() if cache_dir else Path.home() / ".cache" / "finskills"
+    return base / "universe"
+
+
+class SymbolUniverse:
+    def __init__(
+        self,
+        store_dir: Path | None = None,
+        *,
+        max_age: float | None = None,
+        fetchers: dict[str, Callable[[], list[dict[str, Any]]]] | None = None,
+    ) -> None:
+        self.store_dir = store_dir or _default_store_dir()
+        self.max_age = float(os.getenv("FINSKILLS_UNIVERSE_MAX_AGE", "86400")) if max_age is None else float(max_age)
+        self._fetchers = fetchers or {"a": _fetch_a_records, "bj": _fetch_bj_records}
+        self._lock = Lock()
+        self._snapshots: dict[str, UniverseSnapshot] = {}
+        self._fill_locks: dict[str, Lock] = {m: Lock() for m in self._fetchers}
+        self._last_attempt: dict[str, float] = {}
+        self.retry_interval = float(os.getenv("FINSKILLS_UNIVERSE_RETRY_INTERVAL", "60"))
+
+    def _path(self, market: str) -> Path:
+        return self.store_dir / f"symbol_universe_{market}.json"
+
+    def get(self, market: str = "a") -> UniverseSnapshot:
+        """
+        Return the universe for `market`.
+
+        Served from memory, else from disk; a stale snapshot triggers a background refresh.
+        Raises if there is no copy at all and the upstream fetch fails.
+        """
+        if market not in self._fetchers:
+            raise ValueError(f"Unknown universe market: {market!r}")
+        snap = self._snapshots.get(market) or self._load(market)
+        if snap is None:
+            return self.refresh(market)
+        if snap.age_seconds() >= self.max_age:
+            self._refresh_in_background(market)
+        return snap
+
+    def refresh(self, market: str = "a") -> UniverseSnapshot:
+        """Fetch from upstream (one fetch per market at a time) and persist."""
+        before = self._snapshots.get(market)
+        with self._fill_locks[market]:
+            current = self._snapshots.get(market)
+            if current is not None and current is not before:
+                return current  # another caller refreshed it while we waited
+            records = self._fetchers[market]()
+            if not records:
+                raise ValueError(f"Empty symbol universe from upstream ({market})")
+            return self.offer(market, records)
+
+    def offer(self, market: str, records: list[dict[str, Any]]) -> UniverseSnapshot:
+        """Install a freshly fetched list (e.g. from the health probe) without another upstream call."""
+        snap = UniverseSnapshot.build(market, records)
+        with self._lock:
+            self._snapshots[market] = snap
+        self._save(snap)
+        return snap
+
+    def _refresh_in_background(self, market: str) -> None:
+        if self._fill_locks[market].locked():
+            return
+        now = time.time()
+        with self._lock:
+            if now - self._last_attempt.get(market, 0.0) < self.retry_interval:
+                return  # a refresh was just attempted (and may have failed); do not hammer upstream
+            self._last_attempt[market] = now
+
+        def run() -> None:
+            try:
+                self.refresh(market)
+            except Exception:
+                # Keep serving the stale copy; the next access retries.
+                pass
+
+        Thread(target=run, name=f"symbol-universe-{market}", daemon=True).start()
+
+    def _load(self, market: str) -> UniverseSnapshot | None:
+        path = self._path(market)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            snap = UniverseSnapshot.build(market, payload.get("records") or [], as_of=float(payload.get("as_of", 0)))
+        except Exception:
+            return None
+        if not snap.records:
+            return None
+        with self._lock:
+            self._snapshots.setdefault(market, snap)
+            return self._snapshots[market]
+
+    def _save(self, snap: UniverseSnapshot) -> None:
+        path = self._path(snap.market)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(
+                json.dumps({"market": snap.market, "as_of": snap.as_of, "records": list(snap.records)}, ensure_ascii=False),
+                encoding="utf-8",
+            )
+            os.replace(tmp, path)
+        except Exception:
+            # Persistence is best-effort; the in-memory copy is still valid.
+            pass
+
+
+_universe: SymbolUniverse | None = None
+_universe_lock = Lock()
+
+
+def get_symbol_universe() -> SymbolUniverse:
+    """Process-wide symbol universe."""
+    global _universe
+    with _universe_lock:
+        if _universe is None:
+            _universe = SymbolUniverse()
+        return _universe
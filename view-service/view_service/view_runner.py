@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import json
+import os
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 
-from .provider_base import ToolProvider
+from .provider_base import ToolProvider, ToolResult
 from .views_cn import ViewSpec
 
 
@@ -20,12 +25,213 @@ class ViewResult:
         return {"meta": self.meta, "data": self.data, "warnings": self.warnings, "errors": self.errors}
 
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+# Process-wide cap on concurrent upstream calls issued by custom-view plans.
+# Shared by every view (and every HTTP request thread) so a burst of requests
+# cannot fan out into an unbounded number of AKShare calls.
+_GLOBAL_MAX_WORKERS = max(1, _env_int("FINSKILLS_VIEW_GLOBAL_MAX_WORKERS", 16))
+_global_slots = threading.BoundedSemaphore(_GLOBAL_MAX_WORKERS)
+
+
+def _resolve_max_workers(spec: ViewSpec, max_workers: int | None) -> int:
+    """
+    Per-view worker cap. Precedence: explicit argument > view module `MAX_WORKERS` > env default.
+    """
+    if max_workers is None:
+        max_workers = getattr(spec.module, "MAX_WORKERS", None) if spec.module else None
+    if max_workers is None:
+        max_workers = _env_int("FINSKILLS_VIEW_MAX_WORKERS", 4)
+    try:
+        return max(1, int(max_workers))
+    except (TypeError, ValueError):
+        return 1
+
+
+def _resolve_call_timeout(call_timeout: float | None) -> float | None:
+    """Per-call deadline in seconds; `None`/<=0 disables it."""
+    if call_timeout is None:
+        call_timeout = _env_float("FINSKILLS_VIEW_CALL_TIMEOUT", 120.0)
+    return call_timeout if call_timeout and call_timeout > 0 else None
+
+
+def _await_call(fut: Future, started_at: dict[int, float], idx: int, timeout: float) -> ToolResult:
+    """
+    Wait for a plan call, measuring the deadline from when the call actually started
+    (i.e. after it obtained both a per-view worker and a global slot).
+
+    A call that has not started within `timeout` of being awaited is also treated as timed out,
+    so a view can never hang behind stuck upstream calls.
+    """
+    while True:
+        begun = started_at.get(idx)
+        remaining = timeout if begun is None else begun + timeout - time.monotonic()
+        if remaining <= 0:
+            raise FuturesTimeoutError()
+        try:
+            return fut.result(timeout=remaining)
+        except FuturesTimeoutError:
+            if begun is not None or started_at.get(idx) is None:
+                raise
+            # Started while we were waiting: re-arm the deadline from its start time.
+            continue
+
+
+def _execute_plan(
+    jobs: list[tuple[int, str, dict[str, Any]]],
+    *,
+    provider: ToolProvider,
+    refresh: bool,
+    meta_script: str,
+    max_workers: int,
+    call_timeout: float | None,
+) -> dict[int, ToolResult | BaseException]:
+    """
+    Run plan calls with at most `max_workers` in flight for this view (and at most
+    `FINSKILLS_VIEW_GLOBAL_MAX_WORKERS` across the process). Returns outcomes by plan index.
+    """
+    outcomes: dict[int, ToolResult | BaseException] = {}
+    if not jobs:
+        return outcomes
+
+    started_at: dict[int, float] = {}
+
+    def _call(idx: int, tool: str, tool_args: dict[str, Any]) -> ToolResult:
+        with _global_slots:
+            started_at[idx] = time.monotonic()
+            return provider.call_tool(tool, tool_args, refresh=refresh, meta_script=meta_script)
+
+    # Single call or serial cap without a deadline: run inline, no thread hop.
+    if (len(jobs) == 1 or max_workers == 1) and call_timeout is None:
+        for idx, tool, tool_args in jobs:
+            try:
+                outcomes[idx] = _call(idx, tool, tool_args)
+            except Exception as e:
+                outcomes[idx] = e
+        return outcomes
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(jobs)), thread_name_prefix="view-plan")
+    try:
+        futures = [(idx, executor.submit(_call, idx, tool, tool_args)) for idx, tool, tool_args in jobs]
+        for idx, fut in futures:
+            try:
+                if call_timeout is None:
+                    outcomes[idx] = fut.result()
+                else:
+                    outcomes[idx] = _await_call(fut, started_at, idx, call_timeout)
+            except FuturesTimeoutError:
+                fut.cancel()
+                outcomes[idx] = TimeoutError(f"timed out after {call_timeout:g}s")
+            except Exception as e:
+                outcomes[idx] = e
+    finally:
+        # Do not block the view on calls that blew their deadline; they finish (and are dropped) in the background.
+        executor.shutdown(wait=False, cancel_futures=True)
+    return outcomes
+
+
+def _plan_steps(
+    spec: ViewSpec, params: dict[str, Any], errors: list[str]
+) -> tuple[list[tuple[str, str] | str], list[tuple[int, str, dict[str, Any]]]]:
+    """
+    Expand a custom view's plan into ordered steps and the calls to run.
+
+    Steps are `(key, tool)` or an error message; jobs are `(step index, tool, args)`.
+    """
+    if not spec.module or not hasattr(spec.module, "plan"):
+        errors.append(f"Invalid custom view module for {spec.name}")
+        return [], []
+    try:
+        plan = spec.module.plan(params)  # type: ignore[attr-defined]
+    except Exception as e:
+        errors.append(f"Failed to build view plan: {e}")
+        plan = []
+
+    if not isinstance(plan, list):
+        errors.append("View plan must be a list")
+        plan = []
+
+    # Validate plan items up front; keep plan order so keys and errors aggregate exactly as before.
+    steps: list[tuple[str, str] | str] = []
+    jobs: list[tuple[int, str, dict[str, Any]]] = []
+    for call in plan:
+        if not isinstance(call, dict):
+            steps.append(f"Invalid plan item: {call!r}")
+            continue
+        key = str(call.get("key") or call.get("tool") or "result")
+        tool = call.get("tool")
+        tool_args = call.get("args", {}) or {}
+        if not isinstance(tool, str) or not tool:
+            steps.append(f"Invalid plan item (missing tool): {call!r}")
+            continue
+        if not isinstance(tool_args, dict):
+            steps.append(f"Invalid plan item args for {tool}: must be dict")
+            tool_args = {}
+        jobs.append((len(steps), tool, tool_args))
+        steps.append((key, tool))
+    return steps, jobs
+
+
+def _collect_steps(
+    steps: list[tuple[str, str] | str],
+    outcomes: dict[int, ToolResult | BaseException],
+    data: dict[str, Any],
+    errors: list[str],
+) -> None:
+    for idx, step in enumerate(steps):
+        if isinstance(step, str):
+            errors.append(step)
+            continue
+        key, tool = step
+        outcome = outcomes[idx]
+        if isinstance(outcome, BaseException):
+            data[key] = {"meta": {"function": tool}, "data": None, "warnings": [], "errors": [str(outcome)]}
+            errors.append(f"{tool}: {outcome}")
+            continue
+        data[key] = outcome.to_dict()
+        for err in outcome.errors:
+            errors.append(f"{tool}: {err}")
+
+
+def _collect_tool_view(spec: ViewSpec, outcome: ToolResult | BaseException, data: dict[str, Any], errors: list[str]) -> None:
+    if isinstance(outcome, BaseException):
+        errors.append(str(outcome))
+        data[spec.name] = {"meta": {"function": spec.name}, "data": None, "warnings": [], "errors": [str(outcome)]}
+        return
+    data[spec.name] = outcome.to_dict()
+    errors.extend(outcome.errors)
+
+
+def _view_meta(spec: ViewSpec, params: dict[str, Any], started: float) -> dict[str, Any]:
+    return {
+        "layer": "views",
+        "view": spec.name,
+        "as_of": datetime.now().isoformat(timespec="seconds"),
+        "elapsed_seconds": round(time.time() - started, 3),
+        "params": params,
+    }
+
+
 def run_view(
     spec: ViewSpec,
     *,
     params: dict[str, Any] | None,
     provider: ToolProvider,
     refresh: bool,
+    max_workers: int | None = None,
+    call_timeout: float | None = None,
 ) -> ViewResult:
     params = params or {}
     started = time.time()
@@ -36,59 +242,97 @@ def run_view(
 
     if spec.kind == "tool_view":
         try:
-            res = provider.call_tool(spec.name, params, refresh=refresh, meta_script=f"view:{spec.name}")
-            data[spec.name] = res.to_dict()
-            errors.extend(res.errors)
+            outcome: ToolResult | BaseException = provider.call_tool(
+                spec.name, params, refresh=refresh, meta_script=f"view:{spec.name}"
+            )
         except Exception as e:
-            errors.append(str(e))
-            data[spec.name] = {"meta": {"function": spec.name}, "data": None, "warnings": [], "errors": [str(e)]}
+            outcome = e
+        _collect_tool_view(spec, outcome, data, errors)
 
     elif spec.kind == "custom_view":
-        if not spec.module or not hasattr(spec.module, "plan"):
-            errors.append(f"Invalid custom view module for {spec.name}")
-        else:
-            try:
-                plan = spec.module.plan(params)  # type: ignore[attr-defined]
-            except Exception as e:
-                errors.append(f"Failed to build view plan: {e}")
-                plan = []
-
-            if not isinstance(plan, list):
-                errors.append("View plan must be a list")
-                plan = []
-
-            for call in plan:
-                if not isinstance(call, dict):
-                    errors.append(f"Invalid plan item: {call!r}")
-                    continue
-                key = str(call.get("key") or call.get("tool") or "result")
-                tool = call.get("tool")
-                tool_args = call.get("args", {}) or {}
-                if not isinstance(tool, str) or not tool:
-                    errors.append(f"Invalid plan item (missing tool): {call!r}")
-                    continue
-                if not isinstance(tool_args, dict):
-                    errors.append(f"Invalid plan item args for {tool}: must be dict")
-                    tool_args = {}
-
-                try:
-                    res = provider.call_tool(tool, tool_args, refresh=refresh, meta_script=f"view:{spec.name}")
-                    data[key] = res.to_dict()
-                    for err in res.errors:
-                        errors.append(f"{tool}: {err}")
-                except Exception as e:
-                    data[key] = {"meta": {"function": tool}, "data": None, "warnings": [], "errors": [str(e)]}
-                    errors.append(f"{tool}: {e}")
+        steps, jobs = _plan_steps(spec, params, errors)
+        outcomes = _execute_plan(
+            jobs,
+            provider=provider,
+            refresh=refresh,
+            meta_script=f"view:{spec.name}",
+            max_workers=_resolve_max_workers(spec, max_workers),
+            call_timeout=_resolve_call_timeout(call_timeout),
+        )
+        _collect_steps(steps, outcomes, data, errors)
     else:
         errors.append(f"Unknown view kind: {spec.kind}")
 
-    elapsed = time.time() - started
-    meta = {
-        "layer": "views",
-        "view": spec.name,
-        "as_of": datetime.now().isoformat(timespec="seconds"),
-        "elapsed_seconds": round(elapsed, 3),
-        "params": params,
-    }
-    return ViewResult(meta=meta, data=data, warnings=warnings, errors=errors)
+    return ViewResult(meta=_view_meta(spec, params, started), data=data, warnings=warnings, errors=errors)
+
+
+def _call_key(tool: str, args: dict[str, Any]) -> str:
+    return tool + "\x00" + json.dumps(args, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def run_views_batch(
+    items: list[tuple[ViewSpec, dict[str, Any] | None]],
+    *,
+    provider: ToolProvider,
+    refresh: bool,
+    max_workers: int | None = None,
+    call_timeout: float | None = None,
+) -> tuple[list[ViewResult], dict[str, Any]]:
+    """
+    Run several views as one unit.
+
+    Every view is expanded first (tool views are a single call, custom views via `plan`); identical
+    (tool, args) calls across all views are deduplicated, the unique set runs concurrently (capped by
+    `max_workers`, default `FINSKILLS_VIEW_BATCH_MAX_WORKERS`, and the process-wide slots), and each
+    outcome is fanned back out to every view that asked for it. Per-view results have the same shape
+    as `run_view`. Returns (results in input order, {"views", "calls", "unique_calls"}).
+    """
+    started = time.time()
+    unique: dict[str, int] = {}
+    unique_jobs: list[tuple[int, str, dict[str, Any]]] = []
+
+    def _job(tool: str, tool_args: dict[str, Any]) -> int:
+        key = _call_key(tool, tool_args)
+        if key not in unique:
+            unique[key] = len(unique_jobs)
+            unique_jobs.append((unique[key], tool, tool_args))
+        return unique[key]
+
+    expanded: list[tuple[ViewSpec, dict[str, Any], list[str], list[tuple[str, str] | str], dict[int, int]]] = []
+    total_calls = 0
+    for spec, params in items:
+        params = params or {}
+        errors: list[str] = []
+        steps: list[tuple[str, str] | str] = []
+        step_jobs: dict[int, int] = {}  # step index -> unique job index
+        if spec.kind == "tool_view":
+            step_jobs[0] = _job(spec.name, params)
+        elif spec.kind == "custom_view":
+            steps, jobs = _plan_steps(spec, params, errors)
+            for idx, tool, tool_args in jobs:
+                step_jobs[idx] = _job(tool, tool_args)
+        else:
+            errors.append(f"Unknown view kind: {spec.kind}")
+        total_calls += len(step_jobs)
+        expanded.append((spec, params, errors, steps, step_jobs))
+
+    if max_workers is None:
+        max_workers = _env_int("FINSKILLS_VIEW_BATCH_MAX_WORKERS", 8)
+    outcomes = _execute_plan(
+        unique_jobs,
+        provider=provider,
+        refresh=refresh,
+        meta_script="view:batch",
+        max_workers=max(1, int(max_workers)),
+        call_timeout=_resolve_call_timeout(call_timeout),
+    )
 
+    results: list[ViewResult] = []
+    for spec, params, errors, steps, step_jobs in expanded:
+        data: dict[str, Any] = {}
+        if spec.kind == "tool_view":
+            _collect_tool_view(spec, outcomes[step_jobs[0]], data, errors)
+        elif spec.kind == "custom_view":
+            _collect_steps(steps, {idx: outcomes[job] for idx, job in step_jobs.items()}, data, errors)
+        results.append(ViewResult(meta=_view_meta(spec, params, started), data=data, warnings=[], errors=errors))
+    return results, {"views": len(items), "calls": total_calls, "unique_calls": len(unique_jobs)}